@@ -3,6 +3,15 @@ from src.api.parser import router as parser_router
 from src.api.classifier import router as classifier_router
 # Use the new v1 router that combines everything
 from src.api.v1 import router as v1_router 
+from src.core.converter_pool import converter_pool
+from src.core.parse_worker import parse_pool
+from src.core.parse_cache import parse_cache
+from src.core.profiles import profile_stats
+from src.workflows.ingest_jobs import ingest_jobs
+from src.workflows.ingest_pipeline import ingest_pipeline
+from src.services.document_contents import document_contents
+from src.services.lexical_index import lexical_index
+from src.services.vector_db import vector_db_service
 
 app = FastAPI(
     title="Parser API", 
@@ -27,6 +36,46 @@ app.include_router(classifier_router, prefix="/legacy", tags=["Legacy Classifier
 # --- New Unified Router ---
 app.include_router(v1_router)
 
+@app.on_event("startup")
+def start_parse_pool():
+    # Workers preload docling models (PARSER_PRELOAD) before the first upload pays for it
+    parse_pool.start()
+
+@app.on_event("startup")
+async def start_ingest_jobs():
+    # Re-queues jobs a previous process left unfinished
+    await ingest_jobs.start()
+
+@app.on_event("shutdown")
+async def stop_ingest_jobs():
+    await ingest_jobs.stop()
+    await ingest_pipeline.stop()
+
+@app.on_event("shutdown")
+def stop_parse_pool():
+    parse_pool.shutdown()
+
+@app.on_event("shutdown")
+def close_vector_index():
+    vector_db_service.close()
+
 @app.get("/")
 async def root():
-    return {"message": "API is running. Access the interactive documentation at /docs."}
\ No newline at end of file
+    return {"message": "API is running. Access the interactive documentation at /docs."}
+
+@app.get("/stats")
+async def stats():
+    """Runtime counters for the parsing stack."""
+    return {
+        "converters": converter_pool.stats(),
+        "parse_pool": parse_pool.stats(),
+        "parse_cache": parse_cache.stats(),
+        "profiles": profile_stats(),
+        "ingest_jobs": ingest_jobs.stats(),
+        "ingest_pipeline": ingest_pipeline.stats(),
+        "embeddings": vector_db_service.embedding_stats(),
+        "vector_upserts": vector_db_service.upsert_stats(),
+        "vector_index": vector_db_service.index_stats(),
+        "lexical_index": lexical_index.stats(),
+        "document_contents": document_contents.stats(),
+    }
@@ -0,0 +1,71 @@
+"""
+Chunking benchmark: the previous RecursiveCharacterTextSplitter setup vs. the
+structure-aware chunker, on a corpus of documents.
+
+Reports, per file and in total, the number of chunks, the characters that would
+be embedded, and how many chunks start or end in the middle of a table row.
+Non-Markdown files are parsed first (text only, nothing written to disk).
+
+    python benchmark_chunking.py ledger.xlsx statements/*.pdf notes.md
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.core.chunking import chunk_markdown
+from src.core.parse_worker import run_parser
+
+MARKDOWN_SUFFIXES = {".md", ".txt"}
+
+
+def previous_splitter(md_text: str):
+    return RecursiveCharacterTextSplitter(
+        chunk_size=1000, chunk_overlap=250, separators=["\n\n", "|", "\n", " "]
+    ).split_text(md_text)
+
+
+def _partial_row(line: str) -> bool:
+    line = line.strip()
+    return "|" in line and not (line.startswith("|") and line.endswith("|"))
+
+
+def measure(chunks):
+    broken = sum(1 for c in chunks if c.strip() and (_partial_row(c.strip().splitlines()[0]) or _partial_row(c.strip().splitlines()[-1])))
+    return len(chunks), sum(map(len, chunks)), broken
+
+
+def load_markdown(path: Path, profile: str | None) -> str:
+    if path.suffix.lower() in MARKDOWN_SUFFIXES:
+        return path.read_text(encoding="utf-8", errors="replace")
+    with tempfile.TemporaryDirectory() as tmp:
+        result = run_parser(path, Path(tmp), profile, False)
+    return result.markdown if result else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", type=Path)
+    parser.add_argument("--profile", default="fast", help="Parse profile for non-Markdown files")
+    args = parser.parse_args()
+
+    header = f"{'file':<32}{'chunks':>14}{'embedded chars':>22}{'mid-row':>12}"
+    print(header + "\n" + f"{'':<32}{'before/after':>14}{'before/after':>22}{'before/after':>12}")
+    totals = [0] * 6
+    for path in args.files:
+        md_text = load_markdown(path, args.profile)
+        before = measure(previous_splitter(md_text))
+        after = measure(chunk_markdown(md_text))
+        for i, v in enumerate(before + after):
+            totals[i] += v
+        print(f"{path.name[:31]:<32}{before[0]:>7}/{after[0]:<6}{before[1]:>11}/{after[1]:<10}{before[2]:>6}/{after[2]:<5}")
+
+    b_chunks, b_chars, b_broken, a_chunks, a_chars, a_broken = totals
+    print(f"{'TOTAL':<32}{b_chunks:>7}/{a_chunks:<6}{b_chars:>11}/{a_chars:<10}{b_broken:>6}/{a_broken:<5}")
+    if b_chunks and b_chars:
+        print(f"\nchunks {100 * (a_chunks - b_chunks) / b_chunks:+.1f}%, embedded chars {100 * (a_chars - b_chars) / b_chars:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Embedding benchmark: current HuggingFaceEmbeddings baseline vs. the EmbeddingEngine backends.
+
+Reports throughput (chunks/s) and cosine drift against the baseline vectors, on
+chunks cut from a real document (--file) or on synthetic ledger/invoice text.
+
+    python benchmark_embeddings.py --file statement.txt --backends torch onnx onnx-int8
+"""
+import argparse
+import random
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from src.core.config import settings
+from src.core.text_stream import iter_text_chunks
+from src.services.embeddings import BACKENDS, EmbeddingEngine
+
+WORDS = ("invoice", "payment", "balance", "vendor", "ledger", "total", "tax", "amount", "due",
+         "account", "statement", "credit", "debit", "transfer", "receipt", "expense", "period")
+
+
+def synthetic_chunks(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(n):
+        # Mixed lengths, like real chunks (short table rows up to full 1000-char chunks)
+        words = [rng.choice(WORDS) for _ in range(rng.randint(5, 170))]
+        rows = [f"| {rng.randint(1, 28):02d}/03 | {w} | {rng.uniform(1, 9999):.2f} |" for w in words[:rng.randint(0, 8)]]
+        chunks.append(" ".join(words) + "\n" + "\n".join(rows))
+    return chunks
+
+
+def timed(fn, texts):
+    started = time.perf_counter()
+    vectors = np.asarray(fn(texts), dtype=np.float32)
+    return vectors, time.perf_counter() - started
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", type=Path, help="Text file to chunk (default: synthetic chunks)")
+    parser.add_argument("--texts", type=int, default=1000, help="Number of chunks to embed")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--batch-size", type=int, default=settings.EMBED_BATCH_SIZE)
+    parser.add_argument("--threads", type=int, default=settings.EMBED_THREADS or None)
+    args = parser.parse_args()
+
+    if args.file:
+        texts = [c for _, c in zip(range(args.texts), iter_text_chunks(args.file))]
+    else:
+        texts = synthetic_chunks(args.texts)
+    print(f"{len(texts)} chunks, avg {sum(map(len, texts)) / len(texts):.0f} chars, model {settings.EMBEDDING_MODEL}")
+
+    baseline = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL)
+    baseline.embed_documents(texts[:8])  # warm-up
+    base_vectors, base_seconds = timed(baseline.embed_documents, texts)
+    print(f"\n{'backend':<18}{'chunks/s':>10}{'speedup':>9}{'cos mean':>10}{'cos min':>9}")
+    print(f"{'baseline (HF)':<18}{len(texts) / base_seconds:>10.1f}{1.0:>9.2f}{1.0:>10.4f}{1.0:>9.4f}")
+
+    for backend in args.backends:
+        engine = EmbeddingEngine(settings.EMBEDDING_MODEL, backend=backend, batch_size=args.batch_size,
+                                 threads=args.threads, onnx_file=settings.EMBED_ONNX_FILE)
+        label = backend if engine.backend == backend else f"{backend}->{engine.backend}"
+        engine.embed_documents(texts[:8])
+        vectors, seconds = timed(engine.embed_documents, texts)
+        cos = cosine_rows(base_vectors, vectors)
+        print(f"{label:<18}{len(texts) / seconds:>10.1f}{base_seconds / seconds:>9.2f}{cos.mean():>10.4f}{cos.min():>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
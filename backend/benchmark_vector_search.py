@@ -0,0 +1,93 @@
+"""
+Local vector search benchmark: HNSW vs. exact (flat NumPy) search in the
+in-process vector backend.
+
+Builds both indexes over the same vectors in a temporary directory, then reports
+insert throughput, query latency (p50/p95) and recall@k of HNSW against the
+exact results, for each ef_search value given. Vectors are synthetic clustered
+data by default; pass --texts to embed real chunks (one per line) with the
+configured embedding engine instead.
+
+    python benchmark_vector_search.py --vectors 100000 --ef 32 64 128
+    python benchmark_vector_search.py --texts chunks.txt --queries 200
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from src.services.local_vectors import LocalVectorIndex
+
+
+def synthetic(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Gaussian clusters: closer to embedding space than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(1, n // 500), dim))
+    return (centres[rng.integers(len(centres), size=n)] + 0.3 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def embedded(path: str) -> np.ndarray:
+    from src.services.embeddings import build_embedding_engine
+
+    with open(path, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+    return np.asarray(build_embedding_engine().embed_documents(texts), dtype=np.float32)
+
+
+def build(root: str, backend: str, vectors: np.ndarray, ef: int) -> float:
+    index = LocalVectorIndex(root, vectors.shape[1], backend, ef_search=ef)
+    started = time.perf_counter()
+    for start in range(0, len(vectors), 1000):
+        index.upsert([{"id": str(i), "values": vectors[i]} for i in range(start, min(start + 1000, len(vectors)))], "bench")
+    elapsed = time.perf_counter() - started
+    index.close()
+    return elapsed
+
+
+def run_queries(index: LocalVectorIndex, queries: np.ndarray, k: int):
+    latencies, results = [], []
+    for q in queries:
+        started = time.perf_counter()
+        matches = index.query(q, k, "bench")
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append({m["id"] for m in matches})
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(0.95 * (len(latencies) - 1))], results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=50000, help="Synthetic vectors to index")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--texts", help="Embed these lines instead of synthetic vectors")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=15, help="Top-k (chat retrieval uses 15)")
+    parser.add_argument("--ef", type=int, nargs="+", default=[32, 64, 128])
+    args = parser.parse_args()
+
+    vectors = embedded(args.texts) if args.texts else synthetic(args.vectors, args.dim)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(len(vectors), size=args.queries)]
+    queries = queries + 0.05 * rng.normal(size=queries.shape).astype(np.float32)
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={args.k}\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        flat_seconds = build(f"{tmp}/flat", "flat", vectors, 0)
+        hnsw_seconds = build(f"{tmp}/hnsw", "hnsw", vectors, args.ef[0])
+        print(f"insert: flat {len(vectors) / flat_seconds:,.0f}/s, hnsw {len(vectors) / hnsw_seconds:,.0f}/s\n")
+
+        flat = LocalVectorIndex(f"{tmp}/flat", vectors.shape[1], "flat")
+        p50, p95, exact = run_queries(flat, queries, args.k)
+        print(f"{'index':<16}{'p50 ms':>10}{'p95 ms':>10}{'recall@' + str(args.k):>12}")
+        print(f"{'flat (exact)':<16}{p50:>10.2f}{p95:>10.2f}{1.0:>12.3f}")
+        for ef in args.ef:
+            hnsw = LocalVectorIndex(f"{tmp}/hnsw", vectors.shape[1], "hnsw", ef_search=ef)
+            p50, p95, approx = run_queries(hnsw, queries, args.k)
+            recall = statistics.mean(len(a & e) / len(e) for a, e in zip(approx, exact))
+            print(f"{'hnsw ef=' + str(ef):<16}{p50:>10.2f}{p95:>10.2f}{recall:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 import uuid
 from typing import List, Dict, Any, Union
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from src.services.database import db_service
+from src.services.vector_db import vector_db_service
 from src.core.auth import get_current_user  # The new security dependency
-from src.workflows.ingest import process_and_index_document
+from src.workflows.ingest_jobs import ingest_jobs, public_view
+from src.core.profiles import get_profile
 from src.workflows.chat import (
     retrieve_and_chat, 
     perform_reconciliation, 
@@ -83,31 +87,70 @@ async def delete_workflow(
     success = db_service.delete_workflow(workflow_id, user_id)
     if not success:
         raise HTTPException(status_code=404, detail="Workflow not found or access denied")
+    await run_in_threadpool(vector_db_service.delete_namespace, workflow_id)
     
     return {"status": "success", "message": "Workflow deleted successfully"}
 
-@router.post("/ingest")
+@router.post("/ingest", status_code=202)
 async def ingest(
     workflow_id: str = Form(...),
     files: List[UploadFile] = File(...),
+    profile: str = Form(None, description="Parse speed profile: fast, balanced or accurate (server default if omitted)."),
     user_id: str = Depends(get_current_user)  # <--- SECURED
 ):
     # 1. Security Check
     if not db_service.verify_ownership(workflow_id, user_id):
         raise HTTPException(status_code=403, detail="Access Denied: You do not own this workflow.")
 
-    results = []
+    try:
+        profile = get_profile(profile).name
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     print(f"📥 Batch Ingest for User {user_id} -> Workflow {workflow_id}")
-    
-    for file in files:
-        try:
-            content = await file.read()
-            num_chunks = process_and_index_document(workflow_id, content, file.filename)
-            results.append({"filename": file.filename, "status": "success", "chunks": num_chunks})
-        except Exception as e:
-            results.append({"filename": file.filename, "status": "failed", "error": str(e)})
-            
-    return {"workflow_id": workflow_id, "processed_files": len(results), "details": results}
+
+    # Uploads are spooled to disk and processed by the background job queue;
+    # poll /v1/ingest/jobs/{job_id} or follow its /events stream for progress
+    job = await ingest_jobs.submit(workflow_id, user_id, files, profile)
+    return {
+        "job_id": job["id"],
+        "workflow_id": workflow_id,
+        "profile": profile,
+        "status": job["status"],
+        "submitted_files": len(job["files"]),
+        "files": public_view(job)["files"],
+    }
+
+async def _get_owned_job(job_id: str, user_id: str):
+    job = await ingest_jobs.get(job_id)
+    if job is None or job["user_id"] != user_id:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return job
+
+@router.get("/ingest/jobs/{job_id}")
+async def get_ingest_job(
+    job_id: str,
+    user_id: str = Depends(get_current_user)  # <--- SECURED
+):
+    """
+    Status of a background ingest job, with per-file status and pipeline stage.
+    """
+    return public_view(await _get_owned_job(job_id, user_id))
+
+@router.get("/ingest/jobs/{job_id}/events")
+async def stream_ingest_job(
+    job_id: str,
+    user_id: str = Depends(get_current_user)  # <--- SECURED
+):
+    """
+    Server-sent events with live progress for an ingest job; the stream ends when the job finishes.
+    """
+    await _get_owned_job(job_id, user_id)
+    return StreamingResponse(
+        ingest_jobs.events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
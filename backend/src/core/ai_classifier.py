@@ -62,7 +62,11 @@ prompt = ChatPromptTemplate.from_messages([
 ])
 
 def classify_highest_class(path, return_debug=False):
-  raw = extract_text_from_html(path)
+  return classify_text(extract_text_from_html(path), return_debug)
+
+
+def classify_text(raw, return_debug=False):
+  # Parsed documents hand their Markdown straight in (no HTML file needed)
   text = clean_text(raw)
 
   response = llm.invoke(
@@ -0,0 +1,144 @@
+import logging
+import os
+import re
+import shutil
+import urllib.parse
+from pathlib import Path
+from typing import Dict, List, Set
+
+logger = logging.getLogger("assets")
+
+HTML_SRC_RE = re.compile(r'src=(["\'])(.*?)\1', flags=re.IGNORECASE)
+MD_IMG_RE = re.compile(r'!\[([^\]]*)\]\((.*?)\)')
+IMG_SRC_RE = re.compile(r'(<img\s+src=")([^"]+)(")')
+EXTERNAL_PREFIXES = ("data:", "http://", "https://")
+
+
+class AssetIndex:
+    """
+    One walk of an output tree, then O(1) lookups by relative path or file name.
+    Replaces per-reference exists()/rglob() calls when rewriting image refs.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._root_str = os.path.abspath(self.root)
+        self.files: Set[str] = set()           # relative posix paths
+        self.by_name: Dict[str, List[str]] = {}  # file name -> relative paths
+        for dirpath, _, filenames in os.walk(self.root):
+            rel_dir = os.path.relpath(dirpath, self.root)
+            for name in filenames:
+                self.add(name if rel_dir == "." else f"{Path(rel_dir).as_posix()}/{name}")
+
+    def add(self, rel: str):
+        if rel not in self.files:
+            self.files.add(rel)
+            self.by_name.setdefault(rel.rsplit("/", 1)[-1], []).append(rel)
+
+    def relative(self, ref: str) -> str | None:
+        """Relative path of `ref` inside the tree, or None if it points elsewhere."""
+        ref = ref.replace("\\", "/")
+        if os.path.isabs(ref):
+            ref = os.path.abspath(ref)
+            if not ref.startswith(self._root_str + os.sep):
+                return None
+            return Path(os.path.relpath(ref, self._root_str)).as_posix()
+        return Path(os.path.normpath(ref)).as_posix()
+
+    def resolve(self, ref: str) -> str | None:
+        """
+        Finds the indexed file a reference points to: exact relative path first,
+        then the first file with the same name anywhere in the tree.
+        """
+        rel = self.relative(ref)
+        if rel is not None and rel in self.files:
+            return rel
+        matches = self.by_name.get(ref.replace("\\", "/").rsplit("/", 1)[-1])
+        return matches[0] if matches else None
+
+    def unique_name(self, rel_dir: str, name: str) -> str:
+        stem, suffix = os.path.splitext(name)
+        candidate = f"{rel_dir}/{name}" if rel_dir else name
+        i = 1
+        while candidate in self.files:
+            candidate = f"{rel_dir}/{stem}_{i}{suffix}" if rel_dir else f"{stem}_{i}{suffix}"
+            i += 1
+        return candidate
+
+
+class _RefRewriter:
+    """Maps each referenced image to its final relative src; one instance per parse run."""
+
+    def __init__(self, out_dir: Path, images_subfolder: str | None):
+        self.out_dir = Path(out_dir)
+        self.index = AssetIndex(self.out_dir)
+        self.images_subfolder = images_subfolder
+        self.cache: Dict[str, str] = {}
+
+    def __call__(self, ref: str) -> str | None:
+        if ref in self.cache:
+            return self.cache[ref]
+
+        rel = self.index.resolve(ref)
+        if rel is None:
+            # Outside the tree (absolute path from the converter): one stat, then copy in
+            source = Path(ref.replace("\\", "/"))
+            if not (source.is_absolute() and source.is_file()):
+                return None
+            target = self._copy(source, self.images_subfolder or "")
+        elif self.images_subfolder and not rel.startswith(self.images_subfolder + "/"):
+            target = self._copy(self.out_dir / rel, self.images_subfolder)
+        else:
+            target = rel
+
+        self.cache[ref] = target
+        return target
+
+    def _copy(self, source: Path, rel_dir: str) -> str:
+        target = self.index.unique_name(rel_dir, source.name)
+        dest = self.out_dir / target
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, dest)
+        self.index.add(target)
+        return target
+
+
+def fix_html_image_refs(html_path: Path, out_dir: Path, images_subfolder: str | None = None):
+    """
+    Rewrites every local <... src="..."> in html_path to a path relative to out_dir,
+    in one regex pass over an AssetIndex built once. Images outside
+    `images_subfolder` (if given) are copied into it.
+    """
+    if not html_path.exists():
+        return
+    resolve = _RefRewriter(out_dir, images_subfolder)
+    html = urllib.parse.unquote(html_path.read_text(encoding="utf-8"))
+
+    def repl(m):
+        orig = m.group(2)
+        if orig.startswith(EXTERNAL_PREFIXES):
+            return m.group(0)
+        decoded = orig.replace("\\", "/")
+        rel = resolve(decoded)
+        return f'src="{rel or decoded}"'
+
+    html_path.write_text(HTML_SRC_RE.sub(repl, html), encoding="utf-8")
+    return html_path
+
+
+def fix_markdown_image_refs(md_path: Path, out_dir: Path, images_subfolder: str | None = None):
+    """Markdown counterpart of fix_html_image_refs for ![alt](path) references."""
+    resolve = _RefRewriter(out_dir, images_subfolder)
+    text = md_path.read_text(encoding="utf-8")
+
+    def repl(m):
+        alt = m.group(1)
+        url_part = re.split(r'\s+["\']', m.group(2).strip(), maxsplit=1)[0].rstrip('"').rstrip("'")
+        if url_part.startswith(EXTERNAL_PREFIXES):
+            return m.group(0)
+        decoded = urllib.parse.unquote(url_part).replace("\\", "/")
+        rel = resolve(decoded)
+        return f'![{alt}]({rel or decoded})'
+
+    md_path.write_text(MD_IMG_RE.sub(repl, text), encoding="utf-8")
+    return md_path
@@ -0,0 +1,147 @@
+import re
+from typing import Iterator, List, Tuple
+
+from src.core.text_stream import overlap_start, split_point
+
+HEADING_RE = re.compile(r"^#{1,6}\s+\S")
+TABLE_SEPARATOR_RE = re.compile(r"^\|?\s*:?-{3,}")
+
+# Bump when chunk boundaries change, so re-uploads of unchanged files are re-chunked
+CHUNKER_VERSION = "structural-1"
+
+CHUNK_SIZE = 1000
+# Prose keeps some overlap for sentences cut at a boundary; table rows are atomic
+PROSE_OVERLAP = 150
+TABLE_OVERLAP_ROWS = 0
+
+
+def _is_table_line(line: str) -> bool:
+    return line.lstrip().startswith("|")
+
+
+def _blocks(md_text: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yields (kind, text) blocks in document order: "heading", "table" (consecutive
+    | lines) or "prose" (everything else, split on blank lines). Headings inside
+    code fences are treated as prose.
+    """
+    kind, lines = None, []
+    in_fence = False
+
+    def flush():
+        if lines and any(l.strip() for l in lines):
+            return kind, "\n".join(lines).strip("\n")
+        return None
+
+    for line in md_text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and HEADING_RE.match(line):
+            block = flush()
+            if block:
+                yield block
+            yield "heading", line.strip()
+            kind, lines = None, []
+            continue
+        line_kind = "table" if not in_fence and _is_table_line(line) else "prose"
+        if line_kind != kind or (line_kind == "prose" and not line.strip() and not in_fence):
+            block = flush()
+            if block:
+                yield block
+            kind, lines = line_kind, []
+            if not line.strip():
+                continue
+        lines.append(line)
+    block = flush()
+    if block:
+        yield block
+
+
+def split_prose(text: str, chunk_size: int, overlap: int) -> List[str]:
+    """Paragraph > line > word boundaries, like the text stream chunker but in memory."""
+    chunks: List[str] = []
+    pos, covered = 0, 0
+    while len(text) - pos > chunk_size:
+        cut = split_point(text, pos, pos + chunk_size)
+        chunk = text[pos:cut].strip()
+        if chunk:
+            chunks.append(chunk)
+        covered = cut
+        pos = overlap_start(text, pos, cut, overlap)
+    tail = text[pos:].strip()
+    if tail and text[covered:].strip():
+        chunks.append(tail)
+    return chunks
+
+
+def split_table(table: str, chunk_size: int, overlap_rows: int = TABLE_OVERLAP_ROWS) -> List[str]:
+    """
+    Whole rows only, with the header (and its --- separator) repeated at the top
+    of every chunk so each one reads as a complete table.
+    """
+    lines = table.splitlines()
+    header_len = 2 if len(lines) > 1 and TABLE_SEPARATOR_RE.match(lines[1].strip()) else 1
+    header = "\n".join(lines[:header_len])
+    rows = lines[header_len:]
+    if not rows:
+        return [table]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = len(header)
+    for row in rows:
+        if current and size + 1 + len(row) > chunk_size:
+            chunks.append("\n".join([header, *current]))
+            current = current[-overlap_rows:] if overlap_rows else []
+            size = len(header) + sum(len(r) + 1 for r in current)
+        if len(header) + 1 + len(row) > chunk_size:
+            # A single row wider than a chunk: split it as text rather than drop it
+            chunks.extend(split_prose(row, chunk_size, 0))
+            continue
+        current.append(row)
+        size += 1 + len(row)
+    if current:
+        chunks.append("\n".join([header, *current]))
+    return chunks
+
+
+def chunk_markdown(md_text: str, chunk_size: int = CHUNK_SIZE, prose_overlap: int = PROSE_OVERLAP) -> List[str]:
+    """
+    Structure-aware chunking for parser Markdown. A chunk never spans a heading,
+    tables are split between rows with their header repeated, and small
+    neighbouring blocks of the same section are packed together up to chunk_size.
+    Each chunk starts with its heading path (e.g. "# Acme 2023" / "## Bank statement").
+    """
+    chunks: List[str] = []
+    path: List[Tuple[int, str]] = []  # (level, heading line) from outermost to innermost
+    packed: List[str] = []  # blocks of the current section waiting to be emitted
+
+    def prefix() -> str:
+        return "\n".join(line for _, line in path)
+
+    def budget() -> int:
+        # Deep heading paths never eat more than half a chunk
+        return max(chunk_size - len(prefix()) - 1, chunk_size // 2)
+
+    def flush():
+        if packed:
+            body = "\n\n".join(packed)
+            chunks.append(f"{prefix()}\n{body}" if path else body)
+            packed.clear()
+
+    for kind, text in _blocks(md_text):
+        if kind == "heading":
+            flush()
+            level = len(text) - len(text.lstrip("#"))
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append((level, text))
+            continue
+
+        pieces = split_table(text, budget()) if kind == "table" else split_prose(text, budget(), prose_overlap)
+        for piece in pieces:
+            if packed and sum(len(p) + 2 for p in packed) + len(piece) > budget():
+                flush()
+            packed.append(piece)
+    flush()
+    return chunks
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,12 +13,109 @@ class Settings:
     OPENAI_API_KEY: str = os.environ.get("OPENAI_API_KEY")
     LLM_MODEL: str = "gpt-5-mini"
 
+    # Vector store: "pinecone" (serverless) or "local" (in-process HNSW / exact NumPy index on disk)
+    VECTOR_BACKEND: str = os.environ.get("VECTOR_BACKEND", "pinecone").lower()
+    VECTOR_LOCAL_DIR: str = os.environ.get("VECTOR_LOCAL_DIR", os.path.join(tempfile.gettempdir(), "doc-intel-vectors"))
+    VECTOR_LOCAL_INDEX: str = os.environ.get("VECTOR_LOCAL_INDEX", "hnsw").lower()  # hnsw (needs hnswlib) or flat
+    VECTOR_LOCAL_HNSW_M: int = int(os.environ.get("VECTOR_LOCAL_HNSW_M", "16"))
+    VECTOR_LOCAL_HNSW_EF_CONSTRUCTION: int = int(os.environ.get("VECTOR_LOCAL_HNSW_EF_CONSTRUCTION", "200"))
+    VECTOR_LOCAL_HNSW_EF_SEARCH: int = int(os.environ.get("VECTOR_LOCAL_HNSW_EF_SEARCH", "64"))
+
+    # Hybrid retrieval: BM25 keyword index per workflow fused with vector results (reciprocal rank fusion)
+    HYBRID_SEARCH_ENABLED: bool = os.environ.get("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+    LEXICAL_INDEX_DIR: str = os.environ.get("LEXICAL_INDEX_DIR", os.path.join(tempfile.gettempdir(), "doc-intel-lexical"))
+    HYBRID_RRF_K: int = int(os.environ.get("HYBRID_RRF_K", "60"))
+    # Queries naming an invoice number or amount get at most this many chunks, exact matches first
+    HYBRID_EXACT_K: int = int(os.environ.get("HYBRID_EXACT_K", "5"))
+
     PINECONE_API_KEY: str = os.environ.get("PINECONE_API_KEY")
     PINECONE_INDEX_NAME: str = os.environ.get("PINECONE_INDEX_NAME", "doc-intel-index")
+    PINECONE_HOST: str = os.environ.get("PINECONE_HOST")  # e.g. http://localhost:5080 for Pinecone Local
+    # Bulk upserts: size-bounded batches, this many in flight, retried with exponential backoff
+    VECTOR_UPSERT_BATCH_SIZE: int = int(os.environ.get("VECTOR_UPSERT_BATCH_SIZE", "100"))
+    VECTOR_UPSERT_CONCURRENCY: int = int(os.environ.get("VECTOR_UPSERT_CONCURRENCY", "4"))
+    VECTOR_UPSERT_RETRIES: int = int(os.environ.get("VECTOR_UPSERT_RETRIES", "4"))
+    VECTOR_UPSERT_BACKOFF_SECONDS: float = float(os.environ.get("VECTOR_UPSERT_BACKOFF_SECONDS", "0.5"))
     EMBEDDING_MODEL: str = "sentence-transformers/all-mpnet-base-v2"
     EMBEDDING_DIMENSION: int = 768 
+    # Embedding engine: torch, onnx or onnx-int8 (ONNX needs `sentence-transformers[onnx]`)
+    EMBED_BACKEND: str = os.environ.get("EMBED_BACKEND", "torch")
+    EMBED_BATCH_SIZE: int = int(os.environ.get("EMBED_BATCH_SIZE", "32"))
+    EMBED_THREADS: int = int(os.environ.get("EMBED_THREADS", "0"))  # 0 = all cores available to the process
+    EMBED_ONNX_FILE: str = os.environ.get("EMBED_ONNX_FILE")
+    # Chunk/query embedding cache (model + normalised text hash -> vector), LRU-capped
+    EMBED_CACHE_ENABLED: bool = os.environ.get("EMBED_CACHE_ENABLED", "true").lower() == "true"
+    EMBED_CACHE_PATH: str = os.environ.get("EMBED_CACHE_PATH", os.path.join(tempfile.gettempdir(), "doc-intel-embed-cache.sqlite3"))
+    EMBED_CACHE_MAX_MB: int = int(os.environ.get("EMBED_CACHE_MAX_MB", "512"))
 
     SUPABASE_URL: str = os.environ.get("SUPABASE_URL")
     SUPABASE_KEY: str = os.environ.get("SUPABASE_KEY")
 
+    # Default ingestion speed profile: fast | balanced | accurate (see src/core/profiles.py)
+    PARSE_PROFILE: str = os.environ.get("PARSE_PROFILE", "accurate")
+
+    # Comma-separated converter pool keys to warm at startup (see src/core/converter_pool.py)
+    # *_text: the artifact-free converters ingestion and classification use; the others serve /legacy/parse
+    PARSER_PRELOAD: str = os.environ.get(
+        "PARSER_PRELOAD", "pdf_accurate_text,pdf_accurate_no_ocr_text,pdf_accurate,pdf_accurate_no_ocr,generic"
+    )
+
+    # Out-of-event-loop docling worker pool
+    PARSE_WORKERS: int = int(os.environ.get("PARSE_WORKERS", "2"))
+    PARSE_QUEUE_SIZE: int = int(os.environ.get("PARSE_QUEUE_SIZE", "8"))
+    PARSE_TIMEOUT_SECONDS: float = float(os.environ.get("PARSE_TIMEOUT_SECONDS", "600"))
+
+    # Page-range parallel PDF conversion: PDF_PARALLEL_WORKERS range processes in total,
+    # split evenly between the PARSE_WORKERS parse workers (each needs 2+ to run in parallel)
+    PDF_PARALLEL_WORKERS: int = int(os.environ.get("PDF_PARALLEL_WORKERS", "4"))
+    PDF_PAGE_CHUNK_SIZE: int = int(os.environ.get("PDF_PAGE_CHUNK_SIZE", "10"))
+    PDF_PARALLEL_MIN_PAGES: int = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "20"))
+
+    # Text-layer pre-scan: pages with enough embedded text and little raster content skip OCR
+    PDF_TEXT_LAYER_DETECTION: bool = os.environ.get("PDF_TEXT_LAYER_DETECTION", "true").lower() == "true"
+    TEXT_LAYER_MIN_CHARS: int = int(os.environ.get("TEXT_LAYER_MIN_CHARS", "32"))
+    TEXT_LAYER_MAX_IMAGE_COVERAGE: float = float(os.environ.get("TEXT_LAYER_MAX_IMAGE_COVERAGE", "0.3"))
+
+    # Spreadsheets: stream rows with pandas/openpyxl instead of docling
+    TABULAR_FAST_PATH: bool = os.environ.get("TABULAR_FAST_PATH", "true").lower() == "true"
+    TABULAR_BATCH_ROWS: int = int(os.environ.get("TABULAR_BATCH_ROWS", "500"))
+    TABULAR_FRAME_MAX_ROWS: int = int(os.environ.get("TABULAR_FRAME_MAX_ROWS", "20000"))
+
+    # Streaming .txt/.md/.log ingestion
+    TEXT_INGEST_BATCH_CHUNKS: int = int(os.environ.get("TEXT_INGEST_BATCH_CHUNKS", "64"))
+    TEXT_INGEST_DB_MAX_CHARS: int = int(os.environ.get("TEXT_INGEST_DB_MAX_CHARS", "500000"))
+
+    # Content-addressed parse cache (SHA-256 of the upload + profile + parser version)
+    PARSE_CACHE_ENABLED: bool = os.environ.get("PARSE_CACHE_ENABLED", "true").lower() == "true"
+    PARSE_CACHE_DIR: str = os.environ.get("PARSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "doc-intel-parse-cache"))
+    PARSE_CACHE_MAX_MB: int = int(os.environ.get("PARSE_CACHE_MAX_MB", "2048"))
+    PARSE_CACHE_REDIS_URL: str = os.environ.get("PARSE_CACHE_REDIS_URL")
+    PARSE_CACHE_REDIS_TTL_SECONDS: int = int(os.environ.get("PARSE_CACHE_REDIS_TTL_SECONDS", str(7 * 24 * 3600)))
+
+    # Full text in document_contents: zstd-compressed (zlib if `zstandard` is missing), read through a local cache
+    DOCUMENT_CONTENT_ZSTD_LEVEL: int = int(os.environ.get("DOCUMENT_CONTENT_ZSTD_LEVEL", "9"))
+    DOCUMENT_CACHE_ENABLED: bool = os.environ.get("DOCUMENT_CACHE_ENABLED", "true").lower() == "true"
+    DOCUMENT_CACHE_DIR: str = os.environ.get("DOCUMENT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "doc-intel-document-cache"))
+    DOCUMENT_CACHE_MAX_MB: int = int(os.environ.get("DOCUMENT_CACHE_MAX_MB", "512"))
+    # Full document text sent in one prompt (reconciliation, graph building)
+    PROMPT_MAX_CHARS: int = int(os.environ.get("PROMPT_MAX_CHARS", "500000"))
+
+    # Uploads are streamed to disk in chunks; larger ones are rejected with 413
+    UPLOAD_MAX_MB: int = int(os.environ.get("UPLOAD_MAX_MB", "256"))
+    UPLOAD_CHUNK_BYTES: int = int(os.environ.get("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+
+    # Background ingestion jobs (/v1/ingest): SQLite job records + spooled uploads survive restarts
+    INGEST_JOB_WORKERS: int = int(os.environ.get("INGEST_JOB_WORKERS", "2"))
+    # Files of one batch ingested at once; keep workers x this within PARSE_WORKERS + PARSE_QUEUE_SIZE
+    INGEST_FILE_CONCURRENCY: int = int(os.environ.get("INGEST_FILE_CONCURRENCY", "4"))
+    INGEST_JOBS_DB: str = os.environ.get("INGEST_JOBS_DB", os.path.join(tempfile.gettempdir(), "doc-intel-ingest-jobs.sqlite3"))
+    INGEST_SPOOL_DIR: str = os.environ.get("INGEST_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "doc-intel-ingest-spool"))
+    INGEST_JOB_RETENTION_DAYS: int = int(os.environ.get("INGEST_JOB_RETENTION_DAYS", "7"))
+
+    # Staged ingest pipeline (parse -> chunk -> embed -> upsert) joined by bounded queues
+    INGEST_PIPELINE_QUEUE_SIZE: int = int(os.environ.get("INGEST_PIPELINE_QUEUE_SIZE", "8"))
+    INGEST_PIPELINE_BATCH_CHUNKS: int = int(os.environ.get("INGEST_PIPELINE_BATCH_CHUNKS", "64"))
+    INGEST_EMBED_WORKERS: int = int(os.environ.get("INGEST_EMBED_WORKERS", "1"))
+    INGEST_UPSERT_WORKERS: int = int(os.environ.get("INGEST_UPSERT_WORKERS", "2"))
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,163 @@
+import dataclasses
+import logging
+import threading
+import time
+import warnings
+from typing import Callable, Dict, Iterable
+
+from docling.datamodel.base_models import InputFormat
+from docling.datamodel.pipeline_options import PdfPipelineOptions
+from docling.document_converter import DocumentConverter, ImageFormatOption, PdfFormatOption
+
+from src.core.profiles import PROFILES, ParseProfile
+
+warnings.filterwarnings("ignore", category=UserWarning)
+
+logger = logging.getLogger("converter_pool")
+
+
+def _renders_images(profile: str) -> bool:
+    p = PROFILES[profile]
+    return p.generate_page_images or p.generate_picture_images
+
+
+def pdf_key(profile: str, ocr: bool = True, images: bool = True) -> str:
+    """
+    Converter key for a profile. images=False selects the text-only variant
+    (no page/picture rendering); profiles that never render share one key.
+    """
+    key = f"pdf_{profile}" if ocr else f"pdf_{profile}_no_ocr"
+    if not images and _renders_images(profile):
+        key += "_text"
+    return key
+
+
+def image_key(profile: str, images: bool = True) -> str:
+    key = f"image_{profile}"
+    if not images and _renders_images(profile):
+        key += "_text"
+    return key
+
+
+# Pool keys (one warm converter per pipeline configuration)
+PDF_ACCURATE = pdf_key("accurate")
+PDF_FAST = pdf_key("fast")
+GENERIC = "generic"
+
+# Same pipelines without OCR, for pages with a usable embedded text layer
+PDF_ACCURATE_NO_OCR = pdf_key("accurate", ocr=False)
+PDF_FAST_NO_OCR = pdf_key("fast", ocr=False)
+NO_OCR_VARIANT = {pdf_key(name): pdf_key(name, ocr=False) for name in PROFILES}
+
+
+def _pipeline_options(profile: ParseProfile, do_ocr: bool) -> PdfPipelineOptions:
+    pdf_opts = PdfPipelineOptions()
+    pdf_opts.images_scale = profile.images_scale
+    pdf_opts.generate_page_images = profile.generate_page_images
+    pdf_opts.generate_picture_images = profile.generate_picture_images
+    pdf_opts.do_table_structure = True
+    pdf_opts.do_ocr = do_ocr
+    pdf_opts.table_structure_options.mode = profile.table_mode
+    return pdf_opts
+
+
+def _pdf_builder(profile: ParseProfile, do_ocr: bool) -> Callable[[], DocumentConverter]:
+    def build() -> DocumentConverter:
+        format_options = {InputFormat.PDF: PdfFormatOption(pipeline_options=_pipeline_options(profile, do_ocr))}
+        return DocumentConverter(format_options=format_options)
+    return build
+
+
+def _image_builder(profile: ParseProfile) -> Callable[[], DocumentConverter]:
+    def build() -> DocumentConverter:
+        # Images have no text layer, OCR always on
+        format_options = {InputFormat.IMAGE: ImageFormatOption(pipeline_options=_pipeline_options(profile, True))}
+        return DocumentConverter(format_options=format_options)
+    return build
+
+
+def _build_generic() -> DocumentConverter:
+    # Default options cover DOCX / PPTX / CSV / XLSX / MD
+    return DocumentConverter()
+
+
+# key -> (builder, input format whose pipeline should be warmed on preload)
+BUILDERS: Dict[str, tuple[Callable[[], DocumentConverter], InputFormat]] = {GENERIC: (_build_generic, InputFormat.DOCX)}
+for _profile in PROFILES.values():
+    _text_only = dataclasses.replace(_profile, generate_page_images=False, generate_picture_images=False)
+    for _images, _p in ((True, _profile), (False, _text_only)):
+        BUILDERS[pdf_key(_profile.name, images=_images)] = (_pdf_builder(_p, True), InputFormat.PDF)
+        BUILDERS[pdf_key(_profile.name, ocr=False, images=_images)] = (_pdf_builder(_p, False), InputFormat.PDF)
+        BUILDERS[image_key(_profile.name, images=_images)] = (_image_builder(_p), InputFormat.IMAGE)
+
+
+class ConverterPool:
+    """
+    Process-wide cache of docling DocumentConverters, keyed by pipeline options.
+
+    Building a converter (and its first pipeline) loads the layout, TableFormer
+    and OCR models, so every parser should fetch its converter from here
+    instead of instantiating a new one per file.
+    """
+
+    def __init__(self, builders: Dict[str, tuple[Callable[[], DocumentConverter], InputFormat]]):
+        self._builders = dict(builders)
+        self._converters: Dict[str, DocumentConverter] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            key: {"hits": 0, "misses": 0, "init_seconds": 0.0, "warm": False}
+            for key in self._builders
+        }
+
+    def get(self, key: str) -> DocumentConverter:
+        """Returns the warm converter for `key`, building it on first use."""
+        if key not in self._builders:
+            raise ValueError(f"Unknown converter key '{key}'. Known: {', '.join(self._builders)}")
+
+        with self._lock:
+            converter = self._converters.get(key)
+            if converter is not None:
+                self._stats[key]["hits"] += 1
+                return converter
+
+            self._stats[key]["misses"] += 1
+            converter = self._build(key, warm=False)
+            return converter
+
+    def preload(self, keys: Iterable[str]):
+        """Builds converters up front and initialises their pipelines (model load)."""
+        for key in keys:
+            key = key.strip()
+            if not key:
+                continue
+            if key not in self._builders:
+                logger.warning("Skipping unknown converter key on preload: %s", key)
+                continue
+            with self._lock:
+                if self._stats[key]["warm"]:
+                    continue
+                self._build(key, warm=True)
+
+    def _build(self, key: str, warm: bool) -> DocumentConverter:
+        # Caller holds self._lock
+        builder, warm_format = self._builders[key]
+        start = time.perf_counter()
+
+        converter = self._converters.get(key) or builder()
+        if warm:
+            converter.initialize_pipeline(warm_format)
+
+        elapsed = time.perf_counter() - start
+        self._converters[key] = converter
+        self._stats[key]["init_seconds"] += elapsed
+        self._stats[key]["warm"] = self._stats[key]["warm"] or warm
+        logger.info("converter '%s' ready in %.2fs (warm=%s)", key, elapsed, warm)
+        return converter
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Snapshot of hit/miss/init-time counters per converter key."""
+        with self._lock:
+            return {key: dict(values) for key, values in self._stats.items()}
+
+
+converter_pool = ConverterPool(BUILDERS)
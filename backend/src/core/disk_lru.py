@@ -0,0 +1,78 @@
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+
+# Entries were pickles named <key>.pkl before they became plain bytes
+LEGACY_SUFFIX = ".pkl"
+
+
+class DiskBackend:
+    """Local directory of <key>.bin files, evicted least-recently-used once over max_bytes."""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: int | None = None  # computed on first use
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.bin"
+
+    def _entries(self):
+        return list(self.root.glob("*/*.bin"))
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        # mtime doubles as the LRU clock
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Atomic publish: readers never see a half-written entry
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        with self._lock:
+            current = self.size()
+            old = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            self._size = current + len(data) - old
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def size(self) -> int:
+        if self._size is None:
+            # First use: legacy entries are never read again, so reclaim their space
+            for legacy in self.root.glob(f"*/*{LEGACY_SUFFIX}"):
+                legacy.unlink(missing_ok=True)
+            self._size = sum(p.stat().st_size for p in self._entries())
+        return self._size
+
+    def _evict(self):
+        # Caller holds self._lock; drop oldest entries down to 90% of the budget
+        entries = sorted(self._entries(), key=lambda p: p.stat().st_mtime)
+        target = int(self.max_bytes * 0.9)
+        for p in entries:
+            if self._size <= target:
+                break
+            try:
+                size = p.stat().st_size
+                p.unlink()
+            except FileNotFoundError:
+                continue
+            self._size -= size
+            self.evictions += 1
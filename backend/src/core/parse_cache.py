@@ -0,0 +1,220 @@
+import asyncio
+import dataclasses
+import hashlib
+import io
+import json
+import logging
+import threading
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import pandas as pd
+
+from src.core.config import settings
+from src.core.disk_lru import DiskBackend
+from src.core.parse_result import ParseResult
+from src.core.parse_worker import parse_pool, run_parser
+from src.core.parser_tabular import _typed
+from src.core.profiles import get_profile
+
+logger = logging.getLogger("parse_cache")
+
+# Bump when parser output changes shape/content so old entries stop matching
+PARSER_VERSION = "3"
+
+# Settings that change what the parsers produce for the same bytes and profile
+OUTPUT_SETTINGS = (
+    "TABULAR_FAST_PATH",
+    "TABULAR_BATCH_ROWS",
+    "TABULAR_FRAME_MAX_ROWS",
+    "PDF_TEXT_LAYER_DETECTION",
+    "TEXT_LAYER_MIN_CHARS",
+    "TEXT_LAYER_MAX_IMAGE_COVERAGE",
+)
+
+
+def _docling_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("docling")
+    except Exception:
+        return "unknown"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ---------------------------
+# BACKENDS
+# ---------------------------
+class RedisBackend:
+    """Optional shared tier so several API hosts reuse each other's parses."""
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis  # optional dependency, only needed when PARSE_CACHE_REDIS_URL is set
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl_seconds
+
+    def get(self, key: str) -> bytes | None:
+        return self._client.get(f"parse:{key}")
+
+    def put(self, key: str, data: bytes):
+        self._client.set(f"parse:{key}", data, ex=self.ttl)
+
+
+# ---------------------------
+# CACHE
+# ---------------------------
+class ParseCache:
+    """
+    Content-addressed cache of parser output: SHA-256 of the uploaded bytes +
+    extension + profile + artifacts flag + parser/docling version + the
+    OUTPUT_SETTINGS values. Entries hold the ParseResult as JSON and, for
+    artifact runs, a ZIP of the output tree; nothing is unpickled, so a shared
+    tier writable by others can corrupt results but not run code.
+    Local disk is always consulted first; the shared backend fills it on a local miss.
+    """
+
+    def __init__(self, local: DiskBackend | None, shared=None):
+        self.local = local
+        self.shared = shared
+        options = ",".join(f"{name}={getattr(settings, name)}" for name in OUTPUT_SETTINGS)
+        self._version = f"{PARSER_VERSION}:{_docling_version()}:{options}"
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "shared_hits": 0, "misses": 0, "errors": 0}
+
+    def _count(self, name: str):
+        # get/put run on threadpool threads
+        with self._lock:
+            self._counters[name] += 1
+
+    @property
+    def enabled(self) -> bool:
+        return self.local is not None
+
+    def key(self, digest: str, suffix: str, profile: str | None, artifacts: bool) -> str:
+        parts = [digest, suffix.lower(), get_profile(profile).name, "artifacts" if artifacts else "text", self._version]
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Tuple[ParseResult, bytes | None] | None:
+        try:
+            data = self.local.get(key)
+            if data is None and self.shared is not None:
+                data = self.shared.get(key)
+                if data is not None:
+                    self._count("shared_hits")
+                    self.local.put(key, data)
+            if data is None:
+                self._count("misses")
+                return None
+            result, archive = _decode(data)
+        except Exception as e:
+            # A broken cache must never break parsing
+            logger.warning("parse cache read failed for %s: %s", key[:12], e)
+            self._count("errors")
+            return None
+        self._count("hits")
+        return result, archive
+
+    def put(self, key: str, result: ParseResult, out_dir: Path | None = None, exclude: Path | None = None):
+        try:
+            archive = _zip_tree(out_dir, exclude) if out_dir is not None else None
+            data = _encode(result, archive)
+            self.local.put(key, data)
+            if self.shared is not None:
+                self.shared.put(key, data)
+        except Exception as e:
+            logger.warning("parse cache write failed for %s: %s", key[:12], e)
+            self._count("errors")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "enabled": self.enabled,
+            "shared": self.shared is not None,
+            **counters,
+            "bytes": self.local.size() if self.local else 0,
+            "max_bytes": self.local.max_bytes if self.local else 0,
+            "evictions": self.local.evictions if self.local else 0,
+        }
+
+
+def _encode(result: ParseResult, archive: bytes | None) -> bytes:
+    # <8-byte header length><JSON header><artifact ZIP, if any>
+    fields = {f.name: getattr(result, f.name) for f in dataclasses.fields(result)}
+    fields["frames"] = {sheet: df.to_json(orient="table", index=False) for sheet, df in result.frames.items()}
+    header = json.dumps({"result": fields, "artifacts": archive is not None}).encode("utf-8")
+    return len(header).to_bytes(8, "big") + header + (archive or b"")
+
+
+def _decode(data: bytes) -> Tuple[ParseResult, bytes | None]:
+    size = int.from_bytes(data[:8], "big")
+    header = json.loads(data[8:8 + size])
+    fields = header["result"]
+    # The table schema keeps dtype families; _typed restores the downcast widths
+    fields["frames"] = {sheet: _typed(pd.read_json(io.StringIO(frame), orient="table"))
+                        for sheet, frame in fields["frames"].items()}
+    return ParseResult(**fields), data[8 + size:] if header["artifacts"] else None
+
+
+def _zip_tree(out_dir: Path, exclude: Path | None) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for path in out_dir.rglob("*"):
+            if path.is_file() and path != exclude:
+                zf.write(path, path.relative_to(out_dir).as_posix())
+    return buf.getvalue()
+
+
+def _restore_tree(archive: bytes, out_dir: Path):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        zf.extractall(out_dir)
+
+
+def _build_cache() -> ParseCache:
+    if not settings.PARSE_CACHE_ENABLED:
+        return ParseCache(None)
+    local = DiskBackend(Path(settings.PARSE_CACHE_DIR), settings.PARSE_CACHE_MAX_MB * 1024 * 1024)
+    shared = None
+    if settings.PARSE_CACHE_REDIS_URL:
+        try:
+            shared = RedisBackend(settings.PARSE_CACHE_REDIS_URL, settings.PARSE_CACHE_REDIS_TTL_SECONDS)
+        except ImportError:
+            logger.warning("PARSE_CACHE_REDIS_URL is set but redis is not installed, using local cache only")
+    return ParseCache(local, shared)
+
+
+parse_cache = _build_cache()
+
+
+async def cached_parse(input_path: Path, out_dir: Path, profile: str | None = None,
+                       artifacts: bool = True, digest: str | None = None) -> ParseResult | None:
+    """
+    parse_pool.run(run_parser, ...) behind the parse cache. A hit skips the
+    worker pool entirely (artifact runs get their output tree restored into out_dir).
+    """
+    if not parse_cache.enabled:
+        return await parse_pool.run(run_parser, input_path, out_dir, profile, artifacts)
+
+    digest = digest or await asyncio.to_thread(file_sha256, input_path)
+    key = parse_cache.key(digest, input_path.suffix, profile, artifacts)
+    entry = await asyncio.to_thread(parse_cache.get, key)
+    if entry is not None:
+        result, archive = entry
+        if archive:
+            await asyncio.to_thread(_restore_tree, archive, out_dir)
+        logger.info("parse cache hit for %s (%s)", input_path.name, digest[:12])
+        return dataclasses.replace(result, filename=input_path.name)
+
+    result = await parse_pool.run(run_parser, input_path, out_dir, profile, artifacts)
+    if result is not None:
+        await asyncio.to_thread(parse_cache.put, key, result, out_dir if artifacts else None, input_path)
+    return result
@@ -0,0 +1,43 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from docling_core.types.doc import DoclingDocument, ImageRefMode
+
+
+@dataclass
+class ParseResult:
+    """
+    In-memory output of a parser, consumed directly by ingestion.
+    Plain strings/dicts (plus DataFrames for spreadsheets) so it pickles
+    cheaply across the worker pool.
+    """
+    filename: str
+    markdown: str
+    tables: List[str] = field(default_factory=list)   # one Markdown table per docling table, in order
+    confidence_report: str = ""
+    profile: str | None = None
+    frames: Dict[str, Any] = field(default_factory=dict)  # sheet -> typed DataFrame (tabular fast path only)
+
+
+def _markdown(doc: DoclingDocument, **kwargs) -> str:
+    # Empty placeholder: image markers carry no meaning for embeddings
+    return doc.export_to_markdown(image_mode=ImageRefMode.PLACEHOLDER, image_placeholder="", **kwargs)
+
+
+def build_parse_result(filename: str, doc: DoclingDocument, confidence_report: str = "", profile: str | None = None) -> ParseResult:
+    """Exports a DoclingDocument straight to Markdown (no HTML round-trip)."""
+    tables = []
+    for table in doc.tables:
+        try:
+            tables.append(table.export_to_markdown(doc))
+        except Exception:
+            # Malformed table grids still appear in the full Markdown
+            continue
+
+    return ParseResult(
+        filename=filename,
+        markdown=_markdown(doc),
+        tables=tables,
+        confidence_report=confidence_report,
+        profile=profile,
+    )
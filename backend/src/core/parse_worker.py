@@ -0,0 +1,230 @@
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from src.core.config import settings
+from src.core.converter_pool import converter_pool
+from src.core.parse_result import ParseResult
+from src.core.profiles import profile_stats
+from src.core.parser_pdf import parse_pdf
+from src.core.parser_csv import csv_parser_function
+from src.core.parser_docx import parse_docx
+from src.core.parser_pptx import parse_pptx
+from src.core.parser_text import parse_text
+from src.core.parser_image import parse_image
+
+logger = logging.getLogger("parse_worker")
+
+# Extension -> docling parser (each returns a ParseResult; with artifacts they
+# also write index.html + assets into OUT_DIR)
+PARSERS: Dict[str, Callable[..., ParseResult | None]] = {
+    ".pdf": parse_pdf,
+    ".csv": csv_parser_function,
+    ".xlsx": csv_parser_function,
+    ".xls": csv_parser_function,
+    ".docx": parse_docx,
+    ".doc": parse_docx,
+    ".pptx": parse_pptx,
+    ".txt": parse_text,
+    ".md": parse_text,
+    ".png": parse_image,
+    ".jpg": parse_image,
+    ".jpeg": parse_image,
+    ".gif": parse_image,
+    ".bmp": parse_image,
+    ".webp": parse_image,
+}
+
+class ParseQueueFull(Exception):
+    """Raised when every worker is busy and the waiting queue is at capacity."""
+
+
+class ParseTimeout(Exception):
+    """Raised when a parse task exceeds its time budget."""
+
+
+class ParseWorkerCrashed(Exception):
+    """Raised when the worker running a task died (OOM kill, segfault) on it twice."""
+
+
+def run_parser(input_path: Path, out_dir: Path, profile: str | None = None, artifacts: bool = True) -> ParseResult | None:
+    """
+    Routes a file to the matching docling parser based on its extension and
+    returns its ParseResult. artifacts=False keeps everything in memory
+    (nothing rendered or written to out_dir).
+    Module-level so it can be shipped to worker processes.
+    """
+    suffix = input_path.suffix.lower()
+    parser = PARSERS.get(suffix)
+    if parser is None:
+        raise ValueError(f"Unsupported file format: {suffix}")
+    return parser(input_path, out_dir, profile=profile, artifacts=artifacts)
+
+
+# ---------------------------
+# WORKER-SIDE HELPERS
+# ---------------------------
+def _worker_init(preload: str):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    converter_pool.preload(preload.split(","))
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _invoke(fn: Callable, args: tuple):
+    # Ship the worker's converter + profile counters back with every result
+    result = fn(*args)
+    return os.getpid(), {"converters": converter_pool.stats(), "profiles": profile_stats()}, result
+
+
+# ---------------------------
+# POOL
+# ---------------------------
+class ParseWorkerPool:
+    """
+    Dedicated process pool for docling conversions.
+
+    Keeps CPU-heavy parsing off the uvicorn event loop. Admission is bounded
+    (running + waiting <= max_workers + max_queue) and every task has a
+    timeout. A timed-out task's conversion may never return, so the pool's
+    processes are killed and replaced; tasks that were running alongside it
+    are rerun once on the fresh workers.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, timeout: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight = 0
+        self._counters = {"completed": 0, "failed": 0, "timeouts": 0, "rejected": 0, "restarts": 0}
+        self._worker_stats: Dict[int, Dict[str, Any]] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: workers import only src.core, never the Pinecone/LLM singletons
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_worker_init,
+                initargs=(settings.PARSER_PRELOAD,),
+            )
+            logger.info("parse pool started with %d workers", self.max_workers)
+        return self._executor
+
+    def _reset(self, broken: ProcessPoolExecutor):
+        """
+        Drops an executor whose worker died; the next submit spawns fresh workers.
+        Only the first task to notice replaces it, so a new pool is never torn down.
+        """
+        if self._executor is broken:
+            self._executor = None
+            self._counters["restarts"] += 1
+            logger.warning("a parse worker died, restarting the pool")
+            broken.shutdown(wait=False, cancel_futures=True)
+
+    def _kill(self, executor: ProcessPoolExecutor):
+        """
+        Terminates every process of `executor`: a hung conversion can't be cancelled,
+        and the executor doesn't say which process runs which task.
+        """
+        if self._executor is executor:
+            self._executor = None
+            self._counters["restarts"] += 1
+        logger.warning("a parse task timed out, killing the pool's workers")
+        terminate = getattr(executor, "terminate_workers", None)  # Python 3.14+
+        if terminate is not None:
+            terminate()
+            return
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn: Callable, args: tuple) -> tuple[ProcessPoolExecutor, Future]:
+        executor = self._get_executor()
+        try:
+            return executor, executor.submit(_invoke, fn, args)
+        except BrokenProcessPool:
+            self._reset(executor)
+            executor = self._get_executor()
+            return executor, executor.submit(_invoke, fn, args)
+
+    def start(self):
+        """Spawns the workers early so model preloading happens before the first upload (best effort)."""
+        executor = self._get_executor()
+        for _ in range(self.max_workers):
+            executor.submit(_ping)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _release(self, _future):
+        self._in_flight -= 1
+
+    async def run(self, fn: Callable, *args, timeout: float | None = None):
+        """Runs `fn(*args)` in a worker process and awaits its result."""
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self._counters["rejected"] += 1
+            raise ParseQueueFull(f"Parser is busy ({self._in_flight} tasks in flight). Retry later.")
+
+        loop = asyncio.get_running_loop()
+        for attempt in (1, 2):
+            executor, cf_future = self._submit(fn, args)
+            self._in_flight += 1
+            cf_future.add_done_callback(lambda f: loop.call_soon_threadsafe(self._release, f))
+
+            try:
+                pid, worker_stats, result = await asyncio.wait_for(
+                    asyncio.wrap_future(cf_future), timeout or self.timeout
+                )
+                break
+            except asyncio.TimeoutError:
+                self._counters["timeouts"] += 1
+                if not cf_future.cancel():  # Still queued: cancelling is enough
+                    self._kill(executor)
+                    # The killed pool fails the future, which releases this task's slot
+                    with contextlib.suppress(BrokenProcessPool, asyncio.TimeoutError):
+                        await asyncio.wait_for(asyncio.wrap_future(cf_future), 10)
+                raise ParseTimeout(f"Parsing exceeded {timeout or self.timeout:.0f}s")
+            except BrokenProcessPool:
+                self._reset(executor)
+                # A dead worker fails every task of its pool, not only the one that killed it:
+                # run once more on fresh workers, so only a task that crashes again fails
+                if attempt == 1:
+                    continue
+                self._counters["failed"] += 1
+                raise ParseWorkerCrashed("The parser worker crashed on this file (out of memory?)")
+            except Exception:
+                self._counters["failed"] += 1
+                raise
+
+        self._counters["completed"] += 1
+        self._worker_stats[pid] = worker_stats
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "queue_limit": self.max_queue,
+            "timeout_seconds": self.timeout,
+            "in_flight": self._in_flight,
+            **self._counters,
+            "workers_detail": dict(self._worker_stats),
+        }
+
+
+parse_pool = ParseWorkerPool(
+    max_workers=settings.PARSE_WORKERS,
+    max_queue=settings.PARSE_QUEUE_SIZE,
+    timeout=settings.PARSE_TIMEOUT_SECONDS,
+)
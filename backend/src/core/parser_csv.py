@@ -1,30 +1,46 @@
-from docling.datamodel.base_models import InputFormat
-from docling.document_converter import DocumentConverter
 from pathlib import Path
+import io
 import logging
+import time
+
+from src.core.config import settings
+from src.core.converter_pool import converter_pool, GENERIC
+from src.core.parse_result import ParseResult, build_parse_result
+from src.core.parser_tabular import TABULAR_FORMATS, parse_tabular
+from src.core.profiles import get_profile, record_profile_run
 
 # Initialize logger
 logger = logging.getLogger("parser")
 
-def csv_parser_function(INPUT_CSV: Path, OUT_DIR: Path):
-    # Initialize converter inside or outside, depending on if we want to reuse it.
-    # Reusing it is generally better if it's heavy, but for now we can keep it here or inside.
-    # Based on pdf parser, it creates a new one each time or uses a global one? 
-    # PDF parser creates it inside. Let's do the same for consistency or keep it global if valid.
-    # The original file had it global. Let's keep it global for now but maybe move it inside if needed.
-    converter = DocumentConverter()
-
+def csv_parser_function(INPUT_CSV: Path, OUT_DIR: Path, profile: str | None = None, artifacts: bool = True) -> ParseResult:
+    """
+    Converts a CSV/XLSX and returns its Markdown as a ParseResult.
+    artifacts=True also writes OUT_DIR/index.html + confidence_report.txt.
+    Uses the streaming pandas/openpyxl path unless TABULAR_FAST_PATH is off
+    (or it fails on the file), in which case docling converts it.
+    """
+    # Spreadsheets have no profile-dependent pipeline settings; the profile is kept for metrics
+    parse_profile = get_profile(profile)
     input_path = INPUT_CSV
     if not input_path.exists():
         logger.error(f"Error: File '{INPUT_CSV}' not found!")
         raise FileNotFoundError(f"File '{INPUT_CSV}' not found!")
 
     file_ext = input_path.suffix.lower()
-    supported_formats = ['.csv', '.xlsx', '.xls']
-
-    if file_ext not in supported_formats:
+    if file_ext not in TABULAR_FORMATS:
         logger.error(f"Error: Unsupported format '{file_ext}'")
-        raise ValueError(f"Unsupported format '{file_ext}'. Supported: {', '.join(supported_formats)}")
+        raise ValueError(f"Unsupported format '{file_ext}'. Supported: {', '.join(TABULAR_FORMATS)}")
+
+    if settings.TABULAR_FAST_PATH:
+        try:
+            return parse_tabular(INPUT_CSV, OUT_DIR, profile=profile, artifacts=artifacts)
+        except Exception as e:
+            # Ragged rows, empty files, odd encodings: docling gets its own try
+            logger.warning(f"Tabular fast path failed for '{INPUT_CSV.name}' ({e}), falling back to docling")
+
+    started = time.perf_counter()
+    # Shared warm converter from the process-wide pool
+    converter = converter_pool.get(GENERIC)
 
     logger.info(f"Converting '{INPUT_CSV}'...")
 
@@ -53,8 +69,8 @@ def csv_parser_function(INPUT_CSV: Path, OUT_DIR: Path):
             logger.info(f"  Mean Score: {p.mean_score:.3f}")
             logger.info(f"  Low Score: {p.low_score:.3f}")
         
-        # Write confidence report to file
-        with open(conf_report_path, "w", encoding="utf-8") as f:
+        # Build confidence report (written to disk only with artifacts)
+        with io.StringIO() as f:
             f.write("=== DOCUMENT-LEVEL CONFIDENCE ===\n")
             f.write(f"Mean Grade: {conf.mean_grade}\n")
             f.write(f"Low Grade: {conf.low_grade}\n\n")
@@ -73,27 +89,31 @@ def csv_parser_function(INPUT_CSV: Path, OUT_DIR: Path):
                 f.write(f"  OCR Score: {p.ocr_score:.3f}\n")
                 f.write(f"  Mean Score: {p.mean_score:.3f}\n")
                 f.write(f"  Low Score: {p.low_score:.3f}\n")
-        
-        logger.info(f"\nConfidence report saved: {conf_report_path}")
-        
-        # Create output filenames based on input filename
-        base_name = input_path.stem  # filename without extension
-        # md_file = OUT_DIR / f"{base_name}.md"
-        html_file = OUT_DIR / "index.html"
-        
-        # Save as Markdown
-        logger.info(f"\nSaving Markdown...")
-        # res.document.save_as_markdown(str(md_file))
-        
-        # Save as HTML
-        logger.info(f"Saving HTML...")
-        res.document.save_as_html(str(html_file))
-        
-        logger.info(f"\nConversion successful!")
-        # logger.info(f"Markdown: {md_file}")
-        logger.info(f"HTML: {html_file}")
-        logger.info(f"Output dir: {OUT_DIR}")
-        
+            report_text = f.getvalue()
+
+        if artifacts:
+            OUT_DIR.mkdir(parents=True, exist_ok=True)
+            conf_report_path.write_text(report_text, encoding="utf-8")
+            logger.info(f"\nConfidence report saved: {conf_report_path}")
+
+            # md_file = OUT_DIR / f"{input_path.stem}.md"
+            html_file = OUT_DIR / "index.html"
+
+            # Save as Markdown
+            # res.document.save_as_markdown(str(md_file))
+
+            # Save as HTML
+            logger.info("Saving HTML...")
+            res.document.save_as_html(str(html_file))
+            # logger.info(f"Markdown: {md_file}")
+            logger.info(f"HTML: {html_file}")
+            logger.info(f"Output dir: {OUT_DIR}")
+
+        result = build_parse_result(input_path.name, res.document, report_text, parse_profile.name)
+        record_profile_run(parse_profile.name, input_path.name, time.perf_counter() - started, conf)
+        logger.info("\nConversion successful!")
+        return result
+
     except Exception as e:
         logger.error(f"Conversion failed: {e}")
         raise e
\ No newline at end of file
@@ -1,13 +1,14 @@
 import logging
-import os
-import shutil
-import urllib.parse
+import time
 from pathlib import Path
 import warnings
-import re
 
 from docling_core.types.doc import ImageRefMode, PictureItem, TableItem
-from docling.document_converter import DocumentConverter
+
+from src.core.assets import fix_html_image_refs
+from src.core.converter_pool import converter_pool, GENERIC
+from src.core.parse_result import ParseResult, build_parse_result
+from src.core.profiles import get_profile, record_profile_run
 
 warnings.filterwarnings("ignore", category=UserWarning)
 
@@ -23,87 +24,30 @@ def _ensure_dir(base_dir: Path, subfolder: str) -> Path:
     p.mkdir(parents=True, exist_ok=True)
     return p
 
-def _copy_into_images(found: Path, out_dir: Path, images_dir: Path, cache: dict) -> str:
-    fpath = found.resolve()
-    if fpath in cache:
-        return cache[fpath]
-
-    dest = images_dir / found.name
-    i = 1
-    while dest.exists():
-        dest = images_dir / f"{found.stem}_{i}{found.suffix}"
-        i += 1
-
-    shutil.copy2(found, dest)
-    rel = os.path.relpath(dest, start=out_dir).replace("\\", "/")
-    cache[fpath] = rel
-    return rel
-
-def _fix_html_image_refs(html_path: Path, out_dir: Path, cache: dict):
-    if not html_path.exists():
-        return
-
-    html = html_path.read_text(encoding="utf-8")
-    html = urllib.parse.unquote(html)
-    
-    src_re = re.compile(r'src=(["\'])(.*?)\1', flags=re.IGNORECASE)
-
-    def repl(m):
-        orig = m.group(2)
-        if orig.startswith(("data:", "http://", "https://")):
-            return m.group(0)
-        decoded = orig.replace("\\", "/")
-        candidates = [Path(decoded), out_dir / decoded, Path.cwd() / decoded]
-
-        found = None
-        for c in candidates:
-            if c.exists():
-                try:
-                    found = c.resolve()
-                    break
-                except OSError:
-                    pass
-
-        if not found:
-            fname = Path(decoded).name
-            for p in out_dir.rglob(fname):
-                try:
-                    found = p.resolve()
-                    break
-                except OSError:
-                    pass
-
-        if not found:
-            return f'src="{decoded}"'
-
-        # We assume figures go to the figures folder
-        figures_dir = out_dir / FIGURES_SUBFOLDER
-        figures_dir.mkdir(parents=True, exist_ok=True)
-        
-        rel = _copy_into_images(found, out_dir, figures_dir, cache)
-        return f'src="{rel}"'
-
-    fixed = src_re.sub(repl, html)
-    html_path.write_text(fixed, encoding="utf-8")
-    return html_path
-
 # ---------------------------
 # DOCX PARSER FUNCTION
 # ---------------------------
-def parse_docx(INPUT_FILE: Path, OUT_DIR: Path):
+def parse_docx(INPUT_FILE: Path, OUT_DIR: Path, profile: str | None = None, artifacts: bool = True) -> ParseResult:
+    """
+    Converts a DOCX and returns its Markdown as a ParseResult. artifacts=True
+    also writes OUT_DIR/index.html plus figure/table PNGs + CSVs; artifacts=False
+    (ingestion) writes nothing.
+    """
     if not INPUT_FILE.exists():
         logger.error("File not found: %s", INPUT_FILE.resolve())
         raise FileNotFoundError(f"File not found: {INPUT_FILE}")
 
-    OUT_DIR.mkdir(parents=True, exist_ok=True)
-    
-    # Initialize cache for this run
-    copied_images_cache = {}
+    # Office pipelines have no OCR/table-model knobs; the profile decides image export
+    parse_profile = get_profile(profile)
+    export_images = artifacts and parse_profile.generate_picture_images
+    started = time.perf_counter()
 
-    figures_dir = _ensure_dir(OUT_DIR, FIGURES_SUBFOLDER)
-    tables_dir = _ensure_dir(OUT_DIR, TABLES_SUBFOLDER)
+    if artifacts:
+        OUT_DIR.mkdir(parents=True, exist_ok=True)
+        figures_dir = _ensure_dir(OUT_DIR, FIGURES_SUBFOLDER)
+        tables_dir = _ensure_dir(OUT_DIR, TABLES_SUBFOLDER)
 
-    converter = DocumentConverter()
+    converter = converter_pool.get(GENERIC)
     logger.info("Converting '%s' ...", INPUT_FILE.name)
     
     try:
@@ -116,20 +60,18 @@ def parse_docx(INPUT_FILE: Path, OUT_DIR: Path):
         logger.info("Found %d pictures and %d tables", len(pictures), len(tables))
 
         # Save pictures
-        for i, el in enumerate(pictures, start=1):
+        for i, el in enumerate(pictures if export_images else [], start=1):
             dest = figures_dir / f"{INPUT_FILE.stem}-picture-{i}.png"
             img = el.get_image(doc)
             if img:
                 img.save(dest, "PNG")
-                copied_images_cache[dest.resolve()] = f"{FIGURES_SUBFOLDER}/{dest.name}"
 
-        for i, el in enumerate(tables, start=1):
+        for i, el in enumerate(tables if artifacts else [], start=1):
             # Table as image
             dest_img = tables_dir / f"{INPUT_FILE.stem}-table-{i}.png"
-            img = el.get_image(doc)
+            img = el.get_image(doc) if export_images else None
             if img:
                 img.save(dest_img, "PNG")
-                copied_images_cache[dest_img.resolve()] = f"{TABLES_SUBFOLDER}/{dest_img.name}"
             # Table as CSV
             try:
                 df = el.export_to_dataframe(doc)
@@ -138,15 +80,21 @@ def parse_docx(INPUT_FILE: Path, OUT_DIR: Path):
             except Exception as e:
                 logger.warning("Could not export table %d as CSV: %s", i, e)
 
-        # md_file = OUT_DIR / f"{INPUT_FILE.stem}-with-image-refs.md"
-        html_file = OUT_DIR / "index.html"
+        if artifacts:
+            # md_file = OUT_DIR / f"{INPUT_FILE.stem}-with-image-refs.md"
+            html_file = OUT_DIR / "index.html"
+            # doc.save_as_markdown(md_file, image_mode=ImageRefMode.REFERENCED)
+            image_mode = ImageRefMode.REFERENCED if export_images else ImageRefMode.PLACEHOLDER
+            doc.save_as_html(html_file, image_mode=image_mode)
+
+            if export_images:
+                fix_html_image_refs(html_file, OUT_DIR, FIGURES_SUBFOLDER)
+            logger.info("Done! Open %s in browser to view output.", html_file)
 
-        # doc.save_as_markdown(md_file, image_mode=ImageRefMode.REFERENCED)
-        doc.save_as_html(html_file, image_mode=ImageRefMode.REFERENCED)
+        result = build_parse_result(INPUT_FILE.name, doc, profile=parse_profile.name)
+        record_profile_run(parse_profile.name, INPUT_FILE.name, time.perf_counter() - started, conv_res.confidence)
+        return result
 
-        _fix_html_image_refs(html_file, OUT_DIR, copied_images_cache)
-        logger.info("Done! Open %s in browser to view output.", html_file)
-        
     except Exception as e:
         logger.error(f"DOCX conversion failed: {e}")
         raise e
@@ -1,169 +1,133 @@
+import io
 import logging
-import os
-import re
-import shutil
-import urllib.parse
+import time
 import warnings
 from pathlib import Path
 
 import pandas as pd
 from docling_core.types.doc import ImageRefMode, PictureItem, TableItem
-from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions
-from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling.datamodel.pipeline_options import TableFormerMode
 
-warnings.filterwarnings("ignore", category=UserWarning)
+from src.core.config import settings
+from src.core.assets import fix_html_image_refs
+from src.core.converter_pool import converter_pool, pdf_key
+from src.core.parse_result import ParseResult, build_parse_result
+from src.core.profiles import get_profile, record_profile_run
+from src.core import pdf_parallel, text_layer
 
-INPUT_PDF = Path("Sample-Fillable-PDF-filled.pdf")
-OUT_DIR = Path("Sample-Fillable-PDF-filled")
+warnings.filterwarnings("ignore", category=UserWarning)
 
 # Subfolders
 PAGES_SUBFOLDER = "pages"
 FIGURES_SUBFOLDER = "figures"
 TABLES_SUBFOLDER = "tables"
 CSV_SUBFOLDER = "extracted_csv"  
-CONF_REPORT = f"{OUT_DIR}/confidence_report.txt"
-
-# OUT_DIR.mkdir(parents=True, exist_ok=True)
-IMAGE_RESOLUTION_SCALE = 2.0
 
 logger = logging.getLogger("parser")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-copied_images_cache = {}
-
-
 def _ensure_images_dir(out_dir: Path, subfolder: str) -> Path:
     p = out_dir / subfolder
     p.mkdir(parents=True, exist_ok=True)
     return p
 
 
-def _copy_into_images(found: Path, out_dir: Path, images_dir: Path) -> str:
-    fpath = found.resolve()
-    if fpath in copied_images_cache:
-        return copied_images_cache[fpath]
-
-    dest = images_dir / found.name
-    i = 1
-    while dest.exists():
-        dest = images_dir / f"{found.stem}_{i}{found.suffix}"
-        i += 1
-
-    shutil.copy2(found, dest)
-    rel = os.path.relpath(dest, start=out_dir).replace("\\", "/")
-    copied_images_cache[fpath] = rel
-    return rel
-
-
-def _fix_html_image_refs(html_path: Path, out_dir: Path):
-    html = html_path.read_text(encoding="utf-8")
-    html = urllib.parse.unquote(html)
-    src_re = re.compile(r'src=(["\'])(.*?)\1', flags=re.IGNORECASE)
-
-    def repl(m):
-        orig = m.group(2)
-        if orig.startswith(("data:", "http://", "https://")):
-            return m.group(0)
-        decoded = orig.replace("\\", "/")
-        candidates = [Path(decoded), out_dir / decoded, Path.cwd() / decoded]
-
-        found = None
-        for c in candidates:
-            try:
-                if c.exists():
-                    found = c.resolve()
-                    break
-            except:
-                pass
-
-        if not found:
-            name = Path(decoded).name
-            for p in out_dir.rglob(name):
-                found = p.resolve()
-                break
-
-        if not found:
-            return f'src="{decoded}"'
-
-        rel = _copy_into_images(found, out_dir, found.parent)
-        return f'src="{rel}"'
-
-    fixed = src_re.sub(repl, html)
-    html_path.write_text(fixed, encoding="utf-8")
-    return html_path
-
-
-def _fix_markdown_image_refs(md_path: Path, out_dir: Path):
-    text = md_path.read_text(encoding="utf-8")
-    md_img_re = re.compile(r'!\[([^\]]*)\]\((.*?)\)')
-
-    def repl(m):
-        alt = m.group(1)
-        url = m.group(2).strip()
-        parts = re.split(r'\s+["\']', url, maxsplit=1)
-        url_part = parts[0].rstrip('"').rstrip("'")
-
-        if url_part.startswith(("data:", "http://", "https://")):
-            return m.group(0)
-
-        decoded = urllib.parse.unquote(url_part).replace("\\", "/")
-        candidates = [Path(decoded), out_dir / decoded, Path.cwd() / decoded]
+def _export_artifacts(doc, items, tables, INPUT_PDF: Path, OUT_DIR: Path):
+    """Renders page/figure/table PNGs and table CSVs (only needed for the ZIP output)."""
+    pages_dir = _ensure_images_dir(OUT_DIR, PAGES_SUBFOLDER)
+    figures_dir = _ensure_images_dir(OUT_DIR, FIGURES_SUBFOLDER)
+    tables_dir = _ensure_images_dir(OUT_DIR, TABLES_SUBFOLDER)
+    csv_dir = _ensure_images_dir(OUT_DIR, CSV_SUBFOLDER)
 
-        found = None
-        for c in candidates:
-            if c.exists():
-                found = c.resolve()
-                break
+    # Save pages
+    saved_pages = 0
+    for page_no, page in doc.pages.items():
+        if getattr(page, "image", None) is not None:
+            dest = pages_dir / f"{INPUT_PDF.stem}-page-{page_no}.png"
+            page.image.pil_image.save(dest, format="PNG")
+            saved_pages += 1
+    logger.info("saved %d page images", saved_pages)
 
-        if not found:
-            fname = Path(decoded).name
-            for p in out_dir.rglob(fname):
-                found = p.resolve()
-                break
+    # Save pictures and tables
+    pic_c = 0
+    tab_c = 0
+    for el, _ in items:
+        if isinstance(el, PictureItem):
+            pic_c += 1
+            dest = figures_dir / f"{INPUT_PDF.stem}-picture-{pic_c}.png"
+            img = el.get_image(doc)
+            if img is not None:
+                img.save(dest, "PNG")
 
-        if not found:
-            return f'![{alt}]({decoded})'
+        if isinstance(el, TableItem):
+            tab_c += 1
+            dest = tables_dir / f"{INPUT_PDF.stem}-table-{tab_c}.png"
+            img = el.get_image(doc)
+            if img is not None:
+                img.save(dest, "PNG")
 
-        rel = _copy_into_images(found, out_dir, found.parent)
-        return f'![{alt}]({rel})'
+    logger.info("saved %d pictures and %d tables", pic_c, tab_c)
 
-    fixed = md_img_re.sub(repl, text)
-    md_path.write_text(fixed, encoding="utf-8")
-    return md_path
+    # Save Docling tables as CSV
+    docling_csv_count = 0
+    for table_ix, table in enumerate(tables, start=1):
+        try:
+            df = table.export_to_dataframe(doc)
+            csv_path = csv_dir / f"{INPUT_PDF.stem}-docling-table-{table_ix}.csv"
+            df.to_csv(csv_path, index=False)
+            docling_csv_count += 1
+            logger.info("saved Docling CSV table: %s", csv_path.name)
+        except Exception as e:
+            logger.error("error exporting Docling table %d: %s", table_ix, e)
 
 
-def parse_pdf(INPUT_PDF: Path, OUT_DIR: Path):
+def parse_pdf(INPUT_PDF: Path, OUT_DIR: Path, profile: str | None = None, artifacts: bool = True) -> ParseResult | None:
+    """
+    Converts a PDF and returns its Markdown as a ParseResult.
+    With artifacts=True OUT_DIR also gets index.html, confidence_report.txt and
+    the page/figure/table images + table CSVs. With artifacts=False (ingestion)
+    nothing is rendered or written to disk.
+    """
     logger.info("starting parser")
     if not INPUT_PDF.exists():
         logger.error("input PDF not found: %s", INPUT_PDF.resolve())
         return
 
-    pages_dir = _ensure_images_dir(OUT_DIR, PAGES_SUBFOLDER)
-    figures_dir = _ensure_images_dir(OUT_DIR, FIGURES_SUBFOLDER)
-    tables_dir = _ensure_images_dir(OUT_DIR, TABLES_SUBFOLDER)
-    csv_dir = _ensure_images_dir(OUT_DIR, CSV_SUBFOLDER)
-    conf_report_path = OUT_DIR / "confidence_report.txt"
-    pdf_opts = PdfPipelineOptions()
-    pdf_opts.images_scale = IMAGE_RESOLUTION_SCALE
-    pdf_opts.generate_page_images = True
-    pdf_opts.generate_picture_images = True
-
-    #####
-    pdf_opts.do_table_structure=True
-    pdf_opts.do_ocr=True
-    pdf_opts.table_structure_options.mode = TableFormerMode.ACCURATE  
-    #####   
-
-    format_options = {InputFormat.PDF: PdfFormatOption(pipeline_options=pdf_opts)}
-    converter = DocumentConverter(format_options=format_options)
+    parse_profile = get_profile(profile)
+    ocr_key = pdf_key(parse_profile.name, images=artifacts)
+    text_key = pdf_key(parse_profile.name, ocr=False, images=artifacts)
+    started = time.perf_counter()
 
-    logger.info("converting %s ...", INPUT_PDF.name)
-    conv_res = converter.convert(INPUT_PDF)
-
-    #confidence
-    conf = conv_res.confidence
+    conf_report_path = OUT_DIR / "confidence_report.txt"
+    # Large PDFs are split into page ranges and converted across worker processes
+    total_pages = pdf_parallel.page_count(INPUT_PDF)
+    parallel = pdf_parallel.should_parallelize(total_pages)
+
+    # Text-layer pre-scan: only scanned / mixed pages go through OCR
+    page_scans = text_layer.scan_pdf(INPUT_PDF) if settings.PDF_TEXT_LAYER_DETECTION else []
+    segments = [(ocr_key, (1, total_pages))]
+    if page_scans:
+        ocr_runs = text_layer.ocr_segments(page_scans)
+        if len(ocr_runs) == 1 or pdf_parallel.can_merge():
+            segments = [
+                (ocr_key if needs_ocr else text_key, page_range)
+                for page_range, needs_ocr in ocr_runs
+            ]
+
+    parallel_timing = None
+    if parallel or len(segments) > 1 or segments[0][0] != ocr_key:
+        doc, conf, timing = pdf_parallel.convert_segments(INPUT_PDF, segments, parallel)
+        if parallel:
+            parallel_timing = timing
+    else:
+        # Warm converter for the profile (image scale, page/picture images, OCR, table mode)
+        converter = converter_pool.get(ocr_key)
+
+        logger.info("converting %s (profile=%s) ...", INPUT_PDF.name, parse_profile.name)
+        conv_res = converter.convert(INPUT_PDF)
+        doc = conv_res.document
+
+        #confidence
+        conf = conv_res.confidence
 
     logger.info("=== DOCUMENT-LEVEL CONFIDENCE ===")
     logger.info("Mean Grade: %s", conf.mean_grade)
@@ -189,7 +153,10 @@ def parse_pdf(INPUT_PDF: Path, OUT_DIR: Path):
         logger.info("  Low Score: %.3f", p.low_score)
     ##############
 
-    with open(conf_report_path, "w", encoding="utf-8") as f:
+    conversion_seconds = time.perf_counter() - started
+    with io.StringIO() as f:
+        f.write(f"Profile: {parse_profile.name}\n")
+        f.write(f"Conversion Time: {conversion_seconds:.2f}s\n\n")
         f.write("=== DOCUMENT-LEVEL CONFIDENCE ===\n")
         f.write(f"Mean Grade: {conf.mean_grade}\n")
         f.write(f"Low Grade: {conf.low_grade}\n\n")
@@ -213,8 +180,26 @@ def parse_pdf(INPUT_PDF: Path, OUT_DIR: Path):
             f.write(f"  Mean Score: {p.mean_score:.3f}\n")
             f.write(f"  Low Score: {p.low_score:.3f}\n")
 
+        if page_scans:
+            f.write("\n=== OCR DECISIONS (TEXT-LAYER PRE-SCAN) ===\n")
+            for scan in page_scans:
+                decision = "OCR" if scan.needs_ocr else "OCR skipped"
+                f.write(
+                    f"Page {scan.page_no}: {scan.kind} "
+                    f"(chars={scan.chars}, image coverage={scan.image_coverage:.0%}) -> {decision}\n"
+                )
+
+        if parallel_timing:
+            f.write("\n=== PARALLEL CONVERSION ===\n")
+            f.write(f"Chunks: {parallel_timing['chunks']} x {parallel_timing['chunk_size']} pages\n")
+            f.write(f"Workers: {parallel_timing['workers']}\n")
+            f.write(f"Wall Time: {parallel_timing['wall_seconds']:.2f}s\n")
+            f.write(f"Serial Time (sum of chunks): {parallel_timing['serial_seconds']:.2f}s\n")
+            f.write(f"Speedup: {parallel_timing['speedup']:.2f}x\n")
+
+        report_text = f.getvalue()
+
     ########
-    doc = conv_res.document
     logger.info("conversion done. pages=%d", len(doc.pages))
 
     items = list(doc.iterate_items())
@@ -222,55 +207,20 @@ def parse_pdf(INPUT_PDF: Path, OUT_DIR: Path):
     tables = [el for el, _ in items if isinstance(el, TableItem)]
     logger.info("layout items=%d pictures=%d tables=%d", len(items), len(pictures), len(tables))
 
-    # Save pages
-    saved_pages = 0
-    for page_no, page in doc.pages.items():
-        if getattr(page, "image", None) is not None:
-            dest = pages_dir / f"{INPUT_PDF.stem}-page-{page_no}.png"
-            page.image.pil_image.save(dest, format="PNG")
-            copied_images_cache[dest.resolve()] = f"{PAGES_SUBFOLDER}/{dest.name}"
-            saved_pages += 1
-    logger.info("saved %d page images", saved_pages)
-
-    # Save pictures and tables
-    pic_c = 0
-    tab_c = 0
-    for el, _ in items:
-        if isinstance(el, PictureItem):
-            pic_c += 1
-            dest = figures_dir / f"{INPUT_PDF.stem}-picture-{pic_c}.png"
-            img = el.get_image(doc)
-            if img is not None:
-                img.save(dest, "PNG")
-                copied_images_cache[dest.resolve()] = f"{FIGURES_SUBFOLDER}/{dest.name}"
-
-        if isinstance(el, TableItem):
-            tab_c += 1
-            dest = tables_dir / f"{INPUT_PDF.stem}-table-{tab_c}.png"
-            img = el.get_image(doc)
-            if img is not None:
-                img.save(dest, "PNG")
-                copied_images_cache[dest.resolve()] = f"{TABLES_SUBFOLDER}/{dest.name}"
-
-    logger.info("saved %d pictures and %d tables", pic_c, tab_c)
-
-    # Save Docling tables as CSV
-    docling_csv_count = 0
-    for table_ix, table in enumerate(tables, start=1):
-        try:
-            df = table.export_to_dataframe(doc)
-            csv_path = csv_dir / f"{INPUT_PDF.stem}-docling-table-{table_ix}.csv"
-            df.to_csv(csv_path, index=False)
-            docling_csv_count += 1
-            logger.info("saved Docling CSV table: %s", csv_path.name)
-        except Exception as e:
-            logger.error("error exporting Docling table %d: %s", table_ix, e)
-
-    # md_refs = OUT_DIR / f"{INPUT_PDF.stem}-with-image-refs.md"
-    html_refs = OUT_DIR / "index.html"
-    # doc.save_as_markdown(md_refs, image_mode=ImageRefMode.REFERENCED)
-    doc.save_as_html(html_refs, image_mode=ImageRefMode.REFERENCED)
-    # _fix_markdown_image_refs(md_refs, OUT_DIR)
-    _fix_html_image_refs(html_refs, OUT_DIR)
-    logger.info("done. open %s in a browser to verify", html_refs)
+    if artifacts:
+        OUT_DIR.mkdir(parents=True, exist_ok=True)
+        conf_report_path.write_text(report_text, encoding="utf-8")
+        _export_artifacts(doc, items, tables, INPUT_PDF, OUT_DIR)
+
+        # md_refs = OUT_DIR / f"{INPUT_PDF.stem}-with-image-refs.md"
+        html_refs = OUT_DIR / "index.html"
+        # doc.save_as_markdown(md_refs, image_mode=ImageRefMode.REFERENCED)
+        doc.save_as_html(html_refs, image_mode=ImageRefMode.REFERENCED)
+        # fix_markdown_image_refs(md_refs, OUT_DIR)
+        fix_html_image_refs(html_refs, OUT_DIR)
+        logger.info("done. open %s in a browser to verify", html_refs)
+
+    result = build_parse_result(INPUT_PDF.name, doc, report_text, parse_profile.name)
+    record_profile_run(parse_profile.name, INPUT_PDF.name, time.perf_counter() - started, conf)
+    return result
 
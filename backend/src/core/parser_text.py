@@ -1,7 +1,10 @@
+import html
 import logging
 from pathlib import Path
 import warnings
 
+from src.core.parse_result import ParseResult, build_parse_result
+
 warnings.filterwarnings("ignore", category=UserWarning)
 
 logger = logging.getLogger("txt_parser")
@@ -9,58 +12,65 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 
 
 def txt_to_html(txt_file: Path, html_file: Path):
-    """Convert plain text file to HTML while preserving spacing."""
+    """Convert plain text file to HTML while preserving spacing (streamed block by block)."""
     try:
-        with txt_file.open("r", encoding="utf-8") as f:
-            content = f.read()
-        # Replace line breaks with <br> for HTML
-        html_content = "<html><body><pre>{}</pre></body></html>".format(content)
         html_file.parent.mkdir(parents=True, exist_ok=True)
-        with html_file.open("w", encoding="utf-8") as f:
-            f.write(html_content)
+        with txt_file.open("r", encoding="utf-8") as src, html_file.open("w", encoding="utf-8") as dst:
+            dst.write("<html><body><pre>")
+            for block in iter(lambda: src.read(1 << 20), ""):
+                dst.write(html.escape(block, quote=False))
+            dst.write("</pre></body></html>")
         logger.info("TXT to HTML conversion successful: %s", html_file)
     except Exception as e:
         logger.error("Failed to convert TXT to HTML: %s", e)
         raise e
 
 
-def parse_text(INPUT_FILE: Path, OUT_DIR: Path):
+def parse_text(INPUT_FILE: Path, OUT_DIR: Path, profile: str | None = None, artifacts: bool = True) -> ParseResult | None:
     """
-    Parse Markdown (.md) using Docling and TXT (.txt) directly to HTML.
+    Parse Markdown (.md) using Docling and TXT (.txt) as-is, returning a ParseResult.
+    artifacts=True also writes the HTML rendering into OUT_DIR.
+    `profile` is accepted for a uniform parser signature; text has no pipeline options.
     """
     if not INPUT_FILE.exists():
         logger.error("File not found: %s", INPUT_FILE.resolve())
         raise FileNotFoundError(f"File not found: {INPUT_FILE}")
 
-    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    if artifacts:
+        OUT_DIR.mkdir(parents=True, exist_ok=True)
 
     if INPUT_FILE.suffix.lower() == '.md':
         from docling_core.types.doc import ImageRefMode
-        from docling.document_converter import DocumentConverter
+        from src.core.converter_pool import converter_pool, GENERIC
 
         logger.info("Processing Markdown file '%s' ...", INPUT_FILE.name)
         try:
-            converter = DocumentConverter()
+            converter = converter_pool.get(GENERIC)
             conv_res = converter.convert(INPUT_FILE)
             doc = conv_res.document
 
-            # md_file = OUT_DIR / f"{INPUT_FILE.stem}.md"
-            html_file = OUT_DIR / "index.html"
+            if artifacts:
+                # md_file = OUT_DIR / f"{INPUT_FILE.stem}.md"
+                html_file = OUT_DIR / "index.html"
 
-            # doc.save_as_markdown(md_file, image_mode=ImageRefMode.REFERENCED)
-            doc.save_as_html(html_file, image_mode=ImageRefMode.REFERENCED)
+                # doc.save_as_markdown(md_file, image_mode=ImageRefMode.REFERENCED)
+                doc.save_as_html(html_file, image_mode=ImageRefMode.REFERENCED)
+                # logger.info("Markdown: %s", md_file)
+                logger.info("HTML: %s", html_file)
 
             logger.info("Conversion successful!")
-            # logger.info("Markdown: %s", md_file)
-            logger.info("HTML: %s", html_file)
+            return build_parse_result(INPUT_FILE.name, doc, profile=profile)
 
         except Exception as e:
             logger.error(f"Markdown conversion failed: {e}")
             raise e
     elif INPUT_FILE.suffix.lower() == '.txt':
-        logger.info("Converting TXT file '%s' to HTML ...", INPUT_FILE.name)
-        html_file = OUT_DIR / f"{INPUT_FILE.stem}.html"
-        txt_to_html(INPUT_FILE, html_file)
+        if artifacts:
+            logger.info("Converting TXT file '%s' to HTML ...", INPUT_FILE.name)
+            html_file = OUT_DIR / f"{INPUT_FILE.stem}.html"
+            txt_to_html(INPUT_FILE, html_file)
+        # Plain text is already valid Markdown
+        content = INPUT_FILE.read_text(encoding="utf-8")
+        return ParseResult(filename=INPUT_FILE.name, markdown=content, profile=profile)
     else:
         logger.warning("Unsupported file type: %s", INPUT_FILE.suffix)
-
@@ -0,0 +1,224 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+from docling.datamodel.base_models import ConfidenceReport
+from docling_core.types.doc import DoclingDocument
+
+from src.core.config import settings
+from src.core.converter_pool import converter_pool, PDF_ACCURATE
+
+logger = logging.getLogger("pdf_parallel")
+
+_range_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def page_count(pdf_path: Path) -> int:
+    """Cheap page count via pdfium (no layout models involved). 0 if unreadable."""
+    try:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(str(pdf_path))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except Exception as e:
+        logger.warning("could not count pages of %s: %s", pdf_path.name, e)
+        return 0
+
+
+def page_ranges(total_pages: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Splits 1..total_pages into inclusive (start, end) ranges of chunk_size pages."""
+    return [
+        (start, min(start + chunk_size - 1, total_pages))
+        for start in range(1, total_pages + 1, chunk_size)
+    ]
+
+
+def can_merge() -> bool:
+    # DoclingDocument.concatenate only exists in recent docling-core releases
+    return hasattr(DoclingDocument, "concatenate")
+
+
+def range_workers() -> int:
+    """
+    Range processes per parse worker. PDF_PARALLEL_WORKERS is the total across
+    the service: every parse worker owns its own range pool.
+    """
+    return settings.PDF_PARALLEL_WORKERS // max(1, settings.PARSE_WORKERS)
+
+
+def should_parallelize(total_pages: int) -> bool:
+    return (
+        range_workers() > 1
+        and settings.PDF_PAGE_CHUNK_SIZE > 0
+        and total_pages >= settings.PDF_PARALLEL_MIN_PAGES
+        and can_merge()
+    )
+
+
+def _convert_page_range(pdf_path: Path, converter_key: str, page_range: Tuple[int, int]):
+    # Runs in a range worker; page numbers in the result stay absolute
+    start = time.perf_counter()
+    converter = converter_pool.get(converter_key)
+    conv_res = converter.convert(pdf_path, page_range=page_range)
+    return conv_res.document, conv_res.confidence, time.perf_counter() - start
+
+
+def _range_worker_init(preload: str, parent_pid: int):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    # Range workers only run PDF converters: warm those, skip the rest of the parse worker's list
+    converter_pool.preload(key for key in preload.split(",") if key.strip().startswith("pdf_"))
+    threading.Thread(target=_exit_with_parent, args=(parent_pid,), daemon=True).start()
+
+
+def _exit_with_parent(parent_pid: int):
+    # A parse worker killed on timeout runs no exit hooks: don't outlive it
+    while os.getppid() == parent_pid:
+        time.sleep(5)
+    os._exit(0)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _range_executor
+    # Concurrent parse_pdf calls (threads) must not each start their own pool
+    with _executor_lock:
+        if _range_executor is None:
+            _range_executor = ProcessPoolExecutor(
+                max_workers=range_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_range_worker_init,
+                initargs=(settings.PARSER_PRELOAD, os.getpid()),
+            )
+        return _range_executor
+
+
+@atexit.register
+def shutdown():
+    global _range_executor
+    with _executor_lock:
+        if _range_executor is not None:
+            _range_executor.shutdown(wait=False, cancel_futures=True)
+            _range_executor = None
+
+
+def _reset_executor(broken: ProcessPoolExecutor):
+    """Drops a pool whose worker died; only the first caller to notice replaces it."""
+    global _range_executor
+    with _executor_lock:
+        if _range_executor is broken:
+            _range_executor = None
+            logger.warning("a page-range worker died, restarting the pool")
+            broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(pdf_path: Path, key: str, page_range: Tuple[int, int]) -> Tuple[ProcessPoolExecutor, Future]:
+    executor = _get_executor()
+    try:
+        return executor, executor.submit(_convert_page_range, pdf_path, key, page_range)
+    except BrokenProcessPool:
+        _reset_executor(executor)
+        executor = _get_executor()
+        return executor, executor.submit(_convert_page_range, pdf_path, key, page_range)
+
+
+def _result(pdf_path: Path, job: Tuple[str, Tuple[int, int]], submitted: Tuple[ProcessPoolExecutor, Future]):
+    # A dead worker fails every chunk of its pool, not only the one that killed it:
+    # rerun the chunk once on fresh workers, so only a chunk that crashes again fails
+    executor, future = submitted
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        _reset_executor(executor)
+    executor, future = _submit(pdf_path, *job)
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        _reset_executor(executor)
+        raise
+
+
+def _merge_confidence(reports: List[ConfidenceReport]) -> ConfidenceReport:
+    merged = ConfidenceReport()
+    for report in reports:
+        merged.pages.update(report.pages)
+
+    # Document-level component scores are page means, as in the docling pipeline
+    pages = list(merged.pages.values())
+    for field in ("layout_score", "ocr_score", "parse_score", "table_score"):
+        values = [getattr(p, field) for p in pages]
+        setattr(merged, field, float(np.nanmean(values)) if values else np.nan)
+    return merged
+
+
+def split_segments(segments: List[Tuple[str, Tuple[int, int]]], chunk_size: int) -> List[Tuple[str, Tuple[int, int]]]:
+    """Splits (converter_key, page_range) segments into ranges of at most chunk_size pages."""
+    jobs = []
+    for key, (start, end) in segments:
+        for sub_start, sub_end in page_ranges(end - start + 1, chunk_size):
+            jobs.append((key, (start + sub_start - 1, start + sub_end - 1)))
+    return jobs
+
+
+def convert_segments(pdf_path: Path, segments: List[Tuple[str, Tuple[int, int]]], parallel: bool):
+    """
+    Converts each (converter_key, page_range) segment, concurrently across range
+    workers when `parallel` is set (segments are first cut to PDF_PAGE_CHUNK_SIZE),
+    otherwise one after another in this process. Results are merged in page order.
+    Returns (document, confidence, timing dict).
+    """
+    jobs = split_segments(segments, settings.PDF_PAGE_CHUNK_SIZE) if parallel else list(segments)
+    total_pages = sum(end - start + 1 for _, (start, end) in jobs)
+    logger.info(
+        "converting %s as %d page chunks (%d pages, parallel=%s) ...",
+        pdf_path.name, len(jobs), total_pages, parallel,
+    )
+
+    wall_start = time.perf_counter()
+    if parallel:
+        submitted = [_submit(pdf_path, key, r) for key, r in jobs]
+        # Collect in submission order == page order
+        results = [_result(pdf_path, job, s) for job, s in zip(jobs, submitted)]
+    else:
+        results = [_convert_page_range(pdf_path, key, r) for key, r in jobs]
+
+    docs = [doc for doc, _, _ in results]
+    if len(docs) == 1:
+        merged_doc = docs[0]
+    else:
+        merged_doc = DoclingDocument.concatenate(docs)
+        merged_doc.name = pdf_path.stem
+    merged_conf = _merge_confidence([conf for _, conf, _ in results])
+    wall_seconds = time.perf_counter() - wall_start
+
+    # Sum of per-chunk conversion time approximates a single-core run
+    chunk_seconds = sum(seconds for _, _, seconds in results)
+    timing = {
+        "chunks": len(jobs),
+        "chunk_size": settings.PDF_PAGE_CHUNK_SIZE,
+        "workers": range_workers() if parallel else 1,
+        "wall_seconds": wall_seconds,
+        "serial_seconds": chunk_seconds,
+        "speedup": chunk_seconds / wall_seconds if wall_seconds else 1.0,
+    }
+    if parallel:
+        logger.info(
+            "parallel conversion of %s: wall %.2fs vs serial %.2fs (speedup %.2fx)",
+            pdf_path.name, wall_seconds, chunk_seconds, timing["speedup"],
+        )
+    return merged_doc, merged_conf, timing
+
+
+def convert_parallel(pdf_path: Path, total_pages: int, converter_key: str = PDF_ACCURATE):
+    """Converts a whole PDF with one converter as concurrent page-range chunks."""
+    return convert_segments(pdf_path, [(converter_key, (1, total_pages))], parallel=True)
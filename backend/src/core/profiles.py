@@ -0,0 +1,95 @@
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from docling.datamodel.pipeline_options import TableFormerMode
+
+from src.core.config import settings
+
+logger = logging.getLogger("profiles")
+
+
+@dataclass(frozen=True)
+class ParseProfile:
+    """Docling pipeline settings shared by the PDF, image and office parsers."""
+    name: str
+    images_scale: float
+    generate_page_images: bool
+    generate_picture_images: bool
+    table_mode: TableFormerMode
+
+
+PROFILES: Dict[str, ParseProfile] = {
+    # Interactive uploads: text + table structure only, no rendering
+    "fast": ParseProfile(
+        name="fast",
+        images_scale=1.0,
+        generate_page_images=False,
+        generate_picture_images=False,
+        table_mode=TableFormerMode.FAST,
+    ),
+    "balanced": ParseProfile(
+        name="balanced",
+        images_scale=1.0,
+        generate_page_images=False,
+        generate_picture_images=True,
+        table_mode=TableFormerMode.ACCURATE,
+    ),
+    # Overnight batches / legacy ZIP output: full-resolution pages and figures
+    "accurate": ParseProfile(
+        name="accurate",
+        images_scale=2.0,
+        generate_page_images=True,
+        generate_picture_images=True,
+        table_mode=TableFormerMode.ACCURATE,
+    ),
+}
+
+DEFAULT_PROFILE = settings.PARSE_PROFILE
+
+
+def get_profile(name: str | None) -> ParseProfile:
+    """Resolves a profile name (None -> PARSE_PROFILE). Raises ValueError if unknown."""
+    name = (name or DEFAULT_PROFILE).lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown parse profile '{name}'. Choose one of: {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+# ---------------------------
+# PER-PROFILE METRICS
+# ---------------------------
+_lock = threading.Lock()
+_runs: Dict[str, Dict[str, float]] = {}
+
+
+def record_profile_run(profile: str, filename: str, seconds: float, confidence=None):
+    """Logs parse time + confidence for a profile and folds them into the running totals."""
+    mean_score = getattr(confidence, "mean_score", float("nan")) if confidence is not None else float("nan")
+    low_score = getattr(confidence, "low_score", float("nan")) if confidence is not None else float("nan")
+    logger.info(
+        "profile=%s file=%s parse_seconds=%.2f mean_score=%.3f low_score=%.3f",
+        profile, filename, seconds, mean_score, low_score,
+    )
+
+    with _lock:
+        totals = _runs.setdefault(profile, {"runs": 0, "total_seconds": 0.0, "scored_runs": 0, "total_mean_score": 0.0})
+        totals["runs"] += 1
+        totals["total_seconds"] += seconds
+        if not math.isnan(mean_score):
+            totals["scored_runs"] += 1
+            totals["total_mean_score"] += mean_score
+
+
+def profile_stats() -> Dict[str, Dict[str, Any]]:
+    with _lock:
+        return {
+            name: {
+                "runs": t["runs"],
+                "avg_seconds": t["total_seconds"] / t["runs"] if t["runs"] else 0.0,
+                "avg_mean_score": t["total_mean_score"] / t["scored_runs"] if t["scored_runs"] else None,
+            }
+            for name, t in _runs.items()
+        }
@@ -0,0 +1,98 @@
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+from src.core.config import settings
+
+logger = logging.getLogger("text_layer")
+
+# Page kinds
+TEXT_LAYER = "text-layer"
+SCANNED = "scanned"
+MIXED = "mixed"
+
+
+@dataclass
+class PageScan:
+    page_no: int
+    kind: str
+    chars: int
+    image_coverage: float
+
+    @property
+    def needs_ocr(self) -> bool:
+        return self.kind != TEXT_LAYER
+
+
+def _image_coverage(page, pdfium_c) -> float:
+    width, height = page.get_size()
+    page_area = width * height
+    if not page_area:
+        return 0.0
+
+    covered = 0.0
+    for obj in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE], max_depth=2):
+        left, bottom, right, top = obj.get_pos()
+        covered += max(0.0, right - left) * max(0.0, top - bottom)
+    return min(covered / page_area, 1.0)
+
+
+def scan_pdf(pdf_path: Path) -> List[PageScan]:
+    """
+    Classifies every page by its embedded text layer, without loading any models:
+      - text-layer: enough programmatic text and little raster content -> OCR skipped
+      - scanned:    (almost) no extractable text -> OCR
+      - mixed:      real text but large raster areas that may hold more text -> OCR
+    Returns [] if the PDF can't be read, callers then keep full OCR.
+    """
+    try:
+        import pypdfium2 as pdfium
+        import pypdfium2.raw as pdfium_c
+    except ImportError:
+        logger.warning("pypdfium2 not available, skipping text-layer detection")
+        return []
+
+    scans = []
+    try:
+        pdf = pdfium.PdfDocument(str(pdf_path))
+    except Exception as e:
+        logger.warning("text-layer scan failed for %s: %s", pdf_path.name, e)
+        return []
+
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            try:
+                textpage = page.get_textpage()
+                chars = len(textpage.get_text_range().strip())
+                textpage.close()
+                coverage = _image_coverage(page, pdfium_c)
+            finally:
+                page.close()
+
+            if chars < settings.TEXT_LAYER_MIN_CHARS:
+                kind = SCANNED
+            elif coverage > settings.TEXT_LAYER_MAX_IMAGE_COVERAGE:
+                kind = MIXED
+            else:
+                kind = TEXT_LAYER
+            scans.append(PageScan(page_no=index + 1, kind=kind, chars=chars, image_coverage=coverage))
+    finally:
+        pdf.close()
+
+    counts = {k: sum(1 for s in scans if s.kind == k) for k in (TEXT_LAYER, SCANNED, MIXED)}
+    logger.info("text-layer scan of %s: %s", pdf_path.name, counts)
+    return scans
+
+
+def ocr_segments(scans: List[PageScan]) -> List[Tuple[Tuple[int, int], bool]]:
+    """Groups consecutive pages with the same OCR need: [((start, end), needs_ocr), ...]."""
+    segments = []
+    for scan in scans:
+        if segments and segments[-1][1] == scan.needs_ocr and segments[-1][0][1] == scan.page_no - 1:
+            (start, _), needs_ocr = segments[-1]
+            segments[-1] = ((start, scan.page_no), needs_ocr)
+        else:
+            segments.append(((scan.page_no, scan.page_no), scan.needs_ocr))
+    return segments
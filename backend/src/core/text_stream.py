@@ -0,0 +1,65 @@
+from pathlib import Path
+from typing import Iterator
+
+# Same preference order as the ingestion RecursiveCharacterTextSplitter
+SEPARATORS = ("\n\n", "\n", " ")
+READ_BLOCK_CHARS = 1 << 20
+
+
+def split_point(buffer: str, start: int, end: int) -> int:
+    """Last separator in buffer[start:end] that keeps the chunk at least half full."""
+    floor = start + (end - start) // 2
+    for sep in SEPARATORS:
+        i = buffer.rfind(sep, floor, end)
+        if i != -1:
+            return i + len(sep)
+    return end
+
+
+def overlap_start(buffer: str, start: int, cut: int, overlap: int) -> int:
+    """Start of the next chunk: `overlap` chars back from cut, moved forward to a word boundary."""
+    if overlap <= 0:
+        return cut
+    pos = max(cut - overlap, start + 1)
+    for i in range(pos, cut):
+        if buffer[i].isspace():
+            return i + 1
+    return pos
+
+
+def iter_text_chunks(path: Path, chunk_size: int = 1000, chunk_overlap: int = 250,
+                     block_chars: int = READ_BLOCK_CHARS) -> Iterator[str]:
+    """
+    Yields ~chunk_size character chunks (with chunk_overlap) from a text file,
+    reading it block by block. Memory stays at about one read block no matter
+    how large the file is.
+    """
+    buffer = ""
+    pos = 0
+    covered = 0  # buffer[:covered] has already been emitted
+    eof = False
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while True:
+            if len(buffer) - pos <= chunk_size and not eof:
+                block = f.read(block_chars)
+                eof = not block
+                # Compact: drop everything before the current chunk start
+                buffer = buffer[pos:] + block
+                covered = max(covered - pos, 0)
+                pos = 0
+                continue
+
+            if len(buffer) - pos <= chunk_size:
+                tail = buffer[pos:].strip()
+                # Skip a tail that is nothing but the previous chunk's overlap
+                if tail and buffer[covered:].strip():
+                    yield tail
+                return
+
+            end = pos + chunk_size
+            cut = split_point(buffer, pos, end)
+            chunk = buffer[pos:cut].strip()
+            if chunk:
+                yield chunk
+            covered = cut
+            pos = overlap_start(buffer, pos, cut, chunk_overlap)
@@ -0,0 +1,49 @@
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from src.core.config import settings
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds UPLOAD_MAX_MB."""
+
+
+@dataclass
+class SavedUpload:
+    path: Path
+    filename: str
+    size: int
+    sha256: str
+
+
+async def save_upload(upload: UploadFile, dest_dir: Path, max_bytes: int | None = None) -> SavedUpload:
+    """
+    Streams an upload to dest_dir in UPLOAD_CHUNK_BYTES pieces, hashing as it goes.
+    Only one chunk is held in memory; the partial file is removed if the size limit is hit.
+    """
+    max_bytes = settings.UPLOAD_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+    filename = Path(upload.filename or "upload").name  # strip any client-side path
+    path = Path(dest_dir) / filename
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with open(path, "wb") as f:
+            while True:
+                chunk = await upload.read(settings.UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"'{filename}' exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+                digest.update(chunk)
+                await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    return SavedUpload(path=path, filename=filename, size=size, sha256=digest.hexdigest())
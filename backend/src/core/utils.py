@@ -1,4 +1,3 @@
-import re
 import os
 import shutil
 import random
@@ -7,6 +6,9 @@ import tempfile
 from pathlib import Path
 from fastapi import UploadFile
 
+from src.core.assets import AssetIndex, IMG_SRC_RE
+from src.core.uploads import save_upload
+
 # Import your existing parsers
 # We assume these exist based on your previous 'parser.py'
 from src.core.parser_pdf import parse_pdf 
@@ -17,7 +19,7 @@ from src.core.parser_text import parse_text
 async def parse_file_to_string(file: UploadFile) -> str:
     """
     Wrapper for Phase 1 Ingestion: 
-    Saves upload -> Runs Legacy Parser -> Reads output -> Returns String.
+    Saves upload -> Runs Legacy Parser -> Returns its Markdown.
     
     This allows us to reuse your existing Docling/Pandas parsers 
     but get the text back in memory for the LLM.
@@ -25,13 +27,9 @@ async def parse_file_to_string(file: UploadFile) -> str:
     # 1. Setup Temp Directory
     with tempfile.TemporaryDirectory() as temp_dir:
         temp_path = Path(temp_dir)
-        input_path = temp_path / file.filename
-        
-        # 2. Save Uploaded File
+        # 2. Save Uploaded File (streamed to disk, never read whole)
         try:
-            content = await file.read()
-            with open(input_path, "wb") as f:
-                f.write(content)
+            input_path = (await save_upload(file, temp_path)).path
         except Exception as e:
             return f"Error saving file: {str(e)}"
             
@@ -41,31 +39,19 @@ async def parse_file_to_string(file: UploadFile) -> str:
         try:
             # We reuse the logic from your parser.py
             if suffix == '.pdf':
-                # detailed=True usually produces better markdown in Docling
-                parse_pdf(input_path, temp_path) 
+                result = parse_pdf(input_path, temp_path, artifacts=False)
             elif suffix in ['.csv', '.xls', '.xlsx']:
-                csv_parser_function(input_path, temp_path)
+                result = csv_parser_function(input_path, temp_path, artifacts=False)
             elif suffix in ['.docx', '.doc']:
-                parse_docx(input_path, temp_path)
+                result = parse_docx(input_path, temp_path, artifacts=False)
             elif suffix in ['.txt', '.md']:
-                parse_text(input_path, temp_path)
+                result = parse_text(input_path, temp_path, artifacts=False)
             else:
                 return f"Error: Unsupported file type {suffix}"
                 
-            # 4. Find the Output File
-            # Your parsers write to disk. We need to find the text/markdown file they created.
-            # Priority: Markdown (.md) -> Text (.txt) -> HTML (.html)
-            
-            output_file = None
-            for ext in ["*.md", "*.txt", "*.html"]:
-                found = list(temp_path.glob(ext))
-                if found:
-                    output_file = found[0]
-                    break
-            
-            if output_file:
-                # Read the content back into memory
-                return output_file.read_text(encoding="utf-8")
+            # 4. Parsers hand back the Markdown in memory (nothing is written to disk)
+            if result is not None:
+                return result.markdown
             else:
                 return "Error: Parser ran but no text/markdown output was found."
 
@@ -92,41 +78,35 @@ def modify_html(folder_path: Path):
     with open(html_file, 'r', encoding='utf-8') as f:
         html_content = f.read()
     
-    # Find all image references in the HTML
-    img_pattern = r'<img\s+src="([^"]+)"'
-    matches = re.finditer(img_pattern, html_content)
-    
-    # Process each image
-    for match in matches:
-        old_path = match.group(1)
-        
-        # Get the full path to the image
-        img_full_path = folder_path / old_path
-        
-        if not img_full_path.exists():
-            print(f"Warning: Image not found: {img_full_path}")
-            continue
-        
-        # Get the file extension
-        extension = img_full_path.suffix
-        
+    # One walk of the folder instead of an exists() per image
+    index = AssetIndex(folder_path)
+    renamed = {}
+
+    def repl(match):
+        old_path = match.group(2)
+        if old_path in renamed:
+            return f"{match.group(1)}{renamed[old_path]}{match.group(3)}"
+
+        rel = index.relative(old_path)
+        if rel is None or rel not in index.files:
+            print(f"Warning: Image not found: {folder_path / old_path}")
+            return match.group(0)
+
         # Generate a unique random 10-character name
-        random_name = ''.join(random.choices(string.ascii_lowercase + string.digits, k=10))
-        new_filename = f"{random_name}{extension}"
-        
-        # Ensure the new name is unique
-        new_path = folder_path / new_filename
-        while new_path.exists():
-            random_name = ''.join(random.choices(string.ascii_lowercase + string.digits, k=10))
-            new_filename = f"{random_name}{extension}"
-            new_path = folder_path / new_filename
-        
+        extension = Path(rel).suffix
+        new_filename = f"{''.join(random.choices(string.ascii_lowercase + string.digits, k=10))}{extension}"
+        while new_filename in index.files:
+            new_filename = f"{''.join(random.choices(string.ascii_lowercase + string.digits, k=10))}{extension}"
+
         # Copy the image to the main folder
-        shutil.copy2(img_full_path, new_path)
+        shutil.copy2(folder_path / rel, folder_path / new_filename)
+        index.add(new_filename)
+        renamed[old_path] = new_filename
         print(f"Copied: {old_path} -> {new_filename}")
-        
-        # Update the HTML content
-        html_content = html_content.replace(f'src="{old_path}"', f'src="{new_filename}"')
+        return f"{match.group(1)}{new_filename}{match.group(3)}"
+
+    # Single pass over the HTML (no per-image str.replace)
+    html_content = IMG_SRC_RE.sub(repl, html_content)
     
     # Write the modified HTML back to the file
     with open(html_file, 'w', encoding='utf-8') as f:
@@ -159,53 +139,35 @@ def clean_folder(folder_path: Path):
     with open(html_file, 'r', encoding='utf-8') as f:
         html_content = f.read()
     
-    # Find all image references in the HTML
-    img_pattern = r'<img\s+src="([^"]+)"'
-    referenced_images = set(re.findall(img_pattern, html_content))
-    
-    # Convert to full paths and normalize
-    referenced_paths = set()
-    referenced_paths.add(html_file.resolve())  # Keep the HTML file
-    
-    for img_ref in referenced_images:
-        img_path = (folder_path / img_ref).resolve()
-        referenced_paths.add(img_path)
-        
-    all_items = list(folder_path.rglob("*"))
-    
-    deleted_count = 0
-    for item in all_items:
-        item_resolved = item.resolve()
+    # Referenced files (relative to the folder) + every directory that contains one
+    index = AssetIndex(folder_path)
+    keep_files = {html_file.name}
+    for img_ref in set(m.group(2) for m in IMG_SRC_RE.finditer(html_content)):
+        rel = index.relative(img_ref)
+        if rel is not None and rel in index.files:
+            keep_files.add(rel)
+    keep_dirs = {parent.as_posix() for rel in keep_files for parent in Path(rel).parents}
 
-        if item_resolved in referenced_paths:
-            continue
-        
-        if any(str(keep_path).startswith(str(item_resolved)) and keep_path != item_resolved 
-               for keep_path in referenced_paths):
-            continue
-        
-        # Delete the item
-        try:
-            if item.is_file():
-                item.unlink()
-                deleted_count += 1
-            elif item.is_dir():
-                try:
-                    item.rmdir()
-                    deleted_count += 1
-                except OSError:
-                    pass
-        except Exception as e:
-            print(f"Error deleting {item}: {e}")
-    
-    # Second pass to clean up empty directories
-    for item in sorted(folder_path.rglob("*"), key=lambda p: len(p.parts), reverse=True):
-        if item.is_dir() and not any(item.iterdir()):
+    # Single bottom-up walk: files first, then directories that ended up empty
+    deleted_count = 0
+    for dirpath, dirnames, filenames in os.walk(folder_path, topdown=False):
+        rel_dir = Path(os.path.relpath(dirpath, folder_path)).as_posix()
+        for name in filenames:
+            rel = name if rel_dir == "." else f"{rel_dir}/{name}"
+            if rel in keep_files:
+                continue
             try:
-                item.rmdir()
-                print(f"Deleted empty folder: {item.relative_to(folder_path)}")
+                os.unlink(os.path.join(dirpath, name))
+                deleted_count += 1
             except Exception as e:
-                print(f"Error deleting empty folder {item}: {e}")
+                print(f"Error deleting {rel}: {e}")
+
+        if rel_dir != "." and rel_dir not in keep_dirs:
+            try:
+                os.rmdir(dirpath)
+                print(f"Deleted empty folder: {rel_dir}")
+            except OSError as e:
+                print(f"Error deleting empty folder {rel_dir}: {e}")
 
 def utils_apply(FolderPath: Path):
     modify_html(FolderPath)
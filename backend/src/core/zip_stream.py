@@ -0,0 +1,54 @@
+import io
+import os
+import zipfile
+from pathlib import Path
+from typing import Iterator
+
+READ_BLOCK_BYTES = 64 * 1024
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, unseekable buffer; zipfile then emits data descriptors instead of seeking back."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(root: Path, block_size: int = READ_BLOCK_BYTES) -> Iterator[bytes]:
+    """
+    Yields a ZIP of every file under root as it is compressed, so the response
+    can start before the archive is complete and no archive file is written.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                path = Path(dirpath) / name
+                info = zipfile.ZipInfo.from_file(path, path.relative_to(root).as_posix())
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with open(path, "rb") as src, zf.open(info, "w") as dest:
+                    for block in iter(lambda: src.read(block_size), b""):
+                        dest.write(block)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                data = sink.drain()
+                if data:
+                    yield data
+    # Central directory
+    data = sink.drain()
+    if data:
+        yield data
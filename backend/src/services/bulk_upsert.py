@@ -0,0 +1,116 @@
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List
+
+logger = logging.getLogger("bulk_upsert")
+
+# Pinecone rejects upsert requests over 2 MB
+MAX_REQUEST_BYTES = 2 * 1024 * 1024
+
+
+def is_transient(error: Exception) -> bool:
+    """Rate limits, server errors and network failures are worth retrying; bad requests are not."""
+    status = getattr(error, "status", None) or getattr(error, "status_code", None)
+    if status is None:
+        return True
+    return status == 429 or status >= 500
+
+
+def _record_bytes(record: Dict[str, Any]) -> int:
+    # JSON-encoded floats run ~10 bytes each; metadata is small next to the chunk text
+    return len(record["values"]) * 10 + len(json.dumps(record.get("metadata") or {})) + 64
+
+
+class BulkUpserter:
+    """
+    Sends vector records to an index in batches bounded by count and request
+    size, up to `concurrency` batches in flight across all callers, retrying
+    each batch with exponential backoff. `index` is anything with Pinecone's
+    upsert(vectors=, namespace=) / delete(ids=, namespace=) methods, so a local
+    Pinecone or an in-memory fake can stand in for the real one.
+    """
+
+    def __init__(self, index, batch_size: int = 100, max_batch_bytes: int = MAX_REQUEST_BYTES,
+                 concurrency: int = 4, retries: int = 4, backoff_seconds: float = 0.5):
+        self.index = index
+        self.batch_size = max(1, batch_size)
+        self.max_batch_bytes = min(max_batch_bytes, MAX_REQUEST_BYTES)
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self.backoff_seconds = backoff_seconds
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="vector-upsert")
+        self._lock = threading.Lock()
+        self._counters = {"records": 0, "batches": 0, "retries": 0, "failed_batches": 0, "deleted": 0}
+
+    def batches(self, records: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        batch, size = [], 0
+        for record in records:
+            record_size = _record_bytes(record)
+            if batch and (len(batch) >= self.batch_size or size + record_size > self.max_batch_bytes):
+                yield batch
+                batch, size = [], 0
+            batch.append(record)
+            size += record_size
+        if batch:
+            yield batch
+
+    def upsert(self, records: List[Dict[str, Any]], namespace: str,
+               progress: Callable[[int, int], None] | None = None) -> int:
+        """Upserts all records; raises once a batch has exhausted its retries."""
+        futures = [self._pool.submit(self._send, "upsert", batch, namespace) for batch in self.batches(records)]
+        done = 0
+        try:
+            for future in as_completed(futures):
+                done += future.result()
+                if progress is not None:
+                    progress(done, len(records))
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+        return done
+
+    def delete(self, ids: List[str], namespace: str, batch_size: int = 1000):
+        futures = [
+            self._pool.submit(self._send, "delete", ids[start:start + batch_size], namespace)
+            for start in range(0, len(ids), batch_size)
+        ]
+        for future in as_completed(futures):
+            future.result()
+
+    def _send(self, op: str, batch: List[Any], namespace: str) -> int:
+        for attempt in range(self.retries + 1):
+            try:
+                if op == "upsert":
+                    self.index.upsert(vectors=batch, namespace=namespace)
+                else:
+                    self.index.delete(ids=batch, namespace=namespace)
+                break
+            except Exception as e:
+                if attempt == self.retries or not is_transient(e):
+                    with self._lock:
+                        self._counters["failed_batches"] += 1
+                    raise
+                # Full jitter keeps retrying batches from hammering the API in lockstep
+                delay = random.uniform(0, self.backoff_seconds * 2 ** attempt)
+                logger.warning("%s of %d items failed (%s), retry %d/%d in %.1fs",
+                               op, len(batch), e, attempt + 1, self.retries, delay)
+                with self._lock:
+                    self._counters["retries"] += 1
+                time.sleep(delay)
+        with self._lock:
+            if op == "upsert":
+                self._counters["records"] += len(batch)
+                self._counters["batches"] += 1
+            else:
+                self._counters["deleted"] += len(batch)
+        return len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {"concurrency": self.concurrency, "batch_size": self.batch_size, **counters}
@@ -2,6 +2,16 @@ from supabase import create_client, Client
 from src.core.config import settings
 from datetime import datetime
 
+
+# PostgREST exchanges bytea columns as "\\x" + hex; the column itself stores raw bytes
+def _bytea(data: bytes) -> str:
+    return "\\x" + data.hex()
+
+
+def _from_bytea(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value.startswith("\\x") else value)
+
+
 class SupabaseService:
     def __init__(self):
         if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
@@ -82,22 +92,56 @@ class SupabaseService:
         }
         self.supabase.table("chat_history").insert(data).execute()
     
-    def save_document_content(self, workflow_id: str, filename: str, content: str):
-        """Saves full text during ingestion."""
-        data = {"workflow_id": workflow_id, "filename": filename, "content": content}
-        self.supabase.table("document_contents").insert(data).execute()
-
-    def get_all_workflow_docs(self, workflow_id: str):
+    def save_document_content(self, workflow_id: str, filename: str, fields: dict):
         """
-        Fetches ALL full-text documents for this workflow.
-        Returns: List of dicts [{'filename': '...', 'content': '...'}]
+        Saves a file's full text (compressed, with its manifest columns; see
+        document_contents.py), replacing the previous text of the same file.
         """
+        data = {"workflow_id": workflow_id, "filename": filename, **fields}
+        if data.get("content_compressed") is not None:
+            data["content_compressed"] = _bytea(data["content_compressed"])
+        self.supabase.table("document_contents").upsert(data, on_conflict="workflow_id,filename").execute()
+
+    def get_document_manifest(self, workflow_id: str):
+        """Per-file size and hash for this workflow, without the text."""
+        if not self.supabase: return []
         response = self.supabase.table("document_contents")\
-            .select("filename, content")\
+            .select("filename, sha256, encoding, chars, size_bytes, compressed_bytes")\
             .eq("workflow_id", workflow_id)\
+            .order("filename")\
             .execute()
         return response.data
 
+    def get_document_blob(self, workflow_id: str, filename: str):
+        """Stored text of one file: compressed, or plain `content` for rows saved before compression."""
+        if not self.supabase: return None
+        res = self.supabase.table("document_contents")\
+            .select("content, content_compressed, encoding")\
+            .eq("workflow_id", workflow_id)\
+            .eq("filename", filename)\
+            .execute()
+        if not res.data:
+            return None
+        row = res.data[0]
+        if row.get("content_compressed"):
+            row["content_compressed"] = _from_bytea(row["content_compressed"])
+        return row
+
+    def get_document_version(self, workflow_id: str, filename: str):
+        """Last ingested version of a file (content hash, profile, chunk IDs), or None."""
+        if not self.supabase: return None
+        res = self.supabase.table("document_versions")\
+            .select("*")\
+            .eq("workflow_id", workflow_id)\
+            .eq("filename", filename)\
+            .execute()
+        return res.data[0] if res.data else None
+
+    def save_document_version(self, record: dict):
+        """Records what was indexed for a file; one row per (workflow_id, filename)."""
+        if not self.supabase: return
+        self.supabase.table("document_versions").upsert(record, on_conflict="workflow_id,filename").execute()
+
     def save_graph(self, workflow_id: str, graph_data: dict):
         """Saves the generated graph JSON to Supabase."""
         data = {
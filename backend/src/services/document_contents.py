@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from src.core.config import settings
+from src.core.disk_lru import DiskBackend
+from src.services.database import db_service
+
+logger = logging.getLogger("document_contents")
+
+try:
+    import zstandard
+except ImportError:
+    # Rows record their codec, so zlib rows written meanwhile stay readable once zstandard is installed
+    zstandard = None
+
+
+def compress(text: str) -> Tuple[bytes, str]:
+    raw = text.encode("utf-8")
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=settings.DOCUMENT_CONTENT_ZSTD_LEVEL).compress(raw), "zstd"
+    return zlib.compress(raw, 6), "zlib"
+
+
+def decompress(blob: bytes, encoding: str) -> str:
+    if encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Document text is zstd-compressed; install `zstandard` to read it")
+        return zstandard.ZstdDecompressor().decompress(blob).decode("utf-8")
+    if encoding == "zlib":
+        return zlib.decompress(blob).decode("utf-8")
+    raise ValueError(f"Unknown document content encoding '{encoding}'")
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class DocumentContents:
+    """
+    Full text of ingested documents, stored compressed in `document_contents`
+    alongside a manifest (sha256, chars, raw and compressed size). Readers list
+    the manifest, then fetch one document at a time through a local
+    content-addressed cache, instead of pulling every row's text at once.
+    """
+
+    def __init__(self, cache: DiskBackend | None):
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._counters = {"saved": 0, "cache_hits": 0, "fetched": 0, "fetched_bytes": 0}
+
+    def _cache_key(self, sha256: str, encoding: str) -> str:
+        return f"{sha256}-{encoding}"
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._counters[name] += delta
+
+    def save(self, workflow_id: str, filename: str, text: str):
+        """Replaces the stored text of a file."""
+        blob, encoding = compress(text)
+        sha256 = text_sha256(text)
+        db_service.save_document_content(workflow_id, filename, {
+            "content": None,
+            "content_compressed": blob,
+            "encoding": encoding,
+            "sha256": sha256,
+            "chars": len(text),
+            "size_bytes": len(text.encode("utf-8")),
+            "compressed_bytes": len(blob),
+        })
+        # Write-through: the host that ingested a workflow usually serves it next
+        if self.cache is not None:
+            self.cache.put(self._cache_key(sha256, encoding), blob)
+        self._count(saved=1)
+
+    def manifest(self, workflow_id: str) -> List[Dict[str, Any]]:
+        """filename, sha256, chars, size_bytes, compressed_bytes, encoding per document; no text."""
+        return db_service.get_document_manifest(workflow_id)
+
+    def load(self, workflow_id: str, entry: Dict[str, Any]) -> str:
+        """Text of one manifest entry: local cache first, then the database."""
+        sha256, encoding = entry.get("sha256"), entry.get("encoding")
+        if sha256 and encoding and self.cache is not None:
+            blob = self.cache.get(self._cache_key(sha256, encoding))
+            if blob is not None:
+                text = decompress(blob, encoding)
+                if text_sha256(text) == sha256:
+                    self._count(cache_hits=1)
+                    return text
+                logger.warning("Cached text of %s failed its hash check, refetching", entry["filename"])
+
+        row = db_service.get_document_blob(workflow_id, entry["filename"]) or {}
+        if not row.get("content_compressed"):
+            # Rows saved before compression keep their text in `content`
+            text = row.get("content") or ""
+            self._count(fetched=1, fetched_bytes=len(text))
+            return text
+        blob = row["content_compressed"]
+        text = decompress(blob, row["encoding"])
+        if self.cache is not None:
+            self.cache.put(self._cache_key(text_sha256(text), row["encoding"]), blob)
+        self._count(fetched=1, fetched_bytes=len(blob))
+        return text
+
+    def iter_documents(self, workflow_id: str, manifest: List[Dict[str, Any]] | None = None) -> Iterator[Tuple[str, str]]:
+        """(filename, text) one document at a time."""
+        for entry in manifest if manifest is not None else self.manifest(workflow_id):
+            yield entry["filename"], self.load(workflow_id, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {"codec": "zstd" if zstandard is not None else "zlib", **counters}
+
+
+document_contents = DocumentContents(
+    DiskBackend(Path(settings.DOCUMENT_CACHE_DIR), settings.DOCUMENT_CACHE_MAX_MB * 1024 * 1024)
+    if settings.DOCUMENT_CACHE_ENABLED else None
+)
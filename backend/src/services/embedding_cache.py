@@ -0,0 +1,212 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from langchain_core.embeddings import Embeddings
+
+from src.core.config import settings
+from src.services.embeddings import EmbeddingEngine, build_embedding_engine
+
+logger = logging.getLogger("embedding_cache")
+
+# SQLite's default limit on bound parameters is 999
+LOOKUP_BATCH = 500
+
+
+def normalise(text: str) -> str:
+    """NFC + collapsed whitespace: the tokenizer treats these variants identically."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+# ---------------------------
+# STORE
+# ---------------------------
+class EmbeddingCache:
+    """
+    Persistent key -> float32 vector store in SQLite, evicted least-recently-used
+    once the stored vectors exceed max_bytes. Lookups and writes are per batch.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.errors = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            self._conn.commit()
+            self._size = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+            self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        keys = list(keys)
+        found: Dict[str, List[float]] = {}
+        try:
+            with self._lock:
+                for start in range(0, len(keys), LOOKUP_BATCH):
+                    part = keys[start:start + LOOKUP_BATCH]
+                    marks = ",".join("?" * len(part))
+                    for key, blob in self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", part
+                    ):
+                        found[key] = array("f", blob).tolist()
+                    # mtime-style LRU clock, bumped only for hits
+                    hits = [k for k in part if k in found]
+                    if hits:
+                        self._conn.execute(
+                            f"UPDATE embeddings SET last_used = ? WHERE key IN ({','.join('?' * len(hits))})",
+                            [time.time(), *hits],
+                        )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            # A broken cache only costs a re-embed
+            logger.warning("embedding cache read failed: %s", e)
+            self.errors += 1
+            return {}
+        return found
+
+    def put_many(self, vectors: Dict[str, List[float]]):
+        if not vectors:
+            return
+        now = time.time()
+        rows = [(key, array("f", vector).tobytes(), now) for key, vector in vectors.items()]
+        try:
+            with self._lock:
+                existing = self._existing_sizes([r[0] for r in rows])
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+                )
+                self._conn.commit()
+                self._size += sum(len(r[1]) for r in rows) - sum(existing.values())
+                self._entries += len(rows) - len(existing)
+                if self._size > self.max_bytes:
+                    self._evict()
+        except sqlite3.Error as e:
+            logger.warning("embedding cache write failed: %s", e)
+            self.errors += 1
+
+    def _existing_sizes(self, keys: List[str]) -> Dict[str, int]:
+        sizes = {}
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            part = keys[start:start + LOOKUP_BATCH]
+            marks = ",".join("?" * len(part))
+            sizes.update(self._conn.execute(
+                f"SELECT key, LENGTH(vector) FROM embeddings WHERE key IN ({marks})", part
+            ).fetchall())
+        return sizes
+
+    def _evict(self):
+        # Caller holds self._lock; drop oldest entries down to 90% of the budget
+        target = int(self.max_bytes * 0.9)
+        while self._size > target:
+            rows = self._conn.execute(
+                "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                break
+            dropped = []
+            for key, size in rows:
+                if self._size <= target:
+                    break
+                dropped.append(key)
+                self._size -= size
+            self._conn.execute(f"DELETE FROM embeddings WHERE key IN ({','.join('?' * len(dropped))})", dropped)
+            self._entries -= len(dropped)
+            self.evictions += len(dropped)
+        self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": self._entries,
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
+
+
+# ---------------------------
+# EMBEDDINGS WRAPPER
+# ---------------------------
+class CachedEmbeddings(Embeddings):
+    """
+    EmbeddingEngine behind the embedding cache. Keys are SHA-256 of
+    model + backend + normalised text, so identical chunks across workflows
+    (and repeated chunks within one batch) are embedded once.
+    """
+
+    def __init__(self, engine: EmbeddingEngine, cache: EmbeddingCache | None):
+        self.engine = engine
+        self.cache = cache
+        # The int8 model's vectors differ from fp32 ones, so they never share entries
+        self._namespace = f"{engine.model_name}|{engine.backend}"
+        self._lock = threading.Lock()
+        self._counters = {"document_hits": 0, "document_misses": 0, "query_hits": 0, "query_misses": 0}
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self._namespace}\0{normalise(text)}".encode("utf-8")).hexdigest()
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        keys = [self._key(t) for t in texts]
+        found = self.cache.get_many(set(keys))
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = self.engine.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(fresh)
+            found.update(fresh)
+
+        with self._lock:
+            self._counters[f"{kind}_hits"] += len(texts) - len(missing)
+            self._counters[f"{kind}_misses"] += len(missing)
+        return [found[k] for k in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.cache is None or not texts:
+            return self.engine.embed_documents(texts)
+        return self._embed(texts, "document")
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.cache is None:
+            return self.engine.embed_query(text)
+        return self._embed([text], "query")[0]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.engine.stats()
+        if self.cache is None:
+            return {**stats, "cache": {"enabled": False}}
+        with self._lock:
+            counters = dict(self._counters)
+        for kind in ("document", "query"):
+            total = counters[f"{kind}_hits"] + counters[f"{kind}_misses"]
+            counters[f"{kind}_hit_rate"] = round(counters[f"{kind}_hits"] / total, 4) if total else 0.0
+        return {**stats, "cache": {"enabled": True, **counters, **self.cache.stats()}}
+
+
+def build_embeddings() -> Embeddings:
+    engine = build_embedding_engine()
+    cache = None
+    if settings.EMBED_CACHE_ENABLED:
+        try:
+            cache = EmbeddingCache(settings.EMBED_CACHE_PATH, settings.EMBED_CACHE_MAX_MB * 1024 * 1024)
+        except sqlite3.Error as e:
+            logger.warning("embedding cache unavailable, embedding without it: %s", e)
+    return CachedEmbeddings(engine, cache)
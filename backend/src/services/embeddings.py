@@ -0,0 +1,121 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+from src.core.config import settings
+
+logger = logging.getLogger("embeddings")
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def available_cores() -> int:
+    """CPUs this process may run on (respects container/affinity limits)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class EmbeddingEngine(Embeddings):
+    """
+    sentence-transformers embedding tuned for CPU ingestion:
+    explicit batch size, texts sorted by length so each batch pads to similar
+    lengths, a bounded thread count, and an optional ONNX Runtime backend
+    (fp32 or dynamically quantised int8). Drop-in for HuggingFaceEmbeddings,
+    so PineconeVectorStore uses it for queries too.
+    """
+
+    def __init__(self, model_name: str, backend: str = "torch", batch_size: int = 32,
+                 threads: int | None = None, onnx_file: str | None = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{backend}', expected one of {', '.join(BACKENDS)}")
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.threads = max(1, threads or available_cores())
+        self.backend = backend
+        self.model = self._load(backend, onnx_file)
+        self._lock = threading.Lock()
+        self._counters = {"texts": 0, "batches": 0, "seconds": 0.0}
+
+    def _load(self, backend: str, onnx_file: str | None):
+        from sentence_transformers import SentenceTransformer
+
+        if backend != "torch":
+            try:
+                return SentenceTransformer(self.model_name, device="cpu", backend="onnx",
+                                           model_kwargs=self._onnx_kwargs(backend, onnx_file))
+            except Exception as e:
+                # onnxruntime/optimum are optional; never fail startup over them
+                logger.warning("ONNX embedding backend unavailable (%s), falling back to torch", e)
+                self.backend = "torch"
+
+        import torch
+        torch.set_num_threads(self.threads)
+        return SentenceTransformer(self.model_name, device="cpu")
+
+    def _onnx_kwargs(self, backend: str, onnx_file: str | None) -> Dict[str, Any]:
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.threads
+        options.inter_op_num_threads = 1
+        kwargs: Dict[str, Any] = {"provider": "CPUExecutionProvider", "session_options": options}
+        if backend == "onnx-int8":
+            # Quantised export shipped in the model repo (see EMBED_ONNX_FILE)
+            kwargs["file_name"] = onnx_file or "onnx/model_qint8_avx2.onnx"
+        elif onnx_file:
+            kwargs["file_name"] = onnx_file
+        return kwargs
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        started = time.perf_counter()
+        # Length-sorted batches: each batch pads to its own longest text, not the overall longest
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        vectors: List[List[float]] = [None] * len(texts)
+        batches = 0
+        for start in range(0, len(order), self.batch_size):
+            idx = order[start:start + self.batch_size]
+            encoded = self.model.encode([texts[i] for i in idx], batch_size=len(idx),
+                                        convert_to_numpy=True, show_progress_bar=False)
+            for i, vector in zip(idx, encoded):
+                vectors[i] = vector.tolist()
+            batches += 1
+        with self._lock:
+            self._counters["texts"] += len(texts)
+            self._counters["batches"] += batches
+            self._counters["seconds"] += time.perf_counter() - started
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.model.encode(text, convert_to_numpy=True, show_progress_bar=False).tolist()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        seconds = counters["seconds"]
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "batch_size": self.batch_size,
+            "threads": self.threads,
+            **counters,
+            "seconds": round(seconds, 3),
+            "texts_per_second": round(counters["texts"] / seconds, 1) if seconds else 0.0,
+        }
+
+
+def build_embedding_engine(backend: str | None = None) -> EmbeddingEngine:
+    return EmbeddingEngine(
+        settings.EMBEDDING_MODEL,
+        backend=backend or settings.EMBED_BACKEND,
+        batch_size=settings.EMBED_BATCH_SIZE,
+        threads=settings.EMBED_THREADS or None,
+        onnx_file=settings.EMBED_ONNX_FILE,
+    )
@@ -0,0 +1,67 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.core.config import settings
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobStore:
+    """
+    Ingestion job records in a local SQLite file (one JSON document per job).
+    Small enough to swap for a Supabase table later; the queue only uses save/get/active/prune.
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # The queue writes through asyncio.to_thread, so calls arrive from worker threads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ingest_jobs ("
+                " id TEXT PRIMARY KEY, user_id TEXT, status TEXT,"
+                " updated_at TEXT, data TEXT NOT NULL)"
+            )
+            self._conn.commit()
+
+    def save(self, job: Dict[str, Any]):
+        data = json.dumps(job)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ingest_jobs (id, user_id, status, updated_at, data) VALUES (?, ?, ?, ?, ?)",
+                (job["id"], job["user_id"], job["status"], job["updated_at"], data),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM ingest_jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def active(self) -> List[Dict[str, Any]]:
+        """Jobs a previous process left queued or running, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM ingest_jobs WHERE status IN (?, ?) ORDER BY updated_at", ACTIVE_STATUSES
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def prune(self, days: int) -> int:
+        """Drops finished jobs not updated in `days` days."""
+        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM ingest_jobs WHERE status NOT IN (?, ?) AND updated_at < ?", (*ACTIVE_STATUSES, cutoff)
+            )
+            self._conn.commit()
+        return cur.rowcount
+
+
+job_store = JobStore(settings.INGEST_JOBS_DB)
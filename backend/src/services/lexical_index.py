@@ -0,0 +1,159 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from src.core.config import settings
+
+# SQLite's default limit on bound parameters is 999
+LOOKUP_BATCH = 500
+
+# Amounts: 4512, 4,512, 4512.00, $4,512.00 (currency and thousands separators dropped)
+AMOUNT_RE = re.compile(r"^[$£€]?(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?$")
+PART_RE = re.compile(r"[^\W_]+")
+# Punctuation around a token; inner punctuation (INV-20931, 4,512.00) is kept
+STRIP = "()[]{}<>\"'`:;!?*|,.-+"
+STOPWORDS = frozenset(
+    "a an and are as at be by do does for from has have how i in is it me my of on or "
+    "show tell that the this to was what when where which who with you".split()
+)
+
+
+def _exact_forms(token: str, parts: List[str]) -> List[str]:
+    match = AMOUNT_RE.match(token)
+    if match:
+        whole, cents = match.group(1).replace(",", ""), match.group(2)
+        if not cents:
+            return [whole]
+        # 4512.00 also matches a query for 4512
+        return [whole + cents, whole] if set(cents[1:]) == {"0"} else [whole + cents]
+    return ["".join(parts)] if len(parts) > 1 else []
+
+
+def terms(text: str) -> List[str]:
+    """
+    Index terms: lower-cased word parts, plus one joined form for tokens with
+    digits, so "INV-20931" is findable as inv, 20931 and inv20931, and
+    "$4,512.00" as 4512.00 and 4512.
+    """
+    out: List[str] = []
+    for raw in text.split():
+        token = raw.strip(STRIP).lower()
+        if not token:
+            continue
+        parts = PART_RE.findall(token)
+        out.extend(parts)
+        if any(c.isdigit() for c in token):
+            out.extend(_exact_forms(token, parts))
+    return out
+
+
+def exact_terms(query: str) -> Set[str]:
+    """Identifiers and amounts in a query (tokens with digits, 3+ characters)."""
+    exact = set()
+    for raw in query.split():
+        token = raw.strip(STRIP).lower()
+        if not any(c.isdigit() for c in token):
+            continue
+        parts = PART_RE.findall(token)
+        exact.update(t for t in (_exact_forms(token, parts) or ["".join(parts)]) if len(t) >= 3)
+    return exact
+
+
+class LexicalIndex:
+    """
+    BM25 keyword index per workflow: one SQLite FTS5 file per namespace, kept in
+    step with the vector index (same chunk IDs, same upserts and deletes).
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self._counters = {"searches": 0, "chunks_added": 0, "chunks_deleted": 0}
+
+    def _path(self, workflow_id: str) -> Path:
+        # Workflow IDs come from requests: never use them as paths directly
+        return self.root / f"{hashlib.sha256(workflow_id.encode('utf-8')).hexdigest()[:32]}.sqlite3"
+
+    def _lock(self, workflow_id: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(workflow_id, threading.Lock())
+
+    def _connect(self, workflow_id: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path(workflow_id))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " id INTEGER PRIMARY KEY, chunk_id TEXT UNIQUE NOT NULL, text TEXT NOT NULL, metadata TEXT)"
+        )
+        # '.' is a token character so amounts like 4512.00 stay one term
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS chunk_terms USING fts5(terms, tokenize=\"unicode61 tokenchars '.'\")")
+        return conn
+
+    def _delete(self, conn: sqlite3.Connection, chunk_ids: List[str]):
+        for start in range(0, len(chunk_ids), LOOKUP_BATCH):
+            batch = chunk_ids[start:start + LOOKUP_BATCH]
+            marks = ",".join("?" * len(batch))
+            conn.execute(f"DELETE FROM chunk_terms WHERE rowid IN (SELECT id FROM chunks WHERE chunk_id IN ({marks}))", batch)
+            conn.execute(f"DELETE FROM chunks WHERE chunk_id IN ({marks})", batch)
+
+    def add(self, workflow_id: str, chunks: Iterable[Tuple[str, str, Dict[str, Any]]]):
+        """Indexes (chunk_id, text, metadata) triples; existing IDs are replaced."""
+        chunks = list(chunks)
+        if not chunks:
+            return
+        with self._lock(workflow_id), closing(self._connect(workflow_id)) as conn, conn:
+            self._delete(conn, [cid for cid, _, _ in chunks])
+            for cid, text, metadata in chunks:
+                cur = conn.execute("INSERT INTO chunks (chunk_id, text, metadata) VALUES (?, ?, ?)",
+                                   (cid, text, json.dumps(metadata)))
+                conn.execute("INSERT INTO chunk_terms (rowid, terms) VALUES (?, ?)", (cur.lastrowid, " ".join(terms(text))))
+        with self._guard:
+            self._counters["chunks_added"] += len(chunks)
+
+    def delete(self, workflow_id: str, chunk_ids: List[str]):
+        if not chunk_ids or not self._path(workflow_id).exists():
+            return
+        with self._lock(workflow_id), closing(self._connect(workflow_id)) as conn, conn:
+            self._delete(conn, list(chunk_ids))
+        with self._guard:
+            self._counters["chunks_deleted"] += len(chunk_ids)
+
+    def drop(self, workflow_id: str):
+        with self._lock(workflow_id):
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{self._path(workflow_id)}{suffix}").unlink(missing_ok=True)
+
+    def search(self, workflow_id: str, query: str, k: int) -> List[Dict[str, Any]]:
+        """Top-k chunks by BM25 over the query's terms (any term may match)."""
+        wanted = list(dict.fromkeys(t for t in terms(query) if t not in STOPWORDS))
+        if not wanted or not self._path(workflow_id).exists():
+            return []
+        # Terms are word characters and '.' only, so quoting them is enough to escape FTS5 syntax
+        expression = " OR ".join(f'"{t}"' for t in wanted)
+        with closing(self._connect(workflow_id)) as conn:
+            rows = conn.execute(
+                "SELECT c.chunk_id, c.text, c.metadata, bm25(chunk_terms) FROM chunk_terms"
+                " JOIN chunks c ON c.id = chunk_terms.rowid"
+                " WHERE chunk_terms MATCH ? ORDER BY bm25(chunk_terms) LIMIT ?",
+                (expression, k),
+            ).fetchall()
+        with self._guard:
+            self._counters["searches"] += 1
+        # FTS5's bm25() is negated: lower is better
+        return [{"id": cid, "text": text, "metadata": json.loads(meta or "{}"), "score": -score}
+                for cid, text, meta, score in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._guard:
+            counters = dict(self._counters)
+        return {"workflows": sum(1 for _ in self.root.glob("*.sqlite3")), **counters}
+
+
+lexical_index = LexicalIndex(settings.LEXICAL_INDEX_DIR)
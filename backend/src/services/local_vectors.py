@@ -0,0 +1,457 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+logger = logging.getLogger("local_vectors")
+
+BACKENDS = ("hnsw", "flat")
+# Below this many candidate rows a brute-force scan beats walking the graph (and is exact)
+EXACT_SEARCH_MAX_ROWS = 4096
+# Deleted rows are reclaimed once they outnumber live ones (and there are at least this many)
+COMPACT_MIN_DELETED = 1000
+
+FILTER_OPS = ("$eq", "$ne", "$in", "$nin")
+
+
+def matches(metadata: Dict[str, Any], flt: Dict[str, Any]) -> bool:
+    """Pinecone-style metadata filter: {"source": "a.pdf"} or {"source": {"$in": [...]}}."""
+    for key, cond in flt.items():
+        value = metadata.get(key)
+        if not isinstance(cond, dict):
+            cond = {"$eq": cond}
+        for op, operand in cond.items():
+            if op not in FILTER_OPS:
+                raise ValueError(f"Unsupported filter operator '{op}', expected one of {', '.join(FILTER_OPS)}")
+            if op == "$eq" and value != operand:
+                return False
+            if op == "$ne" and value == operand:
+                return False
+            if op == "$in" and value not in operand:
+                return False
+            if op == "$nin" and value in operand:
+                return False
+    return True
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    """Unit rows, so inner product is cosine similarity (the metric of the Pinecone index)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+# ---------------------------
+# ONE NAMESPACE
+# ---------------------------
+class _Namespace:
+    """
+    One workflow's vectors on disk:
+
+    - vectors.f32: float32 rows, append-only, memory-mapped for search
+    - log.jsonl:   append-only add/delete records (ID and metadata per row)
+    - hnsw.bin:    HNSW graph over the rows, a derived cache rebuilt if stale
+
+    Rows are never rewritten in place: an upsert of an existing ID tombstones
+    its old row and appends a new one. Compaction rewrites all three files.
+    """
+
+    def __init__(self, path: Path, dimension: int, backend: str, m: int, ef_construction: int, ef_search: int):
+        self.path = path
+        self.dimension = dimension
+        self.backend = backend
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.lock = threading.RLock()
+        self.ids: List[str | None] = []  # per row; None once deleted
+        self.metadata: List[Dict[str, Any] | None] = []
+        self.row_of: Dict[str, int] = {}
+        self.alive = bytearray()  # per row; 0 once deleted
+        self.vectors: np.memmap | None = None
+        self.hnsw = None
+        self._hnsw_dirty = False
+        path.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.path / "vectors.f32"
+
+    @property
+    def log_path(self) -> Path:
+        return self.path / "log.jsonl"
+
+    @property
+    def live(self) -> int:
+        return len(self.row_of)
+
+    # --- persistence ---
+
+    def _load(self):
+        row_bytes = 4 * self.dimension
+        file_rows = self.vectors_path.stat().st_size // row_bytes if self.vectors_path.exists() else 0
+        if self.log_path.exists():
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn last line from a crash mid-write
+                    if "del" in entry:
+                        self._tombstone(entry["del"])
+                    elif entry["row"] < file_rows:
+                        self._tombstone(entry["add"])
+                        self._append_row(entry["add"], entry.get("metadata") or {})
+        # Vectors are written before their log entry: drop rows the log never recorded
+        if file_rows > len(self.ids):
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(len(self.ids) * row_bytes)
+        self._remap()
+        if self.backend == "hnsw":
+            self.hnsw = self._open_hnsw()
+
+    def _remap(self):
+        rows = len(self.ids)
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dimension)) if rows else None
+
+    def _append_row(self, vid: str, metadata: Dict[str, Any]):
+        self.row_of[vid] = len(self.ids)
+        self.ids.append(vid)
+        self.metadata.append(metadata)
+        self.alive.append(1)
+
+    def _tombstone(self, vid: str) -> int | None:
+        row = self.row_of.pop(vid, None)
+        if row is not None:
+            self.ids[row] = None
+            self.metadata[row] = None
+            self.alive[row] = 0
+        return row
+
+    def _mask(self) -> np.ndarray:
+        return np.frombuffer(bytes(self.alive), dtype=np.bool_)
+
+    def _open_hnsw(self):
+        try:
+            import hnswlib
+        except ImportError:
+            # hnswlib is optional; never fail startup over it
+            logger.warning("hnswlib not installed, using exact search for %s", self.path.name)
+            self.backend = "flat"
+            return None
+
+        graph = hnswlib.Index(space="ip", dim=self.dimension)
+        graph_path, info_path = self.path / "hnsw.bin", self.path / "hnsw.json"
+        rows = len(self.ids)
+        try:
+            loaded = json.loads(info_path.read_text())["rows"] == rows
+            if loaded:
+                graph.load_index(str(graph_path), max_elements=max(rows, 1024))
+        except (OSError, ValueError, KeyError, RuntimeError):
+            loaded = False
+
+        if not loaded:
+            logger.info("Building HNSW graph for %s (%d rows)", self.path.name, self.live)
+            graph = hnswlib.Index(space="ip", dim=self.dimension)
+            graph.init_index(max_elements=max(rows, 1024), ef_construction=self.ef_construction, M=self.m)
+            if rows:
+                graph.add_items(self.vectors, np.arange(rows))
+            self._hnsw_dirty = True
+        graph.set_ef(self.ef_search)
+        # Deletes logged after the graph was last saved
+        for row in np.flatnonzero(~self._mask()):
+            try:
+                graph.mark_deleted(int(row))
+                self._hnsw_dirty = True
+            except RuntimeError:
+                pass  # already marked
+        return graph
+
+    def save(self):
+        with self.lock:
+            if self.hnsw is not None and self._hnsw_dirty:
+                self.hnsw.save_index(str(self.path / "hnsw.bin"))
+                (self.path / "hnsw.json").write_text(json.dumps({"rows": len(self.ids)}))
+                self._hnsw_dirty = False
+
+    # --- writes ---
+
+    def upsert(self, records: List[Dict[str, Any]]):
+        if not records:
+            return
+        matrix = _normalise(np.asarray([r["values"] for r in records], dtype=np.float32))
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"Vector dimension {matrix.shape[1]} does not match index dimension {self.dimension}")
+        with self.lock:
+            first = len(self.ids)
+            with open(self.vectors_path, "ab") as f:
+                # Drops rows of an earlier write that failed before its log entry
+                f.truncate(first * 4 * self.dimension)
+                f.write(matrix.tobytes())
+            lines = []
+            for offset, record in enumerate(records):
+                old = self._tombstone(record["id"])
+                if old is not None and self.hnsw is not None:
+                    self.hnsw.mark_deleted(old)
+                metadata = record.get("metadata") or {}
+                self._append_row(record["id"], metadata)
+                lines.append(json.dumps({"add": record["id"], "row": first + offset, "metadata": metadata}))
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            self._remap()
+            if self.hnsw is not None:
+                needed = len(self.ids)
+                if needed > self.hnsw.get_max_elements():
+                    self.hnsw.resize_index(max(needed, 2 * self.hnsw.get_max_elements()))
+                self.hnsw.add_items(matrix, np.arange(first, needed))
+                self._hnsw_dirty = True
+
+    def delete(self, ids: Iterable[str]):
+        with self.lock:
+            removed = []
+            for vid in ids:
+                row = self._tombstone(vid)
+                if row is None:
+                    continue
+                removed.append(vid)
+                if self.hnsw is not None:
+                    self.hnsw.mark_deleted(row)
+                    self._hnsw_dirty = True
+            if removed:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps({"del": vid}) + "\n" for vid in removed))
+            deleted = len(self.ids) - self.live
+            if deleted >= COMPACT_MIN_DELETED and deleted > self.live:
+                self._compact()
+
+    def _compact(self):
+        """Rewrites the namespace with live rows only, then rebuilds the graph."""
+        rows = np.flatnonzero(self._mask())
+        logger.info("Compacting %s: %d live of %d rows", self.path.name, len(rows), len(self.ids))
+        tmp_vectors, tmp_log = self.path / "vectors.f32.tmp", self.path / "log.jsonl.tmp"
+        with open(tmp_vectors, "wb") as f:
+            for start in range(0, len(rows), 4096):
+                f.write(np.ascontiguousarray(self.vectors[rows[start:start + 4096]]).tobytes())
+        with open(tmp_log, "w", encoding="utf-8") as f:
+            for new_row, row in enumerate(rows):
+                f.write(json.dumps({"add": self.ids[row], "row": new_row, "metadata": self.metadata[row]}) + "\n")
+        self.vectors = None
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_log, self.log_path)
+        (self.path / "hnsw.json").unlink(missing_ok=True)
+        self.ids, self.metadata, self.row_of = [], [], {}
+        self.alive = bytearray()
+        self.hnsw = None
+        self._load()
+        self.save()
+
+    # --- search ---
+
+    def search(self, vector: List[float], k: int, flt: Dict[str, Any] | None = None) -> List[Tuple[str, float, Dict[str, Any]]]:
+        query = _normalise(np.asarray([vector], dtype=np.float32))[0]
+        with self.lock:
+            candidates = None
+            if flt:
+                candidates = np.fromiter(
+                    (row for row, meta in enumerate(self.metadata) if meta is not None and matches(meta, flt)),
+                    dtype=np.int64,
+                )
+            pool = self.live if candidates is None else len(candidates)
+            k = min(k, pool)
+            if k <= 0:
+                return []
+            rows = scores = None
+            if self.hnsw is not None and pool > EXACT_SEARCH_MAX_ROWS:
+                rows, scores = self._approximate(query, k, candidates)
+            if rows is None:
+                rows, scores = self._exact(query, k, candidates)
+            return [(self.ids[r], float(s), self.metadata[r]) for r, s in zip(rows, scores)]
+
+    def _exact(self, query: np.ndarray, k: int, candidates: np.ndarray | None):
+        if candidates is None:
+            scores = np.asarray(self.vectors @ query)
+            scores[~self._mask()] = -np.inf
+            rows = np.arange(len(scores))
+        else:
+            rows = candidates
+            scores = np.asarray(self.vectors[candidates] @ query)
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return rows[top], scores[top]
+
+    def _approximate(self, query: np.ndarray, k: int, candidates: np.ndarray | None):
+        allowed = None if candidates is None else set(candidates.tolist())
+        self.hnsw.set_ef(max(self.ef_search, k))
+        try:
+            labels, distances = self.hnsw.knn_query(
+                query, k=k, filter=None if allowed is None else (lambda label: label in allowed)
+            )
+        except RuntimeError:
+            # The graph couldn't surface k matches (tight filter, low ef): fall back to a scan
+            return None, None
+        # "ip" space reports 1 - inner product
+        return labels[0].astype(np.int64), 1.0 - distances[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"vectors": self.live, "rows": len(self.ids)}
+
+
+# ---------------------------
+# INDEX (Pinecone-shaped)
+# ---------------------------
+class LocalVectorIndex:
+    """
+    In-process stand-in for a Pinecone index: one directory per namespace, with
+    the same upsert(vectors=, namespace=) / delete(ids=, namespace=) calls, so
+    BulkUpserter and the ingest paths work against either. `backend` is "hnsw"
+    (approximate, needs `pip install hnswlib`) or "flat" (exact NumPy scan).
+    """
+
+    def __init__(self, root: str, dimension: int, backend: str = "hnsw", m: int = 16,
+                 ef_construction: int = 200, ef_search: int = 64):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown local vector backend '{backend}', expected one of {', '.join(BACKENDS)}")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.dimension = dimension
+        self.backend = backend
+        self._params = {"m": m, "ef_construction": ef_construction, "ef_search": ef_search}
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+
+    def _dir(self, namespace: str) -> Path:
+        # Namespaces are workflow IDs from requests: never use them as paths directly
+        return self.root / hashlib.sha256(namespace.encode("utf-8")).hexdigest()[:32]
+
+    def _get(self, namespace: str | None, create: bool = True) -> _Namespace | None:
+        namespace = namespace or ""
+        with self._lock:
+            ns = self._namespaces.get(namespace)
+            if ns is None and (create or self._dir(namespace).exists()):
+                ns = _Namespace(self._dir(namespace), self.dimension, self.backend, **self._params)
+                self._namespaces[namespace] = ns
+            return ns
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str | None = None):
+        self._get(namespace).upsert(vectors)
+
+    def delete(self, ids: List[str] | None = None, namespace: str | None = None, delete_all: bool = False):
+        if delete_all:
+            self.drop_namespace(namespace)
+            return
+        ns = self._get(namespace, create=False)
+        if ns is not None:
+            ns.delete(ids or [])
+
+    def query(self, vector: List[float], top_k: int, namespace: str | None = None,
+              filter: Dict[str, Any] | None = None) -> List[Dict[str, Any]]:
+        ns = self._get(namespace, create=False)
+        if ns is None:
+            return []
+        return [{"id": vid, "score": score, "metadata": meta} for vid, score, meta in ns.search(vector, top_k, filter)]
+
+    def drop_namespace(self, namespace: str | None):
+        namespace = namespace or ""
+        with self._lock:
+            ns = self._namespaces.pop(namespace, None)
+            path = self._dir(namespace)
+        if ns is not None:
+            with ns.lock:
+                shutil.rmtree(path, ignore_errors=True)
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def close(self):
+        """Persists HNSW graphs changed since they were loaded."""
+        with self._lock:
+            namespaces = list(self._namespaces.values())
+        for ns in namespaces:
+            ns.save()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            namespaces = list(self._namespaces.values())
+        loaded = [ns.stats() for ns in namespaces]
+        return {
+            "backend": self.backend,
+            "namespaces_loaded": len(loaded),
+            "vectors": sum(s["vectors"] for s in loaded),
+        }
+
+
+# ---------------------------
+# LANGCHAIN ADAPTER
+# ---------------------------
+class LocalVectorStore(VectorStore):
+    """
+    LangChain VectorStore over a LocalVectorIndex, accepting the same
+    `namespace` search kwarg as PineconeVectorStore, so
+    `as_retriever(search_kwargs={"k": ..., "namespace": ...})` works unchanged.
+    """
+
+    def __init__(self, index: LocalVectorIndex, embedding: Embeddings, text_key: str = "text"):
+        self.index = index
+        self._embedding = embedding
+        self.text_key = text_key
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def add_texts(self, texts: Iterable[str], metadatas: List[dict] | None = None, ids: List[str] | None = None,
+                  namespace: str | None = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        ids = ids or [hashlib.sha256(f"{namespace}|{i}|{t}".encode("utf-8")).hexdigest()[:32] for i, t in enumerate(texts)]
+        vectors = self._embedding.embed_documents(texts)
+        records = [
+            {"id": vid, "values": vector, "metadata": {**(meta or {}), self.text_key: text}}
+            for vid, vector, text, meta in zip(ids, vectors, texts, metadatas or [{}] * len(texts))
+        ]
+        self.index.upsert(records, namespace)
+        return ids
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Dict[str, Any] | None = None,
+                                     namespace: str | None = None, **kwargs: Any) -> List[Tuple[Document, float]]:
+        vector = self._embedding.embed_query(query)
+        results = []
+        for match in self.index.query(vector, k, namespace, filter):
+            metadata = dict(match["metadata"])
+            text = metadata.pop(self.text_key, "")
+            results.append((Document(id=match["id"], page_content=text, metadata=metadata), match["score"]))
+        return results
+
+    def similarity_search(self, query: str, k: int = 4, filter: Dict[str, Any] | None = None,
+                          namespace: str | None = None, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter, namespace)]
+
+    def _select_relevance_score_fn(self):
+        # Cosine similarity in [-1, 1] -> relevance in [0, 1]
+        return lambda score: (score + 1) / 2
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: List[dict] | None = None,
+                   ids: List[str] | None = None, index: LocalVectorIndex | None = None, root: str | None = None,
+                   backend: str = "hnsw", namespace: str | None = None, text_key: str = "text",
+                   **kwargs: Any) -> "LocalVectorStore":
+        """
+        Adds `texts` to `index`, or to a new LocalVectorIndex under `root` sized
+        to the embedding's dimension (remaining kwargs: m, ef_construction, ef_search).
+        """
+        if index is None:
+            if root is None:
+                raise ValueError("LocalVectorStore.from_texts needs an existing `index` or a `root` directory")
+            index = LocalVectorIndex(root, len(embedding.embed_query("dimension")), backend, **kwargs)
+        store = cls(index, embedding, text_key=text_key)
+        store.add_texts(texts, metadatas, ids=ids, namespace=namespace)
+        return store
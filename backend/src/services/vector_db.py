@@ -1,21 +1,56 @@
 import time
+import uuid
+from typing import Callable, List
 from pinecone import Pinecone, ServerlessSpec
 from langchain_pinecone import PineconeVectorStore
-from langchain_huggingface import HuggingFaceEmbeddings
 from src.core.config import settings
+from src.services.bulk_upsert import BulkUpserter
+from src.services.embedding_cache import build_embeddings
+from src.services.lexical_index import lexical_index
+from src.services.local_vectors import LocalVectorIndex, LocalVectorStore
+
+# Metadata key PineconeVectorStore keeps the chunk text under
+TEXT_KEY = "text"
+DELETE_BATCH_SIZE = 1000
 
 class VectorDBService:
     def __init__(self):
+        self.backend = settings.VECTOR_BACKEND
+        if self.backend == "local":
+            # Batched CPU embedding engine behind the persistent embedding cache
+            self.embeddings = build_embeddings()
+            self._open_local()
+        else:
+            self._connect_pinecone()
+
+    def _open_local(self):
+        """In-process index (HNSW or exact NumPy) under VECTOR_LOCAL_DIR: no network, no API key."""
+        self.index = LocalVectorIndex(
+            settings.VECTOR_LOCAL_DIR,
+            dimension=settings.EMBEDDING_DIMENSION,
+            backend=settings.VECTOR_LOCAL_INDEX,
+            m=settings.VECTOR_LOCAL_HNSW_M,
+            ef_construction=settings.VECTOR_LOCAL_HNSW_EF_CONSTRUCTION,
+            ef_search=settings.VECTOR_LOCAL_HNSW_EF_SEARCH,
+        )
+        self.vector_store = LocalVectorStore(self.index, self.embeddings, text_key=TEXT_KEY)
+        self.upserter = self._build_upserter()
+        print(f"✅ Opened local vector index ({self.index.backend}) at {settings.VECTOR_LOCAL_DIR}")
+
+    def _connect_pinecone(self):
         if not settings.PINECONE_API_KEY:
              print("⚠️ PINECONE_API_KEY missing! Vector DB will not work.")
              return
              
-        self.pc = Pinecone(api_key=settings.PINECONE_API_KEY)
+        # PINECONE_HOST points the client at a Pinecone Local instance instead of the cloud
+        if settings.PINECONE_HOST:
+            self.pc = Pinecone(api_key=settings.PINECONE_API_KEY, host=settings.PINECONE_HOST)
+        else:
+            self.pc = Pinecone(api_key=settings.PINECONE_API_KEY)
         self.index_name = settings.PINECONE_INDEX_NAME
 
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=settings.EMBEDDING_MODEL
-        )
+        # Batched CPU embedding engine behind the persistent embedding cache
+        self.embeddings = build_embeddings()
 
         # 2. Check Index Existence
         try:
@@ -35,21 +70,94 @@ class VectorDBService:
 
         # 3. Connect LangChain
         try:
+            self.index = self.pc.Index(self.index_name)
             self.vector_store = PineconeVectorStore(
-                index_name=self.index_name,
-                embedding=self.embeddings
+                index=self.index,
+                embedding=self.embeddings,
+                text_key=TEXT_KEY
             )
+            self.upserter = self._build_upserter()
             print(f"✅ Connected to Pinecone Index: {self.index_name}")
         except Exception as e:
              print(f"⚠️ Failed to init VectorStore: {e}")
 
-    def add_documents(self, docs, workflow_id: str):
+    def _build_upserter(self) -> BulkUpserter:
+        return BulkUpserter(
+            self.index,
+            batch_size=settings.VECTOR_UPSERT_BATCH_SIZE,
+            concurrency=settings.VECTOR_UPSERT_CONCURRENCY,
+            retries=settings.VECTOR_UPSERT_RETRIES,
+            backoff_seconds=settings.VECTOR_UPSERT_BACKOFF_SECONDS,
+        )
+
+    def add_documents(self, docs, workflow_id: str, ids: List[str] | None = None,
+                      progress: Callable[[int, int], None] | None = None):
+        """Embeds and bulk-upserts the chunks (batched, concurrent, retried)."""
         if hasattr(self, 'vector_store'):
-            self.vector_store.add_documents(
-                documents=docs, 
-                namespace=workflow_id 
-            )
+            vectors = self.embed_documents(docs)
+            self.upsert_embeddings(docs, vectors, workflow_id, ids, progress)
         else:
             print("❌ Cannot add documents: Vector Store not initialized.")
 
+    def embedding_stats(self):
+        return self.embeddings.stats() if hasattr(self, 'embeddings') else None
+
+    def upsert_stats(self):
+        return self.upserter.stats() if hasattr(self, 'upserter') else None
+
+    def index_stats(self):
+        return self.index.stats() if self.backend == "local" else {"backend": "pinecone"}
+
+    def close(self):
+        if self.backend == "local":
+            self.index.close()
+
+    # --- Split embed / upsert (used by the staged ingest pipeline) ---
+
+    def embed_documents(self, docs) -> List[List[float]]:
+        """CPU half of add_documents: embeds the chunks, no network I/O."""
+        return self.embeddings.embed_documents([d.page_content for d in docs])
+
+    def upsert_embeddings(self, docs, vectors: List[List[float]], workflow_id: str, ids: List[str] | None = None,
+                          progress: Callable[[int, int], None] | None = None):
+        """
+        Network half of add_documents: writes precomputed vectors to the index.
+        Records match what PineconeVectorStore writes (chunk text under "text"),
+        so retrievers read them back unchanged. Deterministic `ids` overwrite in place.
+        """
+        if not hasattr(self, 'vector_store'):
+            print("❌ Cannot upsert: Vector Store not initialized.")
+            return
+        ids = ids or [str(uuid.uuid4()) for _ in docs]
+        records = [
+            {
+                "id": vid,
+                "values": vector,
+                "metadata": {**doc.metadata, TEXT_KEY: doc.page_content},
+            }
+            for vid, doc, vector in zip(ids, docs, vectors)
+        ]
+        self.upserter.upsert(records, workflow_id, progress)
+        # The keyword index mirrors the vectors chunk for chunk (same IDs, same deletes)
+        if settings.HYBRID_SEARCH_ENABLED:
+            lexical_index.add(workflow_id, [(vid, doc.page_content, doc.metadata) for vid, doc in zip(ids, docs)])
+
+    def delete_ids(self, ids: List[str], workflow_id: str):
+        """Removes vectors by ID (stale chunks of a re-ingested document)."""
+        if not ids or not hasattr(self, 'vector_store'):
+            return
+        self.upserter.delete(ids, workflow_id, DELETE_BATCH_SIZE)
+        lexical_index.delete(workflow_id, ids)
+
+    def delete_namespace(self, workflow_id: str):
+        """Drops every vector of a workflow."""
+        lexical_index.drop(workflow_id)
+        if not hasattr(self, 'vector_store'):
+            return
+        try:
+            self.index.delete(delete_all=True, namespace=workflow_id)
+        except Exception as e:
+            # Pinecone answers 404 for a namespace that never received vectors
+            print(f"⚠️ Could not delete vectors of {workflow_id}: {e}")
+
 vector_db_service = VectorDBService()
\ No newline at end of file
@@ -6,7 +6,8 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from src.core.config import settings
 from src.services.database import db_service
-from src.services.vector_db import vector_db_service
+from src.services.document_contents import document_contents
+from src.workflows.retrieval import hybrid_search
 
 llm = ChatOpenAI(
     temperature=0, 
@@ -19,10 +20,8 @@ def retrieve_and_chat(workflow_id: str, query: str, output_format: str = "text")
     
     # Retrieve Client Docs ONLY
     def search_client_docs(q: str) -> Tuple[str, List[str], int]:
-        retriever = vector_db_service.vector_store.as_retriever(
-            search_kwargs={"k": 15, "namespace": workflow_id}
-        )
-        docs = retriever.invoke(q)
+        # Vector + keyword (BM25) results; exact invoice numbers/amounts narrow the context
+        docs = hybrid_search(workflow_id, q, k=15)
         
         if not docs:
             return ("No client docs found.", [], 0)
@@ -98,10 +97,7 @@ def analyze_expense_intelligence(workflow_id: str):
     print(f"🕵️‍♀️ Running Expense Intelligence for {workflow_id}")
     
     # Fetch Client Data
-    retriever = vector_db_service.vector_store.as_retriever(
-        search_kwargs={"k": 25, "namespace": workflow_id}
-    )
-    client_docs = retriever.invoke("Expenses, Ledger, Invoices, Payments, Description, Amount")
+    client_docs = hybrid_search(workflow_id, "Expenses, Ledger, Invoices, Payments, Description, Amount", k=25)
     client_text = "\n".join([d.page_content for d in client_docs])
 
     system_prompt = """
@@ -148,10 +144,7 @@ def perform_year_end_review(workflow_id: str):
     print(f"📅 Starting Year-End Review for {workflow_id}")
 
     # Fetch Client Summary Data
-    retriever = vector_db_service.vector_store.as_retriever(
-        search_kwargs={"k": 30, "namespace": workflow_id}
-    )
-    docs = retriever.invoke("Summary, Total, Balance Sheet, Assets, Liabilities, Loan, High Value, Invoices")
+    docs = hybrid_search(workflow_id, "Summary, Total, Balance Sheet, Assets, Liabilities, Loan, High Value, Invoices", k=30)
     client_context = "\n".join([d.page_content for d in docs])
 
     system_prompt = """
@@ -201,26 +194,30 @@ def perform_reconciliation(workflow_id: str):
     """
     print(f"⚖️ Full-Context Reconciliation Started | User: {workflow_id}")
     
-    # 1. FETCH EVERYTHING (No Vector Search)
-    raw_docs = db_service.get_all_workflow_docs(workflow_id)
+    # 1. FETCH EVERYTHING (No Vector Search): manifest first, text one document at a time
+    manifest = document_contents.manifest(workflow_id)
     
-    if not raw_docs:
+    if not manifest:
         return {"response": [], "sources": ["System: No documents found."]}
 
+    # Oversized workflows are rejected from the manifest, before any text is downloaded
+    if sum(entry.get("chars") or 0 for entry in manifest) > settings.PROMPT_MAX_CHARS:
+        return {"response": [{"error": "Total document size exceeds AI limits. Please process in smaller batches."}]}
+
     # 2. Context Assembly
     combined_context = ""
     source_list = []
     
-    for doc in raw_docs:
-        fname = doc['filename']
-        text = doc['content']
+    for fname, text in document_contents.iter_documents(workflow_id, manifest):
         source_list.append(fname)
         
         # Add visual separators for the AI
         combined_context += f"\n\n=== FILE START: {fname} ===\n{text}\n=== FILE END: {fname} ===\n"
+        if len(combined_context) > settings.PROMPT_MAX_CHARS:
+            break  # rows saved before the manifest have no size: stop fetching once over
 
     # 3. Safety Check
-    if len(combined_context) > 500000:
+    if len(combined_context) > settings.PROMPT_MAX_CHARS:
         return {"response": [{"error": "Total document size exceeds AI limits. Please process in smaller batches."}]}
 
     # 4. The "Big Brain" Prompt - FIXED ESCAPING
@@ -0,0 +1,93 @@
+import hashlib
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from src.core.chunking import CHUNKER_VERSION
+from src.services.database import db_service
+from src.services.vector_db import vector_db_service
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(workflow_id: str, filename: str, content_hash: str, occurrence: int) -> str:
+    """
+    Deterministic vector ID: same workflow, file and chunk text -> same ID on every
+    ingest. `occurrence` numbers identical chunks within one document (repeated
+    table headers, boilerplate) so they don't collapse into one vector.
+    """
+    return hashlib.sha256(f"{workflow_id}|{filename}|{content_hash}|{occurrence}".encode("utf-8")).hexdigest()[:32]
+
+
+class DocumentSync:
+    """
+    Diff of one document's chunks against its last ingested version
+    (the `document_versions` record): which chunks are new, and which vectors
+    from the previous version no longer exist.
+    """
+
+    def __init__(self, workflow_id: str, filename: str, previous: Dict[str, Any] | None):
+        self.workflow_id = workflow_id
+        self.filename = filename
+        self.previous = previous
+        self.old_ids: Set[str] = set(previous.get("chunk_ids") or []) if previous else set()
+        self.ids: List[str] = []
+        self._occurrences: Counter = Counter()
+
+    def assign(self, texts: Iterable[str]) -> List[Tuple[str, str]]:
+        """Assigns IDs to the next chunks (in document order); returns (id, text) of those not already indexed."""
+        fresh = []
+        for text in texts:
+            content = chunk_hash(text)
+            n = self._occurrences[content]
+            self._occurrences[content] += 1
+            cid = chunk_id(self.workflow_id, self.filename, content, n)
+            self.ids.append(cid)
+            if cid not in self.old_ids:
+                fresh.append((cid, text))
+        return fresh
+
+    @property
+    def stale_ids(self) -> List[str]:
+        return sorted(self.old_ids.difference(self.ids))
+
+    def record(self, digest: str | None, profile: str | None) -> Dict[str, Any]:
+        version = (self.previous or {}).get("version") or 0
+        return {
+            "workflow_id": self.workflow_id,
+            "filename": self.filename,
+            "content_sha256": digest,
+            "profile": profile,
+            "chunker": CHUNKER_VERSION,
+            "version": version + 1,
+            "chunk_count": len(self.ids),
+            "chunk_ids": self.ids,
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+
+
+def load_previous(workflow_id: str, filename: str) -> Dict[str, Any] | None:
+    return db_service.get_document_version(workflow_id, filename)
+
+
+def is_unchanged(previous: Dict[str, Any] | None, digest: str | None, profile: str | None) -> bool:
+    """Same bytes, parsed with the same profile and chunked the same way: nothing to re-ingest."""
+    return bool(
+        previous and digest
+        and previous.get("content_sha256") == digest
+        and previous.get("profile") == profile
+        and previous.get("chunker") == CHUNKER_VERSION
+    )
+
+
+def finish(sync: DocumentSync, digest: str | None, profile: str | None) -> int:
+    """
+    Runs after every new chunk is upserted: removes the previous version's stale
+    vectors, then records the new version. Returns the number of vectors removed.
+    """
+    stale = sync.stale_ids
+    vector_db_service.delete_ids(stale, sync.workflow_id)
+    db_service.save_document_version(sync.record(digest, profile))
+    return len(stale)
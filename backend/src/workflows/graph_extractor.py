@@ -6,6 +6,7 @@ from langchain_core.output_parsers import StrOutputParser
 
 from src.core.config import settings
 from src.services.database import db_service
+from src.services.document_contents import document_contents
 from src.services.vector_db import vector_db_service
 from src.models.graph import GraphResponse, Node, Edge, NodeData, EdgeStyle
 
@@ -37,12 +38,13 @@ class GraphExtractor:
         
         # 2. Fetch Document Text
         # TRY A: Fast DB Fetch
-        raw_docs = db_service.get_all_workflow_docs(workflow_id)
+        # Manifest first (sizes and hashes only), then one document at a time
+        manifest = document_contents.manifest(workflow_id)
         combined_text = ""
         
-        if raw_docs:
+        if manifest:
             print("✅ Graph Builder: Using Full Text from DB")
-            combined_text = "\n\n".join([f"--- FILE: {d['filename']} ---\n{d['content']}" for d in raw_docs])
+            combined_text = self._budgeted_text(workflow_id, manifest)
         else:
             # TRY B: Pinecone Fallback
             print("⚠️ Graph Builder: DB empty, falling back to Pinecone...")
@@ -74,6 +76,28 @@ class GraphExtractor:
         
         return graph
     
+    def _budgeted_text(self, workflow_id: str, manifest: List[Dict[str, Any]]) -> str:
+        """
+        Documents up to PROMPT_MAX_CHARS, picked from the manifest sizes before
+        any text is fetched: files that don't fit are skipped, not downloaded.
+        """
+        selected, planned = [], 0
+        for entry in manifest:
+            chars = entry.get("chars") or 0
+            if planned + chars > settings.PROMPT_MAX_CHARS:
+                print(f"⚠️ Graph Builder: skipping {entry['filename']} ({chars} chars), over the prompt budget")
+                continue
+            selected.append(entry)
+            planned += chars
+
+        parts, total = [], 0
+        for filename, text in document_contents.iter_documents(workflow_id, selected):
+            parts.append(f"--- FILE: {filename} ---\n{text}")
+            total += len(parts[-1]) + 2
+            if total > settings.PROMPT_MAX_CHARS:
+                break  # rows saved before the manifest have no size: stop fetching once over
+        return "\n\n".join(parts)[:settings.PROMPT_MAX_CHARS]
+
     async def _llm_extract_entities(self, text_content: str) -> Dict[str, Any]:
         """
         Uses GPT-4o to extract entities. 
@@ -1,116 +1,54 @@
+import asyncio
 import os
 import shutil
 import tempfile
+import time
 from pathlib import Path
-from bs4 import BeautifulSoup
-from markdownify import markdownify
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.documents import Document
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from typing import List
 from pydantic import BaseModel
 
-from src.services.vector_db import vector_db_service
-from src.core.parser_pdf import parse_pdf
-from src.core.parser_docx import parse_docx
-from src.core.parser_csv import csv_parser_function
-from src.core.parser_image import parse_image
-from src.core.parser_pptx import parse_pptx
-from src.core.parser_text import parse_text
-from src.services.database import db_service
+from src.core.config import settings
+from src.core.uploads import save_upload
+from src.workflows.ingest_pipeline import Progress, ingest_pipeline
 
 # Create FastAPI router
 router = APIRouter()
 
-def clean_and_convert_html(html_content: str) -> str:
-    """
-    Cleans Docling HTML and converts to RAG-friendly Markdown.
-    """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Remove noise
-    for tag in soup(["script", "style", "meta", "link", "noscript"]):
-        tag.decompose()
-        
-    # Convert to Markdown (Preserves table structure)
-    md_content = markdownify(str(soup), heading_style="ATX")
-    return md_content
+# File types accepted by the RAG ingestion pipeline
+DOCLING_EXTENSIONS = [".pdf", ".docx", ".doc", ".csv", ".xlsx", ".xls", ".png", ".jpg", ".jpeg"]
+# Plain text is streamed straight into chunks, no parser involved
+TEXT_EXTENSIONS = [".txt", ".md", ".log"]
+INGEST_EXTENSIONS = DOCLING_EXTENSIONS + TEXT_EXTENSIONS
 
-def run_docling_parser(file_path: Path, output_dir: Path, extension: str):
+async def aprocess_and_index_file(workflow_id: str, input_path: Path, filename: str, profile: str | None = None,
+                                  digest: str | None = None, progress: Progress | None = None) -> int:
     """
-    Routes the file to the correct Docling parser function.
+    Async pipeline: the file goes through the staged ingest pipeline (parse worker
+    pool -> chunk -> embed -> upsert), overlapping with other documents in flight.
+    `input_path` is the upload already on disk; `digest` (its SHA-256, if known) skips re-hashing for the parse cache.
+    `progress(stage, **detail)` is called as the file moves through the stages.
     """
-    ext = extension.lower()
-    
-    if ext == ".pdf":
-        parse_pdf(file_path, output_dir)
-    elif ext in [".docx", ".doc"]:
-        parse_docx(file_path, output_dir)
-    elif ext in [".csv", ".xlsx", ".xls"]:
-        csv_parser_function(file_path, output_dir)
-    elif ext in [".png", ".jpg", ".jpeg"]:
-        parse_image(file_path, output_dir)
-    else:
-        raise ValueError(f"Unsupported file type: {ext}")
+    file_ext = Path(filename).suffix.lower()
+    if file_ext not in INGEST_EXTENSIONS:
+        raise ValueError(f"Unsupported file type: {file_ext}")
+    return await ingest_pipeline.ingest(
+        workflow_id, input_path, filename, profile, digest,
+        text_stream=file_ext in TEXT_EXTENSIONS, progress=progress,
+    )
 
-def process_and_index_document(workflow_id: str, file_content: bytes, filename: str):
+async def aprocess_and_index_upload(workflow_id: str, upload: UploadFile, profile: str | None = None) -> int:
     """
-    Full Pipeline: Upload -> Docling Parse -> Markdown -> Chunk -> Pinecone.
+    Streams an UploadFile to a temp dir (chunked, size-capped, hashed on the fly)
+    and runs the async pipeline on it. The upload is never held in memory whole.
     """
-    # Create a temporary directory for processing
-    with tempfile.TemporaryDirectory() as temp_dir:
-        work_dir = Path(temp_dir)
-        input_path = work_dir / filename
-        output_path = work_dir / "output"
-        output_path.mkdir()
-
-        # 1. Save Input File
-        with open(input_path, "wb") as f:
-            f.write(file_content)
+    file_ext = Path(upload.filename or "").suffix.lower()
+    if file_ext not in INGEST_EXTENSIONS:
+        raise ValueError(f"Unsupported file type: {file_ext}")
 
-        print(f"📄 Parsing {filename} using Docling...")
-
-        # 2. Run the appropriate Parser
-        try:
-            file_ext = Path(filename).suffix
-            run_docling_parser(input_path, output_path, file_ext)
-        except Exception as e:
-            print(f"❌ Parser Error: {e}")
-            raise e
-
-        # 3. Read the Result (Docling saves as index.html)
-        generated_html_path = output_path / "index.html"
-        
-        if not generated_html_path.exists():
-            raise FileNotFoundError("Parser finished but no 'index.html' was generated.")
-            
-        with open(generated_html_path, "r", encoding="utf-8") as f:
-            raw_html = f.read()
-
-        # 4. Convert to Markdown (The Fix)
-        md_text = clean_and_convert_html(raw_html)
-        print(f"💾 Saving full text of {filename} to DB...")
-        db_service.save_document_content(workflow_id, filename, md_text)
-
-        # 5. Chunking (Aggregator Strategy)
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=250,
-            separators=["\n\n", "|", "\n", " "] 
-        )
-        
-        docs = [Document(
-            page_content=md_text, 
-            metadata={"source": filename, "workflow_id": workflow_id}
-        )]
-        
-        split_docs = text_splitter.split_documents(docs)
-        print(f"🧩 Split into {len(split_docs)} chunks.")
-
-        # 6. Upload to Pinecone
-        vector_db_service.add_documents(split_docs, workflow_id)
-        
-        return len(split_docs)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        saved = await save_upload(upload, Path(temp_dir))
+        return await aprocess_and_index_file(workflow_id, saved.path, upload.filename, profile, saved.sha256)
 
 
 # FastAPI Endpoints
@@ -119,11 +57,18 @@ class IngestResponse(BaseModel):
     filename: str
     chunks_created: int
     status: str
+    seconds: float = 0.0
 
-@router.post("/ingest", response_model=List[IngestResponse])
+class IngestBatchResponse(BaseModel):
+    workflow_id: str
+    elapsed_seconds: float
+    results: List[IngestResponse]
+
+@router.post("/ingest", response_model=IngestBatchResponse)
 async def ingest_document(
     workflow_id: str,
-    files: List[UploadFile] = File(...)
+    files: List[UploadFile] = File(...),
+    profile: str | None = None
 ):
     """
     Endpoint to ingest multiple documents into the vector database.
@@ -132,39 +77,38 @@ async def ingest_document(
     - Converts to Markdown
     - Chunks the content
     - Stores in Pinecone
+
+    Files are processed concurrently (up to INGEST_FILE_CONCURRENCY at a time);
+    results come back in request order with per-file and total timings.
     """
-    results = []
-    
-    # Process each file independently
-    for file in files:
-        try:
-            # Read file content
-            file_content = await file.read()
-            
-            # Process and index
-            num_chunks = process_and_index_document(
-                workflow_id=workflow_id,
-                file_content=file_content,
-                filename=file.filename
-            )
-            
-            results.append(IngestResponse(
+    limit = asyncio.Semaphore(max(1, settings.INGEST_FILE_CONCURRENCY))
+
+    async def ingest_one(file: UploadFile) -> IngestResponse:
+        async with limit:
+            started = time.perf_counter()
+            try:
+                # Stream to disk and process (no whole-file read into memory)
+                num_chunks = await aprocess_and_index_upload(
+                    workflow_id=workflow_id,
+                    upload=file,
+                    profile=profile
+                )
+                status = "success"
+            except Exception as e:
+                # One failed file never takes the rest of the batch down
+                print(f"Failed to ingest {file.filename}: {e}")
+                num_chunks, status = 0, f"failed: {str(e)}"
+            return IngestResponse(
                 workflow_id=workflow_id,
                 filename=file.filename,
                 chunks_created=num_chunks,
-                status="success"
-            ))
-            
-        except Exception as e:
-            # Log the error but allow other files to proceed (or you could choose to fail all)
-            # Here we follow the response model, but we might want to indicate failure.
-            # Since IngestResponse has a 'status' field, we can use that.
-            print(f"Failed to ingest {file.filename}: {e}")
-            results.append(IngestResponse(
-                workflow_id=workflow_id,
-                filename=file.filename,
-                chunks_created=0,
-                status=f"failed: {str(e)}"
-            ))
-            
-    return results
\ No newline at end of file
+                status=status,
+                seconds=round(time.perf_counter() - started, 3)
+            )
+
+    started = time.perf_counter()
+    # gather keeps request order
+    results = await asyncio.gather(*(ingest_one(file) for file in files))
+    elapsed = round(time.perf_counter() - started, 3)
+    print(f"📥 Ingested {len(files)} files in {elapsed:.1f}s")
+    return IngestBatchResponse(workflow_id=workflow_id, elapsed_seconds=elapsed, results=results)
@@ -0,0 +1,288 @@
+import asyncio
+import copy
+import json
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Set
+
+from fastapi import UploadFile
+
+from src.core.config import settings
+from src.core.uploads import save_upload
+from src.services.job_store import JobStore, job_store
+from src.workflows.ingest import INGEST_EXTENSIONS, aprocess_and_index_file
+
+TERMINAL_STATUSES = ("completed", "completed_with_errors", "failed")
+KEEPALIVE_SECONDS = 15
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def public_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job as returned to clients: spool paths stay server-side."""
+    view = {k: v for k, v in job.items() if k != "files"}
+    view["files"] = [{k: v for k, v in f.items() if k != "path"} for f in job["files"]]
+    return view
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class IngestJobQueue:
+    """
+    Background ingestion: /v1/ingest spools the uploads, records a job and returns
+    its ID; INGEST_JOB_WORKERS asyncio workers then run the normal ingest pipeline,
+    up to INGEST_FILE_CONCURRENCY files of a job at a time.
+    Every state change is pushed to SSE subscribers at once and persisted to the
+    job store off the event loop (coalesced: one write in flight per job, covering
+    every change made meanwhile). Jobs still queued or running at shutdown are
+    picked up again on start().
+    """
+
+    def __init__(self, store: JobStore, workers: int, file_concurrency: int):
+        self.store = store
+        self.workers = workers
+        self.file_concurrency = max(1, file_concurrency)
+        self._queue: asyncio.Queue | None = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Running jobs; only mutated on the event loop (pipeline progress is reported there too)
+        self._live: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+        self._writers: Dict[str, asyncio.Task] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._lock = threading.Lock()
+
+    # ---------------------------
+    # LIFECYCLE
+    # ---------------------------
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        await asyncio.to_thread(self.store.prune, settings.INGEST_JOB_RETENTION_DAYS)
+
+        for job in await asyncio.to_thread(self.store.active):
+            # A file that was mid-pipeline when the process died is run again from the start
+            for entry in job["files"]:
+                if entry["status"] == "running":
+                    entry.update(status="queued", stage="queued")
+            job.update(status="queued", updated_at=_now())
+            await asyncio.to_thread(self.store.save, job)
+            self._queue.put_nowait(job["id"])
+            print(f"🔁 Resuming ingest job {job['id']} ({len(job['files'])} files)")
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ---------------------------
+    # SUBMIT / QUERY
+    # ---------------------------
+    async def submit(self, workflow_id: str, user_id: str, uploads: List[UploadFile], profile: str | None) -> Dict[str, Any]:
+        """Spools every upload to INGEST_SPOOL_DIR and queues one job for all of them."""
+        job_id = str(uuid.uuid4())
+        spool = Path(settings.INGEST_SPOOL_DIR) / job_id
+        files = []
+        for i, upload in enumerate(uploads):
+            entry = {"filename": upload.filename, "status": "queued", "stage": "queued",
+                     "chunks": 0, "error": None, "started_at": None, "finished_at": None}
+            suffix = Path(upload.filename or "").suffix.lower()
+            try:
+                if suffix not in INGEST_EXTENSIONS:
+                    raise ValueError(f"Unsupported file type: {suffix}")
+                # One folder per file so duplicate names in a batch don't collide
+                file_dir = spool / str(i)
+                file_dir.mkdir(parents=True, exist_ok=True)
+                saved = await save_upload(upload, file_dir)
+                entry.update(path=str(saved.path), size=saved.size, sha256=saved.sha256)
+            except Exception as e:
+                entry.update(status="failed", stage="failed", error=str(e))
+            files.append(entry)
+
+        now = _now()
+        job = {"id": job_id, "workflow_id": workflow_id, "user_id": user_id, "profile": profile,
+               "status": "queued", "created_at": now, "updated_at": now, "finished_at": None,
+               "elapsed_seconds": None, "files": files}
+        await asyncio.to_thread(self.store.save, job)
+        self._queue.put_nowait(job_id)
+        print(f"📥 Queued ingest job {job_id} ({len(files)} files) for workflow {workflow_id}")
+        return job
+
+    async def get(self, job_id: str) -> Dict[str, Any] | None:
+        with self._lock:
+            live = self._live.get(job_id)
+            if live is not None:
+                return json.loads(json.dumps(live))
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def events(self, job_id: str) -> AsyncIterator[str]:
+        """
+        Server-sent events for one job: a full `job` snapshot first, then `file`
+        events as files change stage, and a final `job` event when it finishes.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            yield _sse("job", public_view(job))
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(event, data)
+                if event == "job" and data["status"] in TERMINAL_STATUSES:
+                    return
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(job_id)
+                if subscribers is not None:
+                    subscribers.discard(queue)
+                    if not subscribers:
+                        del self._subscribers[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "file_concurrency": self.file_concurrency,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": len(self._live),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+        }
+
+    # ---------------------------
+    # WORKERS
+    # ---------------------------
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f"❌ Ingest job {job_id} crashed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return
+        with self._lock:
+            self._live[job_id] = job
+        self._update_job(job, status="running")
+
+        # Files of the batch run concurrently, at most file_concurrency at a time
+        started = time.perf_counter()
+        limit = asyncio.Semaphore(self.file_concurrency)
+        pending = [i for i, entry in enumerate(job["files"]) if entry["status"] == "queued"]
+        await asyncio.gather(*(self._run_file(job, i, limit) for i in pending))
+        elapsed = round(time.perf_counter() - started, 3)
+
+        failed = sum(1 for f in job["files"] if f["status"] == "failed")
+        if failed == 0:
+            status = "completed"
+        elif failed == len(job["files"]):
+            status = "failed"
+        else:
+            status = "completed_with_errors"
+        self._update_job(job, status=status, finished_at=_now(), elapsed_seconds=elapsed)
+        # The final state must be on disk before the job leaves _live
+        await self._flushed(job_id)
+
+        with self._lock:
+            self._live.pop(job_id, None)
+        await asyncio.to_thread(shutil.rmtree, Path(settings.INGEST_SPOOL_DIR) / job_id, True)
+        print(f"✅ Ingest job {job_id} {status} in {elapsed:.1f}s ({len(pending)} files)")
+
+    async def _run_file(self, job: Dict[str, Any], index: int, limit: asyncio.Semaphore):
+        """One file of a job; failures are recorded on the file and never propagate."""
+        entry = job["files"][index]
+        async with limit:
+            self._update_file(job, index, status="running", stage="queued", started_at=_now())
+            started = time.perf_counter()
+
+            def progress(stage: str, **detail):
+                self._update_file(job, index, stage=stage, **detail)
+
+            try:
+                chunks = await aprocess_and_index_file(
+                    job["workflow_id"], Path(entry["path"]), entry["filename"],
+                    job["profile"], entry.get("sha256"), progress=progress,
+                )
+                self._update_file(job, index, status="done", stage="done", chunks=chunks, finished_at=_now(),
+                                  seconds=round(time.perf_counter() - started, 3))
+            except Exception as e:
+                print(f"❌ Failed to ingest {entry['filename']} (job {job['id']}): {e}")
+                self._update_file(job, index, status="failed", stage="failed", error=str(e), finished_at=_now(),
+                                  seconds=round(time.perf_counter() - started, 3))
+
+    # ---------------------------
+    # STATE CHANGES
+    # ---------------------------
+    def _update_job(self, job: Dict[str, Any], **changes):
+        with self._lock:
+            job.update(changes, updated_at=_now())
+            snapshot = public_view(job)
+        self._persist(job)
+        self._publish(job["id"], "job", snapshot)
+
+    def _update_file(self, job: Dict[str, Any], index: int, **changes):
+        with self._lock:
+            entry = job["files"][index]
+            entry.update(changes)
+            job["updated_at"] = _now()
+            event = {"index": index, **{k: v for k, v in entry.items() if k != "path"}}
+        self._persist(job)
+        self._publish(job["id"], "file", event)
+
+    def _persist(self, job: Dict[str, Any]):
+        """Schedules a write of `job`; changes made before it starts share that write."""
+        self._dirty.add(job["id"])
+        if job["id"] not in self._writers:
+            self._writers[job["id"]] = asyncio.create_task(self._write(job))
+
+    async def _write(self, job: Dict[str, Any]):
+        try:
+            while job["id"] in self._dirty:
+                self._dirty.discard(job["id"])
+                # Snapshot on the loop: the thread must not read a dict the loop keeps changing
+                with self._lock:
+                    snapshot = copy.deepcopy(job)
+                try:
+                    await asyncio.to_thread(self.store.save, snapshot)
+                except Exception as e:
+                    # The next change retries; progress itself never fails on a store error
+                    print(f"⚠️ Could not save ingest job {job['id']}: {e}")
+        finally:
+            self._writers.pop(job["id"], None)
+
+    async def _flushed(self, job_id: str):
+        writer = self._writers.get(job_id)
+        if writer is not None:
+            await writer
+
+    def _publish(self, job_id: str, event: str, data: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers.get(job_id, ()))
+        for queue in subscribers:
+            self._loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+
+ingest_jobs = IngestJobQueue(job_store, settings.INGEST_JOB_WORKERS, settings.INGEST_FILE_CONCURRENCY)
@@ -0,0 +1,278 @@
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+from langchain_core.documents import Document
+from starlette.concurrency import run_in_threadpool
+
+from src.core.chunking import chunk_markdown
+from src.core.config import settings
+from src.core.parse_cache import cached_parse, file_sha256
+from src.core.profiles import get_profile
+from src.core.text_stream import iter_text_chunks
+from src.services.document_contents import document_contents
+from src.services.vector_db import vector_db_service
+from src.workflows.document_sync import DocumentSync, finish, is_unchanged, load_previous
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 250
+
+Progress = Callable[..., None]
+
+
+# ---------------------------
+# CHUNKING HELPERS (shared with the synchronous ingest path)
+# ---------------------------
+def split_markdown(md_text: str) -> List[str]:
+    """Headings and table rows are chunk boundaries; table chunks repeat their header."""
+    return chunk_markdown(md_text, chunk_size=CHUNK_SIZE)
+
+
+def text_db_copy(input_path: Path, filename: str) -> str:
+    """Full-text copy of a plain-text upload for the DB, capped at TEXT_INGEST_DB_MAX_CHARS."""
+    with open(input_path, "r", encoding="utf-8", errors="replace") as f:
+        content = f.read(settings.TEXT_INGEST_DB_MAX_CHARS + 1)
+    if len(content) > settings.TEXT_INGEST_DB_MAX_CHARS:
+        content = content[:settings.TEXT_INGEST_DB_MAX_CHARS] + f"\n\n[... {filename} truncated, full text is in vector search ...]"
+    return content
+
+
+def _take(chunks: Iterator[str], n: int) -> List[str]:
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= n:
+            break
+    return batch
+
+
+# ---------------------------
+# PIPELINE
+# ---------------------------
+@dataclass
+class _Doc:
+    """One document in flight; all bookkeeping happens on the event loop."""
+    workflow_id: str
+    input_path: Path
+    filename: str
+    profile: str | None
+    digest: str | None
+    text_stream: bool
+    progress: Progress | None
+    done: asyncio.Future
+    chunks: int = 0
+    chars: int = 0
+    upserted: int = 0
+    batches_pending: int = 0
+    chunking_done: bool = False
+    finishing: bool = False
+    # Set in the parse stage: diff against the previously ingested version
+    sync: DocumentSync | None = None
+    profile_key: str | None = None
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return {"source": self.filename, "workflow_id": self.workflow_id}
+
+    def report(self, stage: str, **detail):
+        if self.progress is not None:
+            self.progress(stage, **detail)
+
+    def fail(self, error: Exception):
+        if not self.done.done():
+            self.done.set_exception(error)
+
+
+@dataclass
+class _Stage:
+    name: str
+    workers: int
+    capacity: int
+    queue: asyncio.Queue | None = None
+    busy: int = 0
+    processed: int = 0
+    tasks: List[asyncio.Task] = field(default_factory=list)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.queue.qsize() if self.queue else 0,
+            "capacity": self.capacity,
+            "busy": self.busy,
+            "workers": self.workers,
+            "processed": self.processed,
+        }
+
+
+class IngestPipeline:
+    """
+    parse -> chunk -> embed -> upsert as separate worker stages joined by bounded
+    queues. Documents overlap: while one is being parsed, another's chunks are
+    embedding and a third's vectors are on their way to Pinecone. A full queue
+    blocks the stage feeding it, so a slow Pinecone throttles embedding instead
+    of piling vectors up in memory.
+    """
+
+    def __init__(self, queue_size: int, batch_chunks: int, parse_workers: int,
+                 chunk_workers: int, embed_workers: int, upsert_workers: int):
+        self.batch_chunks = max(1, batch_chunks)
+        self.stages = {
+            "parse": _Stage("parse", max(1, parse_workers), queue_size),
+            "chunk": _Stage("chunk", max(1, chunk_workers), queue_size),
+            "embed": _Stage("embed", max(1, embed_workers), queue_size),
+            "upsert": _Stage("upsert", max(1, upsert_workers), queue_size),
+        }
+        self._handlers = {
+            "parse": self._parse,
+            "chunk": self._chunk,
+            "embed": self._embed,
+            "upsert": self._upsert,
+        }
+        self._started = False
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        for name, stage in self.stages.items():
+            stage.queue = asyncio.Queue(maxsize=stage.capacity)
+            stage.tasks = [asyncio.create_task(self._worker(stage, self._handlers[name])) for _ in range(stage.workers)]
+        self._started = True
+
+    async def stop(self):
+        tasks = [t for stage in self.stages.values() for t in stage.tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._started = False
+
+    async def ingest(self, workflow_id: str, input_path: Path, filename: str, profile: str | None = None,
+                     digest: str | None = None, text_stream: bool = False, progress: Progress | None = None) -> int:
+        """Feeds one document into the pipeline and waits until all of its chunks are upserted."""
+        self._ensure_started()
+        doc = _Doc(workflow_id, input_path, filename, profile, digest, text_stream, progress,
+                   asyncio.get_running_loop().create_future())
+        await self._put("parse", doc, None)
+        return await doc.done
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: stage.stats() for name, stage in self.stages.items()}
+
+    # ---------------------------
+    # STAGES
+    # ---------------------------
+    async def _put(self, stage: str, doc: _Doc, payload):
+        await self.stages[stage].queue.put((doc, payload))
+
+    async def _worker(self, stage: _Stage, handler):
+        while True:
+            doc, payload = await stage.queue.get()
+            stage.busy += 1
+            try:
+                # Batches of a document that already failed are dropped
+                if not doc.done.done():
+                    await handler(doc, payload)
+            except Exception as e:
+                print(f"❌ Ingest {stage.name} failed for {doc.filename}: {e}")
+                doc.fail(e)
+            finally:
+                stage.busy -= 1
+                stage.processed += 1
+                stage.queue.task_done()
+
+    async def _parse(self, doc: _Doc, _):
+        doc.digest = doc.digest or await asyncio.to_thread(file_sha256, doc.input_path)
+        # Text files aren't parsed, so the profile doesn't change their chunks
+        doc.profile_key = None if doc.text_stream else get_profile(doc.profile).name
+        previous = await run_in_threadpool(load_previous, doc.workflow_id, doc.filename)
+        if is_unchanged(previous, doc.digest, doc.profile_key):
+            count = previous.get("chunk_count") or 0
+            print(f"⏭️ {doc.filename} is unchanged since version {previous.get('version')}, skipping.")
+            doc.report("unchanged", unchanged=True, chunks=count)
+            doc.done.set_result(count)
+            return
+        doc.sync = DocumentSync(doc.workflow_id, doc.filename, previous)
+
+        if doc.text_stream:
+            # Plain text needs no parser: chunks are streamed straight from the file
+            await self._put("chunk", doc, None)
+            return
+        doc.report("parsing")
+        print(f"📄 Parsing {doc.filename} using Docling (worker pool, profile={doc.profile or 'default'})...")
+        # artifacts=False: text and structure only; repeat uploads are served from the parse cache
+        result = await cached_parse(doc.input_path, doc.input_path.parent / "output", doc.profile,
+                                    artifacts=False, digest=doc.digest)
+        if result is None:
+            raise FileNotFoundError(f"Parser produced no output for '{doc.filename}'.")
+        await self._put("chunk", doc, result.markdown)
+
+    async def _chunk(self, doc: _Doc, md_text: str | None):
+        doc.report("chunking")
+        if md_text is None:
+            chunks = iter_text_chunks(doc.input_path, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+        else:
+            print(f"💾 Saving full text of {doc.filename} to DB...")
+            await run_in_threadpool(document_contents.save, doc.workflow_id, doc.filename, md_text)
+            chunks = iter(await run_in_threadpool(split_markdown, md_text))
+
+        try:
+            while not doc.done.done():
+                texts = await run_in_threadpool(_take, chunks, self.batch_chunks)
+                if not texts:
+                    break
+                doc.chunks += len(texts)
+                doc.chars += sum(map(len, texts))
+                # Chunks whose deterministic ID is already indexed skip embedding and upsert
+                fresh = doc.sync.assign(texts)
+                if not fresh:
+                    continue
+                ids = [cid for cid, _ in fresh]
+                batch = [Document(page_content=t, metadata=doc.metadata) for _, t in fresh]
+                doc.batches_pending += 1
+                # Blocks while the embed queue is full
+                await self._put("embed", doc, (ids, batch))
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+        if md_text is None and not doc.done.done():
+            content = await run_in_threadpool(text_db_copy, doc.input_path, doc.filename)
+            print(f"💾 Saving text of {doc.filename} to DB ({doc.chunks} chunks)...")
+            await run_in_threadpool(document_contents.save, doc.workflow_id, doc.filename, content)
+
+        print(f"🧩 Split {doc.filename} into {doc.chunks} chunks ({doc.chars} chars).")
+        doc.chunking_done = True
+        await self._maybe_finish(doc)
+
+    async def _embed(self, doc: _Doc, payload):
+        ids, batch = payload
+        doc.report("embedding", chunks=doc.upserted)
+        vectors = await run_in_threadpool(vector_db_service.embed_documents, batch)
+        await self._put("upsert", doc, (ids, batch, vectors))
+
+    async def _upsert(self, doc: _Doc, payload):
+        ids, batch, vectors = payload
+        doc.report("upserting", chunks=doc.upserted)
+        await run_in_threadpool(vector_db_service.upsert_embeddings, batch, vectors, doc.workflow_id, ids)
+        doc.upserted += len(batch)
+        doc.batches_pending -= 1
+        doc.report("upserting", chunks=doc.upserted)
+        await self._maybe_finish(doc)
+
+    async def _maybe_finish(self, doc: _Doc):
+        """Once every new chunk is upserted: drop stale vectors, then record the new version."""
+        if not (doc.chunking_done and doc.batches_pending == 0) or doc.finishing or doc.done.done():
+            return
+        doc.finishing = True
+        removed = await run_in_threadpool(finish, doc.sync, doc.digest, doc.profile_key)
+        print(f"🔁 {doc.filename}: {doc.upserted} new, {doc.chunks - doc.upserted} unchanged, {removed} stale chunks removed.")
+        doc.done.set_result(doc.chunks)
+
+
+ingest_pipeline = IngestPipeline(
+    queue_size=settings.INGEST_PIPELINE_QUEUE_SIZE,
+    batch_chunks=settings.INGEST_PIPELINE_BATCH_CHUNKS,
+    parse_workers=settings.PARSE_WORKERS,
+    chunk_workers=settings.PARSE_WORKERS,
+    embed_workers=settings.INGEST_EMBED_WORKERS,
+    upsert_workers=settings.INGEST_UPSERT_WORKERS,
+)
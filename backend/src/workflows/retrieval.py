@@ -0,0 +1,66 @@
+from typing import Dict, List, Tuple
+
+from langchain_core.documents import Document
+
+from src.core.config import settings
+from src.services.lexical_index import exact_terms, lexical_index, terms
+from src.services.vector_db import vector_db_service
+
+
+def _key(doc: Document) -> Tuple[str, str]:
+    # Vector and keyword hits of the same chunk carry the same source and text
+    return doc.metadata.get("source", ""), doc.page_content
+
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int = 60) -> List[Document]:
+    """Sum of 1 / (k + rank) over every ranking a chunk appears in; scores are never compared across rankers."""
+    scores: Dict[Tuple[str, str], float] = {}
+    docs: Dict[Tuple[str, str], Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = _key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            docs.setdefault(key, doc)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+def vector_search(workflow_id: str, query: str, k: int) -> List[Document]:
+    retriever = vector_db_service.vector_store.as_retriever(
+        search_kwargs={"k": k, "namespace": workflow_id}
+    )
+    return retriever.invoke(query)
+
+
+def keyword_search(workflow_id: str, query: str, k: int) -> List[Document]:
+    return [
+        Document(page_content=hit["text"], metadata=hit["metadata"])
+        for hit in lexical_index.search(workflow_id, query, k)
+    ]
+
+
+def hybrid_search(workflow_id: str, query: str, k: int) -> List[Document]:
+    """
+    Vector and BM25 results fused with reciprocal rank fusion. A query naming an
+    invoice number or amount ("INV-20931", "$4,512.00") is answered from the
+    chunks that contain it (up to HYBRID_EXACT_K, topped up from the fused list)
+    rather than the full top-k.
+    """
+    dense = vector_search(workflow_id, query, k)
+    if not settings.HYBRID_SEARCH_ENABLED:
+        return dense
+    lexical = keyword_search(workflow_id, query, k)
+    if not lexical:
+        return dense
+    fused = reciprocal_rank_fusion([dense, lexical], settings.HYBRID_RRF_K)
+
+    exact = exact_terms(query)
+    if exact:
+        containing = {_key(d) for d in lexical if exact.intersection(terms(d.page_content))}
+        # A term in k or more chunks (a vendor code, a year) isn't selective: keep the fused list
+        if 0 < len(containing) < k:
+            limit = max(settings.HYBRID_EXACT_K, len(containing))
+            precise = [d for d in fused if _key(d) in containing][:limit]
+            precise += [d for d in fused if _key(d) not in containing][:limit - len(precise)]
+            print(f"🎯 Exact match for {', '.join(sorted(exact))}: {len(precise)} chunks instead of {k}.")
+            return precise
+    return fused[:k]
@@ -0,0 +1,104 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("langchain_core")
+from src.services import bulk_upsert
+from src.services.bulk_upsert import BulkUpserter
+from src.services.local_vectors import LocalVectorIndex
+
+DIM = 8
+
+
+class ApiError(Exception):
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class FlakyIndex:
+    """Pinecone-shaped fake: the first `failures` calls raise `error`, later ones are recorded."""
+
+    def __init__(self, failures: int = 0, error: Exception | None = None):
+        self.failures = failures
+        self.error = error or ApiError(503)
+        self.calls = 0
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors, namespace):
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise self.error
+            self.batches.append(list(vectors))
+
+
+def records(n: int, text: str = ""):
+    rng = np.random.default_rng(0)
+    return [{"id": f"v{i}", "values": rng.normal(size=DIM).tolist(), "metadata": {"text": text}} for i in range(n)]
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    # Backoff at its upper bound, without sleeping
+    slept = []
+    monkeypatch.setattr(bulk_upsert.random, "uniform", lambda low, high: high)
+    monkeypatch.setattr(bulk_upsert.time, "sleep", slept.append)
+    return slept
+
+
+def test_splits_by_count_and_flushes_the_last_partial_batch(tmp_path):
+    index = LocalVectorIndex(str(tmp_path), DIM, "flat")
+    upserter = BulkUpserter(index, batch_size=100, concurrency=3)
+    progress = []
+
+    sent = upserter.upsert(records(250), "wf", lambda done, total: progress.append((done, total)))
+
+    assert sent == 250
+    assert sorted(len(b) for b in upserter.batches(records(250))) == [50, 100, 100]
+    assert index.stats()["vectors"] == 250
+    assert progress[-1] == (250, 250) and len(progress) == 3
+    assert upserter.stats()["batches"] == 3
+
+
+def test_splits_by_request_size():
+    index = FlakyIndex()
+    big = records(10, text="x" * 5000)
+    upserter = BulkUpserter(index, batch_size=100, max_batch_bytes=12000)
+
+    upserter.upsert(big, "wf")
+
+    # ~5.2 kB per record: two fit under 12 kB, a third would not
+    assert sorted(len(b) for b in index.batches) == [2, 2, 2, 2, 2]
+    assert sorted(r["id"] for b in index.batches for r in b) == sorted(r["id"] for r in big)
+
+
+def test_retries_transient_errors_with_backoff(delays):
+    index = FlakyIndex(failures=3)
+    upserter = BulkUpserter(index, batch_size=100, retries=4, backoff_seconds=0.5)
+
+    assert upserter.upsert(records(5), "wf") == 5
+    assert index.calls == 4
+    assert delays == [0.5, 1.0, 2.0]
+    assert upserter.stats()["retries"] == 3 and upserter.stats()["failed_batches"] == 0
+
+
+def test_gives_up_after_max_retries(delays):
+    index = FlakyIndex(failures=100, error=ApiError(429))
+    upserter = BulkUpserter(index, batch_size=100, retries=2)
+
+    with pytest.raises(ApiError):
+        upserter.upsert(records(5), "wf")
+    assert index.calls == 3
+    assert upserter.stats()["failed_batches"] == 1
+
+
+def test_client_errors_are_not_retried(delays):
+    index = FlakyIndex(failures=1, error=ApiError(400))
+    upserter = BulkUpserter(index, retries=4)
+
+    with pytest.raises(ApiError):
+        upserter.upsert(records(5), "wf")
+    assert index.calls == 1 and delays == []
@@ -0,0 +1,38 @@
+import os
+
+from src.core.disk_lru import DiskBackend
+
+
+def test_roundtrip_and_miss(tmp_path):
+    cache = DiskBackend(tmp_path, 1024)
+    cache.put("ab12", b"payload")
+
+    assert cache.get("ab12") == b"payload"
+    assert cache.get("cd34") is None
+    assert (tmp_path / "ab" / "ab12.bin").exists()
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DiskBackend(tmp_path, 100)
+    for age, key in enumerate(("aa01", "bb02"), start=1):
+        cache.put(key, b"x" * 40)
+        # mtime is the LRU clock: space the writes out explicitly
+        os.utime(cache._path(key), (age, age))
+    cache.get("aa01")  # touched: now the most recent
+    cache.put("cc03", b"x" * 40)
+
+    assert cache.get("bb02") is None
+    assert cache.get("aa01") is not None
+    assert cache.size() <= 100
+    assert cache.evictions >= 1
+
+
+def test_legacy_pickles_are_removed(tmp_path):
+    (tmp_path / "ab").mkdir()
+    legacy = tmp_path / "ab" / "ab12.pkl"
+    legacy.write_bytes(b"old pickle")
+    cache = DiskBackend(tmp_path, 1024)
+
+    assert cache.get("ab12") is None
+    assert cache.size() == 0
+    assert not legacy.exists()
@@ -0,0 +1,41 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("docling")
+from src.services.job_store import JobStore
+from src.workflows.ingest_jobs import IngestJobQueue
+
+
+class CountingStore(JobStore):
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.saves = 0
+        self.threads = set()
+
+    def save(self, job):
+        self.saves += 1
+        self.threads.add(threading.get_ident())
+        super().save(job)
+
+
+def test_progress_writes_are_coalesced_off_the_loop(tmp_path):
+    store = CountingStore(str(tmp_path / "jobs.sqlite3"))
+    queue = IngestJobQueue(store, workers=1, file_concurrency=1)
+    job = {"id": "job-1", "workflow_id": "wf", "user_id": "u", "profile": None, "status": "running",
+           "created_at": "", "updated_at": "", "finished_at": None, "elapsed_seconds": None,
+           "files": [{"filename": "a.pdf", "status": "running", "stage": "queued", "path": "/tmp/a.pdf"}]}
+
+    async def scenario():
+        queue._loop = asyncio.get_running_loop()
+        for i in range(100):
+            queue._update_file(job, 0, stage=f"stage-{i}")
+        await queue._flushed(job["id"])
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+
+    assert store.saves < 10
+    assert loop_thread not in store.threads
+    assert store.get("job-1")["files"][0]["stage"] == "stage-99"
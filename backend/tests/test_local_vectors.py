@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.services.local_vectors import LocalVectorIndex, LocalVectorStore
+
+TEXTS = ["invoice INV-20931 total 4512.00", "purchase order PO-118", "delivery note DN-7"]
+
+
+def test_from_texts_builds_a_new_index(tmp_path):
+    embedding = DeterministicFakeEmbedding(size=16)
+    store = LocalVectorStore.from_texts(TEXTS, embedding, metadatas=[{"source": f"{i}.pdf"} for i in range(3)],
+                                        root=str(tmp_path), backend="flat", namespace="wf")
+
+    assert store.index.dimension == 16
+    doc, score = store.similarity_search_with_score(TEXTS[1], k=1, namespace="wf")[0]
+    assert doc.page_content == TEXTS[1]
+    assert doc.metadata == {"source": "1.pdf"}
+    assert score == pytest.approx(1.0)
+
+
+def test_from_texts_adds_to_an_existing_index(tmp_path):
+    embedding = DeterministicFakeEmbedding(size=16)
+    index = LocalVectorIndex(str(tmp_path), 16, "flat")
+    store = LocalVectorStore.from_texts(TEXTS, embedding, ids=["a", "b", "c"], index=index, namespace="wf")
+
+    assert store.index is index
+    assert [d.id for d in store.similarity_search(TEXTS[2], k=3, namespace="wf")][0] == "c"
+
+
+def test_from_texts_needs_an_index_or_root():
+    with pytest.raises(ValueError):
+        LocalVectorStore.from_texts(TEXTS, DeterministicFakeEmbedding(size=16))
@@ -0,0 +1,100 @@
+import gc
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.core.assets import fix_html_image_refs
+from src.core.parser_text import parse_text
+
+THREADS = 8
+RUNS = 48
+
+
+def _run(root: Path, run_id: int) -> Path:
+    """
+    One parse run's worth of asset rewriting: every run uses the same image
+    names, one image outside its output tree (converter temp file) and one
+    outside the images folder, so leaked per-run state would cross-link runs.
+    """
+    marker = f"run-{run_id}".encode()
+    scratch = root / f"scratch-{run_id}"
+    out_dir = root / f"out-{run_id}"
+    (out_dir / "pages").mkdir(parents=True)
+    scratch.mkdir()
+    (scratch / "picture-1.png").write_bytes(marker)
+    (out_dir / "pages" / "page-1.png").write_bytes(marker)
+
+    html_file = out_dir / "index.html"
+    html_file.write_text(
+        f'<html><body><img src="{(scratch / "picture-1.png").as_posix()}">'
+        '<img src="pages/page-1.png"><img src="data:image/png;base64,AA=="></body></html>',
+        encoding="utf-8",
+    )
+    fix_html_image_refs(html_file, out_dir, "figures")
+
+    text_file = scratch / "notes.txt"
+    text_file.write_text(f"notes of run-{run_id}\n", encoding="utf-8")
+    result = parse_text(text_file, out_dir)
+    assert result.markdown == f"notes of run-{run_id}\n"
+    return out_dir
+
+
+def _check(out_dir: Path, run_id: int):
+    soup = BeautifulSoup((out_dir / "index.html").read_text(encoding="utf-8"), "html.parser")
+    local = [img["src"] for img in soup.find_all("img") if not img["src"].startswith("data:")]
+    assert len(local) == 2
+    for src in local:
+        assert src.startswith("figures/"), src
+        assert (out_dir / src).read_bytes() == f"run-{run_id}".encode(), src
+    assert f"run-{run_id}" in (out_dir / "notes.html").read_text(encoding="utf-8")
+
+
+def _round(root: Path, first: int):
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        ids = list(range(first, first + RUNS))
+        for run_id, out_dir in zip(ids, pool.map(lambda i: _run(root, i), ids)):
+            _check(out_dir, run_id)
+
+
+def test_concurrent_runs_reference_only_their_own_assets(tmp_path):
+    _round(tmp_path, 0)
+
+
+def test_concurrent_runs_do_not_accumulate_memory(tmp_path):
+    # Warm-up round first: imports, regex caches and thread-local setup are one-off
+    _round(tmp_path, 0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        _round(tmp_path, RUNS)
+        gc.collect()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for start in range(2 * RUNS, 6 * RUNS, RUNS):
+            _round(tmp_path, start)
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # State kept across runs would grow with every round; allow allocator noise only
+    assert current - baseline < 64 * 1024, f"grew by {current - baseline} bytes over {4 * RUNS} runs"
+
+
+def test_concurrent_tabular_parses_stay_separate(tmp_path):
+    pytest.importorskip("docling")
+    from src.core.parser_tabular import parse_tabular
+
+    def run(run_id: int):
+        csv_file = tmp_path / f"sheet-{run_id}.csv"
+        csv_file.write_text("id,label\n" + "".join(f"{i},run-{run_id}\n" for i in range(200)), encoding="utf-8")
+        out_dir = tmp_path / f"tabular-{run_id}"
+        return run_id, out_dir, parse_tabular(csv_file, out_dir)
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        for run_id, out_dir, result in pool.map(run, range(RUNS)):
+            labels = set(result.frames[f"sheet-{run_id}"]["label"])
+            assert labels == {f"run-{run_id}"}
+            html_text = (out_dir / "index.html").read_text(encoding="utf-8")
+            assert html_text.count("run-") == 200 and f"run-{run_id}<" in html_text
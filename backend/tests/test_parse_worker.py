@@ -0,0 +1,36 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+pytest.importorskip("docling")
+from src.core.config import settings
+from src.core.parse_worker import ParseTimeout, ParseWorkerPool
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # No model preloading: these tasks never touch a converter
+    monkeypatch.setattr(settings, "PARSER_PRELOAD", "")
+    pool = ParseWorkerPool(max_workers=1, max_queue=0, timeout=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_timed_out_task_frees_its_worker(pool):
+    async def scenario():
+        first_pid = await pool.run(os.getpid)
+        with pytest.raises(ParseTimeout):
+            await pool.run(time.sleep, 60)
+        # One worker, no queue: this is rejected with ParseQueueFull if the sleeper still holds it
+        started = time.perf_counter()
+        second_pid = await pool.run(os.getpid)
+        return first_pid, second_pid, time.perf_counter() - started
+
+    first_pid, second_pid, seconds = asyncio.run(scenario())
+
+    assert second_pid != first_pid
+    assert seconds < 30
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["restarts"] == 1 and stats["in_flight"] == 0
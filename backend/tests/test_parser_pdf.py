@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("docling")
+from bs4 import BeautifulSoup
+
+from src.core.parser_pdf import parse_pdf
+
+
+def _write_pdf(path: Path, text: str):
+    """One-page PDF with a single line of Helvetica text."""
+    stream = f"BT /F1 24 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def test_parse_pdf_with_artifacts(tmp_path):
+    pdf = tmp_path / "invoice.pdf"
+    _write_pdf(pdf, "Invoice INV-20931 total 4512.00")
+    out_dir = tmp_path / "out"
+
+    result = parse_pdf(pdf, out_dir, artifacts=True)
+
+    assert "INV-20931" in result.markdown
+    assert list(out_dir.rglob("invoice-page-1.png"))
+    index = out_dir / "index.html"
+    assert index.exists()
+    soup = BeautifulSoup(index.read_text(encoding="utf-8"), "html.parser")
+    for img in soup.find_all("img"):
+        src = img.get("src", "")
+        if not src.startswith("data:"):
+            assert (out_dir / src).exists(), src
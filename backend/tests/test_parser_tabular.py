@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("docling")
+from openpyxl import Workbook
+
+from src.core.parser_csv import csv_parser_function
+from src.core.parser_tabular import parse_tabular
+
+
+def test_duplicate_xlsx_headers_are_suffixed(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Ledger"
+    ws.append(["Date", "Amount", "Amount", None, "Amount"])
+    ws.append(["2024-01-02", 10, 12.5, "x", 3])
+    ws.append(["2024-01-03", 20, 7.25, "y", 4])
+    path = tmp_path / "ledger.xlsx"
+    wb.save(path)
+
+    result = parse_tabular(path, tmp_path / "out", artifacts=False)
+
+    frame = result.frames["Ledger"]
+    assert list(frame.columns) == ["Date", "Amount", "Amount.1", "column_4", "Amount.2"]
+    assert pd.api.types.is_numeric_dtype(frame["Amount.1"])
+    assert "| Date | Amount | Amount.1 | column_4 | Amount.2 |" in result.markdown
+
+
+def test_ragged_csv_falls_back_to_docling(tmp_path):
+    path = tmp_path / "ragged.csv"
+    path.write_text("a,b\n1,2\n3,4,5\n", encoding="utf-8")
+    with pytest.raises(pd.errors.ParserError):
+        parse_tabular(path, tmp_path / "fast", artifacts=False)
+
+    result = csv_parser_function(path, tmp_path / "out", artifacts=False)
+
+    assert "3" in result.markdown and "5" in result.markdown
+
+
+def test_empty_csv_reaches_docling(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_text("", encoding="utf-8")
+    try:
+        csv_parser_function(path, tmp_path / "out", artifacts=False)
+    except pd.errors.EmptyDataError:
+        pytest.fail("the fast path's error escaped the docling fallback")
+    except Exception:
+        pass  # docling's own verdict on an empty file
+
+
+def test_unsupported_suffix_is_rejected_up_front(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("a,b\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Unsupported format"):
+        csv_parser_function(path, tmp_path / "out", artifacts=False)
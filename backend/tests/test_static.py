@@ -0,0 +1,17 @@
+import io
+from pathlib import Path
+
+import pytest
+
+pyflakes_api = pytest.importorskip("pyflakes.api")
+from pyflakes.reporter import Reporter
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def test_no_undefined_names():
+    # Only undefined names fail: they are NameErrors waiting on a code path
+    warnings = io.StringIO()
+    pyflakes_api.checkRecursive([str(BACKEND / "src"), str(BACKEND / "app.py")], Reporter(warnings, io.StringIO()))
+    undefined = [line for line in warnings.getvalue().splitlines() if "undefined name" in line]
+    assert not undefined, "\n".join(undefined)
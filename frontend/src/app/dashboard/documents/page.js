@@ -75,7 +75,7 @@ export default function DocumentsPage() {
       try {
          const res = await api.ingestFiles(selectedWorkflowId, files);
          setUploadStatus('success');
-         setStatusMessage(`Successfully processed ${res.processed_files} files.`);
+         setStatusMessage(`Queued ${res.submitted_files} file(s) for processing.`);
          setTimeout(() => setUploadStatus(null), 3000);
       } catch (e) {
          setUploadStatus('error');